@@ -0,0 +1,148 @@
+"""
+Analytics Module
+Attendance and overtime analytics for the admin dashboard, computed with
+vectorized group-bys and refreshed incrementally (only rows appended since
+the last run are processed)
+"""
+
+import pandas as pd
+
+WEEKDAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+
+def new_analytics_state():
+    """Empty running aggregates; pass to update_analytics() on every refresh"""
+    return {
+        # Watermarks: number of rows of each dataset already folded in
+        'attendance_rows': 0,
+        'overtime_rows': 0,
+        # Check-ins per status (Present / Late / ...)
+        'status_counts': pd.Series(dtype='int64'),
+        # Late check-ins per (week start, department)
+        'late_by_week': pd.Series(dtype='int64'),
+        # Distinct employees checked in per date
+        'daily_checkins': pd.Series(dtype='int64'),
+        # Employee IDs already counted on the most recent date, so a second
+        # check-in that lands after a refresh is not counted twice
+        'last_date': None,
+        'last_date_ids': set(),
+        # Overtime pay per employee (mapped to departments at report time)
+        'overtime_pay': pd.Series(dtype='float64'),
+    }
+
+
+def _add(total, part):
+    """Add two partial aggregates, keeping integer counts as integers"""
+    if total.empty:
+        return part
+    if part.empty:
+        return total
+    return total.add(part, fill_value=0).astype(total.dtype)
+
+
+def update_analytics(state, df_attendance, df_overtime):
+    """
+    Fold the rows appended since the last run into the running aggregates
+
+    Both sheets are append-only, so rows past the stored watermark are the new
+    ones. If a sheet shrank (rows deleted upstream) the state is rebuilt.
+    """
+    if len(df_attendance) < state['attendance_rows'] or len(df_overtime) < state['overtime_rows']:
+        state = new_analytics_state()
+
+    new_attendance = df_attendance.iloc[state['attendance_rows']:]
+    if not new_attendance.empty and {'Date', 'Status'} <= set(new_attendance.columns):
+        _fold_attendance(state, new_attendance)
+    state['attendance_rows'] = len(df_attendance)
+
+    new_overtime = df_overtime.iloc[state['overtime_rows']:]
+    if not new_overtime.empty and {'Employee ID', 'Overtime Pay'} <= set(new_overtime.columns):
+        pay = pd.to_numeric(new_overtime['Overtime Pay'], errors='coerce').fillna(0.0).astype('float64')
+        part = pay.groupby(new_overtime['Employee ID'].astype(str)).sum()
+        state['overtime_pay'] = _add(state['overtime_pay'], part)
+    state['overtime_rows'] = len(df_overtime)
+
+    return state
+
+
+def _fold_attendance(state, rows):
+    """Aggregate a batch of new attendance rows into state"""
+    rows = rows.assign(_date=pd.to_datetime(rows['Date'], errors='coerce')).dropna(subset=['_date'])
+    if rows.empty:
+        return
+
+    status = rows['Status'].astype(str)
+    state['status_counts'] = _add(state['status_counts'], status.value_counts())
+
+    late = rows[status == 'Late']
+    if not late.empty:
+        week = late['_date'].dt.to_period('W').dt.start_time
+        if 'Department' in late.columns:
+            department = late['Department'].astype(str)
+        else:
+            department = pd.Series('N/A', index=late.index)
+        part = late.groupby([week, department]).size()
+        part.index.names = ['Week', 'Department']
+        state['late_by_week'] = _add(state['late_by_week'], part)
+
+    # Distinct employees per date; drop anyone already counted on the
+    # boundary date from the previous run
+    checkins = rows[['_date', 'Employee ID']].astype({'Employee ID': str}).drop_duplicates()
+    if state['last_date'] is not None:
+        seen = (checkins['_date'] == state['last_date']) & checkins['Employee ID'].isin(state['last_date_ids'])
+        checkins = checkins[~seen]
+    state['daily_checkins'] = _add(state['daily_checkins'], checkins.groupby('_date').size())
+
+    last_date = rows['_date'].max()
+    last_ids = set(rows.loc[rows['_date'] == last_date, 'Employee ID'].astype(str))
+    if last_date == state['last_date']:
+        last_ids |= state['last_date_ids']
+    state['last_date'] = last_date
+    state['last_date_ids'] = last_ids
+
+
+# ==================== REPORTS ====================
+
+def punctuality_rate(state):
+    """Percentage of check-ins that were on time (Present vs Late)"""
+    counts = state['status_counts']
+    present = int(counts.get('Present', 0))
+    late = int(counts.get('Late', 0))
+    if present + late == 0:
+        return 0.0
+    return round(present / (present + late) * 100, 1)
+
+
+def late_trend_by_department(state):
+    """Late check-ins per week, one column per department"""
+    late = state['late_by_week']
+    if late.empty:
+        return pd.DataFrame()
+    return late.unstack('Department', fill_value=0).sort_index()
+
+
+def absenteeism_by_weekday(state, headcount):
+    """Average share of the workforce absent on each weekday (in %)"""
+    daily = state['daily_checkins']
+    if daily.empty or headcount <= 0:
+        return pd.Series(dtype='float64')
+
+    absent_rate = (1 - daily.clip(upper=headcount) / headcount) * 100
+    by_weekday = absent_rate.groupby(absent_rate.index.day_name()).mean()
+    return by_weekday.reindex([day for day in WEEKDAYS if day in by_weekday.index]).round(1)
+
+
+def overtime_cost_by_department(state, df_employees):
+    """Total overtime pay per department"""
+    pay = state['overtime_pay']
+    if pay.empty:
+        return pd.Series(dtype='float64')
+
+    if {'Employee ID', 'Department'} <= set(df_employees.columns):
+        departments = df_employees.set_index(df_employees['Employee ID'].astype(str))['Department']
+        departments = departments[~departments.index.duplicated(keep='last')]
+    else:
+        departments = pd.Series(dtype='object')
+
+    by_department = pay.groupby(pay.index.map(departments).fillna('Unknown')).sum()
+    return by_department.sort_values(ascending=False).round(2)
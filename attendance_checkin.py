@@ -6,21 +6,19 @@ Allows employees to check in/out for attendance with automatic image capture
 import streamlit as st
 import requests
 from datetime import datetime
-import time
 import base64
 from io import BytesIO
-from PIL import Image
+
+from n8n_client import send_request
+from employee_directory import employee_fields, validate_employee
+from notifications import flash
+from shift_rules import checkin_status
 
 
 def call_n8n_webhook(n8n_base_url, endpoint, data=None, method='POST'):
     """Call n8n webhook"""
     try:
-        url = f"{n8n_base_url}/{endpoint}"
-
-        if method == 'POST':
-            response = requests.post(url, json=data, timeout=10)
-        else:
-            response = requests.get(url, timeout=10)
+        response = send_request(n8n_base_url, endpoint, data, method)
 
         if response.status_code == 200:
             return response.json()
@@ -37,6 +35,8 @@ def call_n8n_webhook(n8n_base_url, endpoint, data=None, method='POST'):
 
 def image_to_base64(image):
     """Convert PIL Image to base64 string"""
+    from PIL import Image
+
     # Resize to reasonable size
     max_size = (400, 300)
     image.thumbnail(max_size, Image.Resampling.LANCZOS)
@@ -52,59 +52,6 @@ def show_attendance_checkin(n8n_base_url):
     Employee Attendance Check-in Page with Automatic Image Capture
     """
 
-    # Custom CSS
-    st.markdown("""
-    <style>
-        .camera-compact {
-            max-width: 400px;
-            margin: 0 auto;
-        }
-        .camera-compact img {
-            max-width: 100%;
-            border-radius: 10px;
-        }
-        .success-animation {
-            text-align: center;
-            padding: 30px;
-            font-size: 64px;
-            animation: bounce 0.5s ease;
-        }
-        @keyframes bounce {
-            0%, 100% { transform: translateY(0); }
-            50% { transform: translateY(-20px); }
-        }
-        .time-display {
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            padding: 30px;
-            border-radius: 15px;
-            text-align: center;
-            margin-bottom: 30px;
-        }
-        .time-display .time {
-            font-size: 48px;
-            font-weight: 700;
-            margin-bottom: 10px;
-        }
-        .time-display .date {
-            font-size: 18px;
-            opacity: 0.9;
-        }
-        .stCameraInput {
-            max-width: 400px !important;
-            margin: 0 auto;
-        }
-        .stCameraInput > label {
-            max-width: 400px !important;
-        }
-        .stCameraInput video {
-            max-width: 400px !important;
-            max-height: 300px !important;
-            border-radius: 10px;
-        }
-    </style>
-    """, unsafe_allow_html=True)
-
     # Header
     st.markdown("""
     <div style='text-align: center; margin-bottom: 30px;'>
@@ -149,35 +96,29 @@ def show_attendance_checkin(n8n_base_url):
     # Employee Details Form
     st.subheader("📝 Enter Your Details")
 
-    col1, col2 = st.columns(2)
+    department_options = ["Not Specified", "IT", "HR", "Finance", "Marketing", "Sales", "Operations",
+                          "Customer Service"]
 
-    with col1:
-        employee_id = st.text_input(
-            "👤 Employee ID *",
-            placeholder="E001",
-            help="Enter your employee ID (e.g., E001)",
-            key="emp_id_input"
-        )
+    def prefill_department(record):
+        if record['Department'] in department_options:
+            st.session_state.dept_input = record['Department']
 
-    with col2:
-        employee_name = st.text_input(
-            "📛 Full Name *",
-            placeholder="John Doe",
-            help="Enter your full name",
-            key="emp_name_input"
-        )
+    employee_id, employee_name, record = employee_fields(n8n_base_url, "checkin_emp", on_select=prefill_department)
 
     # Department (optional for verification)
     department = st.selectbox(
         "🏢 Department (Optional)",
-        ["Not Specified", "IT", "HR", "Finance", "Marketing", "Sales", "Operations", "Customer Service"],
+        department_options,
         key="dept_input"
     )
 
     # Check In Button
     if st.button("📸 Check In Now", use_container_width=True, type="primary", key="checkin_btn"):
+        error = validate_employee(n8n_base_url, employee_id, employee_name) if employee_id else None
         if not employee_id or not employee_name:
             st.error("❌ Please fill in both Employee ID and Name!")
+        elif error:
+            st.error(f"❌ {error}")
         else:
             st.session_state.check_in_clicked = True
             st.session_state.show_camera = True
@@ -199,7 +140,9 @@ def show_attendance_checkin(n8n_base_url):
             camera_photo = st.camera_input("Take your photo", key="camera_input")
 
             if camera_photo is not None:
-                # Image captured
+                # Image captured (PIL is only loaded once a photo is taken)
+                from PIL import Image
+
                 image = Image.open(camera_photo)
                 st.session_state.captured_image = image
                 st.session_state.camera_ready = True
@@ -210,19 +153,10 @@ def show_attendance_checkin(n8n_base_url):
 
                 # Process check-in
                 if st.button("✅ Confirm and Submit", use_container_width=True, type="primary", key="submit_btn"):
-                    # Determine status based on time
-                    current_hour = current_time.hour
-                    current_minute = current_time.minute
-
-                    # Late if after 9:30 AM
-                    if current_hour > 9 or (current_hour == 9 and current_minute > 30):
-                        status = "Late"
-                        status_icon = "⚠️"
-                        status_color = "warning"
-                    else:
-                        status = "Present"
-                        status_icon = "✅"
-                        status_color = "success"
+                    # Determine status from the employee's shift (department's if none of their own)
+                    shift_department = record['Department'] if record else department
+                    status, minutes_late = checkin_status(employee_id, shift_department, current_time)
+                    status_color = "warning" if status == "Late" else "success"
 
                     # Convert image to base64
                     image_base64 = image_to_base64(st.session_state.captured_image)
@@ -243,15 +177,14 @@ def show_attendance_checkin(n8n_base_url):
                         result = call_n8n_webhook(n8n_base_url, 'attendance', attendance_data)
 
                         if result:
-                            # Success Animation
-                            st.markdown(f"""
-                            <div class='success-animation'>
-                                {status_icon}
-                            </div>
-                            """, unsafe_allow_html=True)
+                            # Keep the dashboard rollups current without a sheet rescan
+                            # (imported here: the kiosk shares this module and loads no pandas)
+                            from rollups import record_checkin
+
+                            record_checkin(attendance_data)
 
                             if status_color == "success":
-                                st.success(f"""
+                                flash("success", f"""
                                 ✅ **Attendance Recorded Successfully!**
 
                                 **Employee:** {employee_name} ({employee_id})  
@@ -260,28 +193,25 @@ def show_attendance_checkin(n8n_base_url):
                                 **Photo:** Captured and saved
 
                                 Have a great day at work! 🎉
-                                """)
+                                """, celebrate=True)
                             else:
-                                st.warning(f"""
+                                flash("warning", f"""
                                 ⚠️ **Attendance Recorded - Late Arrival**
 
                                 **Employee:** {employee_name} ({employee_id})  
                                 **Time:** {current_time.strftime('%I:%M %p')}  
-                                **Status:** {status}  
+                                **Status:** {status} ({minutes_late} min after shift start)  
                                 **Photo:** Captured and saved
 
                                 Please ensure to arrive on time tomorrow.
-                                """)
+                                """, celebrate=True)
 
-                            st.balloons()
-
-                            # Reset states
+                            # Reset states; the result is shown on the fresh page
                             st.session_state.show_camera = False
                             st.session_state.check_in_clicked = False
                             st.session_state.captured_image = None
                             st.session_state.camera_ready = False
 
-                            time.sleep(2)
                             st.rerun()
             else:
                 # Camera access instructions
@@ -322,7 +252,7 @@ def show_attendance_checkin(n8n_base_url):
 
     with col1:
         if st.button("📅 View My Attendance", use_container_width=True, key="view_att"):
-            st.info("Feature coming soon!")
+            st.session_state.show_my_attendance = not st.session_state.get('show_my_attendance', False)
 
     with col2:
         if st.button("🏖️ Request Leave", use_container_width=True, key="req_leave"):
@@ -334,6 +264,14 @@ def show_attendance_checkin(n8n_base_url):
             st.session_state.current_page = 'overtime'
             st.rerun()
 
+    if st.session_state.get('show_my_attendance'):
+        # Imported on first use: it brings in the dashboard's attendance fetchers
+        from attendance_history import show_my_attendance
+
+        st.markdown("---")
+        st.subheader("📅 My Attendance")
+        show_my_attendance(n8n_base_url, employee_id, employee_name)
+
 
 if __name__ == "__main__":
     # For testing standalone
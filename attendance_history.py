@@ -0,0 +1,175 @@
+"""
+Attendance History Module
+"View My Attendance" on the check-in page. The live Attendance rows are
+partitioned by employee once per dataset version (Employee ID -> row
+positions) and frozen months are read with a filter on the Employee ID,
+so one person's history, monthly summary and on-time streaks cost time in
+that person's rows, not in the size of the sheet.
+"""
+
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from config import get_settings
+from data_service import fetch_attendance_data, fetch_live_rows
+from employee_directory import validate_employee
+from shift_rules import CHECKED_IN_STATUSES, get_rules
+from snapshot_cache import read_snapshots
+
+INDEX_CACHE_SIZE = 2  # Dataset versions kept partitioned
+HISTORY_COLUMNS = ['Employee ID', 'Date', 'Time', 'Status', 'Department']
+RECENT_CHECKINS = 10  # Check-ins listed under the summary
+
+_lock = threading.Lock()
+_partitions = OrderedDict()  # dataset version -> {Employee ID: row positions}
+
+
+def _partition(df):
+    ids = df['Employee ID'].astype(str).str.strip().str.upper()
+    return ids.groupby(ids, sort=False).indices
+
+
+def partition_for(df):
+    """Employee ID (upper case) -> row positions of a DataFrame, built once per df.attrs['version']"""
+    version = df.attrs.get('version')
+    if version is None:
+        return _partition(df)
+
+    with _lock:
+        partition = _partitions.get(version)
+        if partition is not None:
+            _partitions.move_to_end(version)
+            return partition
+
+    partition = _partition(df)
+    with _lock:
+        _partitions[version] = partition
+        while len(_partitions) > INDEX_CACHE_SIZE:
+            _partitions.popitem(last=False)
+    return partition
+
+
+def _select(df, employee_id):
+    """One employee's raw rows of a DataFrame (HISTORY_COLUMNS)"""
+    if df.empty or 'Employee ID' not in df.columns:
+        return pd.DataFrame(columns=HISTORY_COLUMNS)
+
+    positions = partition_for(df).get(str(employee_id).strip().upper(), np.empty(0, dtype=np.intp))
+    return df.iloc[positions].reindex(columns=HISTORY_COLUMNS)
+
+
+def _history(rows):
+    """
+    Rows one per day in date order, with Status re-evaluated under the shift
+    rules and 'Day' the shift date (as the rollups behind payroll count it)
+    """
+    rules = get_rules()
+    rows = rows.assign(Status=rules.statuses(rows),
+                       Day=pd.to_datetime(rules.shift_dates(rows), errors='coerce'))
+    rows = rows.dropna(subset=['Day']).sort_values('Day', kind='stable')
+    return rows.drop_duplicates('Day').reset_index(drop=True)  # First check-in of the day
+
+
+def employee_rows(df, employee_id):
+    """
+    One employee's check-ins, one per shift day in date order, with Status
+    re-evaluated under the shift rules and the shift date in 'Day'
+    """
+    return _history(_select(df, employee_id))
+
+
+def fetch_employee_rows(employee_id):
+    """
+    employee_rows() of the whole Attendance sheet: the employee's frozen
+    months filtered while they are read, their live rows picked from the
+    live copy the dashboard shares
+    """
+    if not get_settings().enable_snapshot_cache:
+        return employee_rows(fetch_attendance_data(), employee_id)
+
+    _, df_live = fetch_live_rows('attendance', 'admin/get-attendance')
+    ids = sorted({str(employee_id), str(employee_id).strip().upper()})
+    frozen = read_snapshots('attendance', columns=HISTORY_COLUMNS, filters=[('Employee ID', 'in', ids)])
+    live = _select(df_live, employee_id)
+    return _history(pd.concat([frozen.reindex(columns=HISTORY_COLUMNS), live], ignore_index=True)
+                    if not frozen.empty else live)
+
+
+def monthly_summary(rows):
+    """Days present, days late and on-time rate per month (newest first) of employee_rows()"""
+    checked_in = rows[rows['Status'].isin(CHECKED_IN_STATUSES)]
+    if checked_in.empty:
+        return pd.DataFrame(columns=['Month', 'Days Present', 'Days Late', 'On Time %'])
+
+    summary = checked_in.assign(Month=checked_in['Day'].dt.strftime('%Y-%m'),
+                                Late=checked_in['Status'].eq('Late')).groupby('Month').agg(
+        **{'Days Present': ('Day', 'size'), 'Days Late': ('Late', 'sum')})
+    summary['On Time %'] = (100 * (1 - summary['Days Late'] / summary['Days Present'])).round(1)
+    return summary.sort_index(ascending=False).reset_index()
+
+
+def streaks(rows, today=None):
+    """
+    (current, longest) runs of consecutive working days (Mon-Fri) checked in
+    on time; the current run still counts when today's check-in is not in yet
+    """
+    days = rows.loc[rows['Status'] == 'Present', 'Day'].to_numpy(dtype='datetime64[D]')
+    days = days[np.is_busday(days)]
+    if len(days) == 0:
+        return 0, 0
+
+    # A run breaks wherever the next on-time day is not the next working day
+    breaks = np.flatnonzero(np.busday_count(days[:-1], days[1:]) != 1) + 1
+    bounds = np.concatenate(([0], breaks, [len(days)]))
+    longest = int(np.diff(bounds).max())
+
+    today = np.datetime64(today or datetime.now().date(), 'D')
+    current = int(bounds[-1] - bounds[-2]) if np.busday_count(days[-1], today) <= 1 else 0
+    return current, longest
+
+
+# ==================== STREAMLIT WIDGETS ====================
+
+def show_my_attendance(n8n_base_url, employee_id, employee_name):
+    """Personal attendance summary, streaks and recent check-ins for one employee"""
+    if not employee_id or not employee_name:
+        st.warning("Enter your Employee ID and Name above to view your attendance.")
+        return
+
+    error = validate_employee(n8n_base_url, employee_id, employee_name)
+    if error:
+        st.error(f"❌ {error}")
+        return
+
+    with st.spinner("Loading your attendance..."):
+        rows = fetch_employee_rows(employee_id)
+
+    if rows.empty:
+        st.info(f"No attendance records found for {employee_id}.")
+        return
+
+    summary = monthly_summary(rows)
+    current, longest = streaks(rows)
+    this_month = summary[summary['Month'] == datetime.now().strftime('%Y-%m')]
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Days This Month", int(this_month['Days Present'].sum()))
+    with col2:
+        st.metric("Late This Month", int(this_month['Days Late'].sum()))
+    with col3:
+        st.metric("On-Time Streak", f"{current} days")
+    with col4:
+        st.metric("Best Streak", f"{longest} days")
+
+    st.markdown("**📊 Monthly Summary**")
+    st.dataframe(summary, use_container_width=True, hide_index=True)
+
+    st.markdown("**🕒 Recent Check-ins**")
+    recent = rows.tail(RECENT_CHECKINS).iloc[::-1]
+    st.dataframe(recent[['Date', 'Time', 'Status']].astype(str), use_container_width=True, hide_index=True)
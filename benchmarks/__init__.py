@@ -0,0 +1,4 @@
+"""
+Benchmark suite for the Enterprise Attendance System
+Run from the project root: python -m benchmarks.run_benchmarks --help
+"""
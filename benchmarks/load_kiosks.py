@@ -0,0 +1,145 @@
+"""
+Kiosk Load Generator
+Simulates N check-in kiosks posting to the attendance webhook at the same
+time through the app's own HTTP client and reports throughput and tail
+latency. Starts an in-process n8n stand-in unless --url is given:
+
+    python -m benchmarks.load_kiosks --kiosks 50 --checkins 20 --latency-ms 80 --error-rate 0.02
+    python -m benchmarks.load_kiosks --url http://localhost:5678/webhook --kiosks 20
+"""
+
+import argparse
+import base64
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import requests
+
+from benchmarks.n8n_standin import N8NStandIn, SheetStore
+from benchmarks.synthetic_data import generate_dataset
+from n8n_client import send_request
+
+
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] if values else 0.0
+
+
+def run_kiosk(base_url, kiosk, checkins, employees, image, think_ms, barrier):
+    """One kiosk: wait for the others, then check employees in back to back"""
+    latencies, errors = [], {}
+    barrier.wait()
+    for n in range(checkins):
+        employee = employees[(kiosk * checkins + n) % len(employees)]
+        now = datetime.now()
+        attendance_data = {
+            "Employee ID": employee['Employee ID'],
+            "Employee Name": employee['Employee Name'],
+            "Department": employee['Department'],
+            "Date": now.strftime("%Y-%m-%d"),
+            "Time": now.strftime("%I:%M %p"),
+            "Status": "Present",
+            "Image": f"data:image/jpeg;base64,{image}"
+        }
+
+        start = time.perf_counter()
+        try:
+            response = send_request(base_url, 'attendance', attendance_data)
+            if response.status_code != 200:
+                errors[f"http_{response.status_code}"] = errors.get(f"http_{response.status_code}", 0) + 1
+            else:
+                latencies.append(time.perf_counter() - start)
+        except requests.exceptions.RequestException as e:
+            errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+
+        if think_ms:
+            time.sleep(think_ms / 1000)
+    return latencies, errors
+
+
+def run_load(base_url, employees, kiosks=10, checkins=10, image_kb=60, think_ms=0):
+    """Run all kiosks concurrently and return a summary dict (latencies in ms)"""
+    image = base64.b64encode(os.urandom(image_kb * 1024)).decode()
+    barrier = threading.Barrier(kiosks)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=kiosks) as pool:
+        futures = [
+            pool.submit(run_kiosk, base_url, kiosk, checkins, employees, image, think_ms, barrier)
+            for kiosk in range(kiosks)
+        ]
+        results = [future.result() for future in futures]
+    elapsed = time.perf_counter() - started
+
+    latencies = [latency * 1000 for kiosk_latencies, _ in results for latency in kiosk_latencies]
+    errors = {}
+    for _, kiosk_errors in results:
+        for kind, count in kiosk_errors.items():
+            errors[kind] = errors.get(kind, 0) + count
+
+    return {
+        'kiosks': kiosks,
+        'checkins': kiosks * checkins,
+        'succeeded': len(latencies),
+        'errors': errors,
+        'elapsed_s': round(elapsed, 3),
+        'throughput_rps': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': round(_percentile(latencies, 0.50), 2),
+        'p95_ms': round(_percentile(latencies, 0.95), 2),
+        'p99_ms': round(_percentile(latencies, 0.99), 2),
+        'max_ms': round(max(latencies), 2) if latencies else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate concurrent check-in kiosks")
+    parser.add_argument('--url', help="webhook base URL (default: start a local n8n stand-in)")
+    parser.add_argument('--kiosks', type=int, default=10)
+    parser.add_argument('--checkins', type=int, default=10, help="check-ins per kiosk")
+    parser.add_argument('--image-kb', type=int, default=60, help="size of the photo sent with each check-in")
+    parser.add_argument('--think-ms', type=float, default=0, help="pause between check-ins on a kiosk")
+    parser.add_argument('--latency-ms', type=float, default=0, help="stand-in only")
+    parser.add_argument('--jitter-ms', type=float, default=0, help="stand-in only")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="stand-in only")
+    parser.add_argument('--json', action='store_true', help="print the summary as JSON")
+    args = parser.parse_args()
+
+    server = None
+    if args.url:
+        base_url = args.url
+        response = send_request(base_url, 'admin/get-employees', method='GET')
+        employees = response.json().get('data', [])
+    else:
+        sheets = generate_dataset(args.kiosks * args.checkins)
+        server = N8NStandIn(
+            SheetStore({'Employees': sheets['Employees']}),
+            latency_ms=args.latency_ms,
+            jitter_ms=args.jitter_ms,
+            error_rate=args.error_rate
+        ).start()
+        base_url = server.base_url
+        employees = server.store.sheets['Employees']
+
+    try:
+        summary = run_load(base_url, employees, args.kiosks, args.checkins, args.image_kb, args.think_ms)
+    finally:
+        if server is not None:
+            server.stop()
+
+    if args.json:
+        print(json.dumps(summary))
+        return
+
+    print(f"{summary['kiosks']} kiosks, {summary['checkins']} check-ins in {summary['elapsed_s']:.2f}s")
+    print(f"  succeeded:  {summary['succeeded']}  errors: {summary['errors'] or 'none'}")
+    print(f"  throughput: {summary['throughput_rps']:.1f} check-ins/s")
+    print(f"  latency:    p50 {summary['p50_ms']:.1f} ms  p95 {summary['p95_ms']:.1f} ms  "
+          f"p99 {summary['p99_ms']:.1f} ms  max {summary['max_ms']:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,365 @@
+"""
+n8n Stand-in Server
+Asyncio HTTP server implementing the webhook contract of the exported n8n
+workflow (including ?since=, ?format=columnar, conditional GETs and n8n's
+response compression) on top of an in-memory sheet store, for benchmarking
+and load testing the app without n8n or Google Sheets. With no latency it
+is the fetch benchmarks' server; latency, jitter and an error rate make it
+behave like a remote n8n for load tests:
+
+    python -m benchmarks.n8n_standin --port 5678 --seed-rows 10000 --latency-ms 80 --error-rate 0.01
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+import random
+import threading
+from datetime import datetime
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.synthetic_data import generate_dataset
+from wire_format import build_response
+
+try:
+    import zstandard
+    _has_zstandard = True
+except ImportError:
+    _has_zstandard = False
+
+SHEETS = ['Employees', 'Attendance', 'Leave_Requests', 'Overtime', 'Alerts', 'Payroll']
+
+REASONS = {200: 'OK', 304: 'Not Modified', 404: 'Not Found', 405: 'Method Not Allowed', 500: 'Internal Server Error'}
+
+# Bodies smaller than this are sent uncompressed (n8n's compression threshold)
+COMPRESS_MIN_BYTES = 1024
+
+
+def compress(body, accept_encoding):
+    """(body, Content-Encoding or None) for a client's Accept-Encoding header"""
+    accepted = {token.split(';')[0].strip() for token in accept_encoding.split(',')}
+    if len(body) < COMPRESS_MIN_BYTES:
+        return body, None
+    if _has_zstandard and 'zstd' in accepted:
+        return zstandard.ZstdCompressor().compress(body), 'zstd'
+    if 'gzip' in accepted:
+        return gzip.compress(body, compresslevel=6), 'gzip'
+    return body, None
+
+
+class SheetStore:
+    """In-memory stand-in for the Google Sheets the workflow reads and appends to"""
+
+    def __init__(self, sheets=None):
+        self.sheets = {name: [] for name in SHEETS}
+        for name, df in (sheets or {}).items():
+            self.sheets[name] = df.astype(str).to_dict('records')
+
+    def append(self, sheet, row):
+        self.sheets[sheet].append(row)
+
+    def rows(self, sheet, since=None, date_column='Date'):
+        rows = self.sheets[sheet]
+        if since:
+            rows = [row for row in rows if str(row.get(date_column, '')) >= since]
+        return rows
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.sheets, f)
+
+    @classmethod
+    def load(cls, path):
+        store = cls()
+        with open(path, encoding='utf-8') as f:
+            store.sheets.update(json.load(f))
+        return store
+
+
+# ==================== WEBHOOK CONTRACT ====================
+
+def _now():
+    return datetime.now()
+
+
+def _attendance(store, body, query, headers):
+    row = {column: body.get(column, '') for column in
+           ['Employee ID', 'Employee Name', 'Department', 'Date', 'Time', 'Status']}
+    row['Image'] = 'Image captured' if body.get('Image') else 'No image'
+    store.append('Attendance', row)
+    return {
+        'success': True,
+        'message': f"Attendance recorded for {row['Employee Name']}",
+        'timestamp': _now().isoformat(),
+        'employeeName': row['Employee Name'],
+        'employeeId': row['Employee ID'],
+        'status': row['Status'],
+    }
+
+
+def _register(store, body, query, headers):
+    store.append('Employees', dict(body))
+    return {
+        'success': True,
+        'message': f"Employee {body.get('Employee Name', '')} registered successfully",
+        'employeeId': body.get('Employee ID', ''),
+    }
+
+
+def _leave_request(store, body, query, headers):
+    store.append('Leave_Requests', dict(body))
+    return {'success': True, 'message': 'Leave request submitted successfully', 'status': 'Pending approval'}
+
+
+def _log_overtime(store, body, query, headers):
+    row = dict(body)
+    # Same fallback as the "Format Overtime Data" node when the app sends no pay
+    if not row.get('Overtime Pay'):
+        rate = float(row.get('Hourly Rate') or 0)
+        row['Overtime Rate'] = rate * 1.5
+        row['Overtime Pay'] = float(row.get('Overtime Hours') or 0) * rate * 1.5
+    store.append('Overtime', row)
+    return {'success': True, 'message': 'Overtime logged successfully'}
+
+
+def _approve_leave(store, body, query, headers):
+    for row in store.sheets['Leave_Requests']:
+        if row.get('Leave ID') == body.get('Leave ID'):
+            row.update({
+                'Status': body.get('Status', 'Approved'),
+                'Approved By': body.get('Approved By', 'Admin'),
+                'Approved Date': _now().strftime('%Y-%m-%d'),
+            })
+            return {'success': True, 'message': 'Leave request updated successfully'}
+    return {'success': False, 'message': f"Leave ID {body.get('Leave ID')} not found"}
+
+
+def _generate_payroll(store, body, query, headers):
+    rows = body.get('payroll') or []
+    store.sheets['Payroll'].extend(rows)
+    return {'success': True, 'message': 'Payroll generated successfully', 'records': len(rows)}
+
+
+def _check_alerts(store, body, query, headers):
+    # Like the workflow: the app evaluates late / absent, this only saves its alerts
+    alerts = body.get('alerts') or []
+    store.sheets['Alerts'].extend(alerts)
+    return {'success': True, 'message': 'Alert check completed', 'alerts_found': len(alerts)}
+
+
+def _reader(sheet, incremental=False):
+    def read(store, body, query, headers):
+        since = query.get('since', [None])[0] if incremental else None
+        status, response, etag = build_response(store.rows(sheet, since=since), query.get('format', [None])[0],
+                                                int(query.get('after_row', [0])[0]), headers.get('if-none-match'))
+        return status, response, {'ETag': etag}
+    return read
+
+
+def _get_stats(store, body, query, headers):
+    today = _now().strftime('%Y-%m-%d')
+    attendance = store.rows('Attendance', since=today)
+    return {
+        'total_employees': len(store.sheets['Employees']),
+        'present_today': len(attendance),
+        'pending_leave': sum(row.get('Status') == 'Pending' for row in store.sheets['Leave_Requests']),
+        'late_arrivals': sum(row.get('Status') == 'Late' for row in attendance),
+    }
+
+
+# (method, webhook path) -> handler(store, body, query, headers) returning the JSON
+# response, or (status, JSON response or None, extra response headers)
+ROUTES = {
+    ('POST', 'attendance'): _attendance,
+    ('POST', 'employee/register'): _register,
+    ('POST', 'leave/request'): _leave_request,
+    ('POST', 'overtime/log'): _log_overtime,
+    ('POST', 'admin/approve-leave'): _approve_leave,
+    ('POST', 'admin/generate-payroll'): _generate_payroll,
+    ('POST', 'admin/check-alerts'): _check_alerts,
+    ('GET', 'admin/get-attendance'): _reader('Attendance', incremental=True),
+    ('GET', 'admin/get-overtime'): _reader('Overtime', incremental=True),
+    ('GET', 'admin/get-leave'): _reader('Leave_Requests'),
+    ('GET', 'admin/get-employees'): _reader('Employees'),
+    ('GET', 'admin/get-alerts'): _reader('Alerts'),
+    ('GET', 'admin/get-stats'): _get_stats,
+}
+
+
+# ==================== HTTP SERVER ====================
+
+class N8NStandIn:
+    """
+    Serve ROUTES under /webhook/ from a SheetStore
+
+    latency_ms / jitter_ms: delay added before every response (uniform jitter)
+    error_rate: fraction of requests answered with HTTP 500
+
+    Encoded GET responses are kept until the next POST (which may write to the
+    store), so repeated reads time the client rather than the encoding here.
+    """
+
+    def __init__(self, store=None, host='127.0.0.1', port=0, latency_ms=0, jitter_ms=0, error_rate=0.0, seed=None):
+        self.store = store or SheetStore()
+        self.host = host
+        self.port = port
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.requests_served = 0
+        self.errors_injected = 0
+        self._random = random.Random(seed)
+        self._responses = {}  # (target, If-None-Match, Accept-Encoding) -> encoded GET response
+        self._loop = None
+        self._server = None
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}/webhook"
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, _ = request_line.decode('latin-1').split(' ', 2)
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get('content-length', 0))
+                raw_body = await reader.readexactly(length) if length else b''
+
+                status, body, extra_headers = await self._dispatch(method, target, raw_body, headers)
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                header_lines = "".join(f"{name}: {value}\r\n" for name, value in extra_headers.items())
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                    f"Content-Type: application/json\r\n{header_lines}"
+                    f"Content-Length: {len(body)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + body
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method, target, raw_body, headers):
+        """(status, encoded body, extra response headers) of one request"""
+        self.requests_served += 1
+        delay = self.latency_ms + self._random.uniform(0, self.jitter_ms)
+        if delay:
+            await asyncio.sleep(delay / 1000)
+
+        url = urlparse(target)
+        handler = ROUTES.get((method, url.path.removeprefix('/webhook/')))
+        if handler is None:
+            message = f"The requested webhook \"{method} {url.path}\" is not registered."
+            return self._encode(404, {'code': 404, 'message': message}, {}, headers)
+        if self.error_rate and self._random.random() < self.error_rate:
+            self.errors_injected += 1
+            return self._encode(500, {'code': 500, 'message': 'Error in workflow (injected)'}, {}, headers)
+
+        key = (target, headers.get('if-none-match'), headers.get('accept-encoding', ''))
+        if method == 'GET' and key in self._responses:
+            return self._responses[key]
+        if method != 'GET':
+            self._responses.clear()
+
+        try:
+            body = json.loads(raw_body) if raw_body else {}
+        except ValueError:
+            body = {}
+        # Handlers are synchronous and run on the event loop, so the store needs no lock
+        result = handler(self.store, body, parse_qs(url.query), headers)
+        response = self._encode(*(result if isinstance(result, tuple) else (200, result, {})), headers)
+        if method == 'GET':
+            self._responses[key] = response
+        return response
+
+    @staticmethod
+    def _encode(status, payload, extra_headers, headers):
+        body = json.dumps(payload).encode() if payload is not None else b''
+        body, encoding = compress(body, headers.get('accept-encoding', ''))
+        if encoding:
+            extra_headers = {**extra_headers, 'Content-Encoding': encoding}
+        return status, body, extra_headers
+
+    async def _listen(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve(self):
+        """Serve until cancelled (foreground use)"""
+        await self._listen()
+        async with self._server:
+            await self._server.serve_forever()
+
+    def start(self):
+        """Run the server on a background event loop thread; returns once listening"""
+        ready = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self._listen())
+            ready.set()
+            self._loop.run_forever()
+
+        threading.Thread(target=run, daemon=True).start()
+        ready.wait()
+        return self
+
+    def stop(self):
+        if self._loop is None:
+            return
+
+        async def shutdown():
+            self._server.close()
+            await self._server.wait_closed()
+
+        asyncio.run_coroutine_threadsafe(shutdown(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the n8n webhooks")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5678)
+    parser.add_argument('--seed-rows', type=int, default=0, help="fill the store with synthetic sheets")
+    parser.add_argument('--store', help="JSON file to load the store from and save it to on exit")
+    parser.add_argument('--latency-ms', type=float, default=0)
+    parser.add_argument('--jitter-ms', type=float, default=0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    args = parser.parse_args()
+
+    if args.store and not args.seed_rows:
+        try:
+            store = SheetStore.load(args.store)
+        except FileNotFoundError:
+            store = SheetStore()
+    else:
+        store = SheetStore(generate_dataset(args.seed_rows) if args.seed_rows else None)
+
+    server = N8NStandIn(store, args.host, args.port, args.latency_ms, args.jitter_ms, args.error_rate)
+    print(f"n8n stand-in listening on http://{args.host}:{args.port}/webhook")
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if args.store:
+            store.save(args.store)
+
+
+if __name__ == "__main__":
+    main()
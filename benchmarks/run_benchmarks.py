@@ -0,0 +1,182 @@
+"""
+Benchmark Runner
+Times the data paths of the app against the n8n stand-in server loaded with
+synthetic sheets and prints one JSON object per benchmark (JSON lines):
+
+    python -m benchmarks.run_benchmarks --sizes 1k,100k --output bench.jsonl
+    python -m benchmarks.run_benchmarks --compare bench.jsonl
+
+With --compare, results are checked against a baseline file and the run
+exits with status 1 if any median regressed by more than --threshold.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+
+from benchmarks.n8n_standin import N8NStandIn, SheetStore
+from benchmarks.synthetic_data import SIZES, generate_dataset
+from config import update_settings
+
+# Keep snapshot / rollup / shared caches and scheduler state out of the
+# working tree (settings were loaded when config was imported, so they are
+# replaced here rather than through the environment)
+_cache_dir = tempfile.mkdtemp(prefix='attendance-bench-')
+update_settings(
+    snapshot_cache_dir=os.path.join(_cache_dir, 'snapshots'),
+    rollup_cache_path=os.path.join(_cache_dir, 'rollups.pkl'),
+    shared_cache_path=os.path.join(_cache_dir, 'shared_cache.sqlite'),
+    scheduler_state_path=os.path.join(_cache_dir, 'scheduler.json'),
+)
+
+
+def timed(fn, repeat):
+    """Run fn repeat times, return the timings in ms"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def run_size(label, rows, repeat, include_image):
+    # Imported here so the cache paths above (and the stand-in URL) are in place first
+    import data_service
+    import pandas as pd
+    from config import APP_VERSION
+    from leave_request import calculate_working_days
+    from payroll import calculate_monthly_payroll, previous_month
+    from rollups import refresh_rollups, reset_rollups
+    from snapshot_cache import clear_snapshots
+
+    sheets = generate_dataset(rows)
+    server = N8NStandIn(SheetStore(sheets)).start()
+    # Fetch benchmarks measure the n8n round trip and decode, not shared cache
+    # hits or 304s (those get their own benchmark)
+    update_settings(n8n_base_url=server.base_url, enable_shared_cache=False, enable_delta_sync=False)
+
+    def fetch_and_clean(fetch):
+        return lambda: data_service.clean_dataframe_for_display(fetch())
+
+    def fetch_attendance_live(columnar=True, delta_sync=False):
+        def fetch():
+            update_settings(enable_snapshot_cache=False, enable_columnar_format=columnar, enable_delta_sync=delta_sync)
+            try:
+                data_service.clean_dataframe_for_display(data_service.fetch_attendance_data())
+            finally:
+                update_settings(enable_snapshot_cache=True, enable_columnar_format=True, enable_delta_sync=False)
+        return fetch
+
+    df_attendance = data_service.fetch_attendance_data()  # Freezes closed months
+    fetch_attendance_live(delta_sync=True)()  # Holds the copy the "not modified" benchmark revalidates
+    df_overtime = data_service.fetch_overtime_data()
+    df_alerts = data_service.fetch_alerts_data()
+    leave_ranges = [
+        (pd.Timestamp(start).date(), pd.Timestamp(end).date())
+        for start, end in sheets['Leave_Requests'][['Start Date', 'End Date']].head(10_000).itertuples(index=False)
+    ]
+
+    def payroll():
+        reset_rollups()
+        refresh_rollups(df_attendance)
+        calculate_monthly_payroll(previous_month(), df_overtime=df_overtime)
+
+    benchmarks = {
+        'fetch_attendance+clean (live)': fetch_attendance_live(),
+        'fetch_attendance+clean (live, row format)': fetch_attendance_live(columnar=False),
+        'fetch_attendance+clean (live, not modified)': fetch_attendance_live(delta_sync=True),
+        'fetch_attendance+clean (snapshots)': fetch_and_clean(data_service.fetch_attendance_data),
+        'fetch_overtime+clean': fetch_and_clean(data_service.fetch_overtime_data),
+        'fetch_leave+clean': fetch_and_clean(data_service.fetch_leave_data),
+        'fetch_employees+clean': fetch_and_clean(data_service.fetch_employee_data),
+        'fetch_alerts+clean': fetch_and_clean(data_service.fetch_alerts_data),
+        'dashboard_filter': lambda: data_service.filter_attendance(df_attendance, 'IT', 'doe'),
+        'calculate_working_days (10k ranges)': lambda: [calculate_working_days(s, e) for s, e in leave_ranges],
+        'payroll (rollups rebuild)': payroll,
+        'alerts_today_filter': lambda: data_service.filter_today_alerts(df_alerts),
+    }
+
+    if include_image:
+        from PIL import Image
+        from attendance_checkin import image_to_base64
+
+        pixels = np.random.default_rng(0).integers(0, 255, (720, 1280, 3), dtype=np.uint8)
+        benchmarks['image_to_base64 (1280x720)'] = lambda: image_to_base64(Image.fromarray(pixels))
+
+    results = []
+    try:
+        for name, fn in benchmarks.items():
+            timings = timed(fn, repeat)
+            results.append({
+                'benchmark': name,
+                'size': label,
+                'rows': rows,
+                'repeat': repeat,
+                'min_ms': round(min(timings), 3),
+                'median_ms': round(statistics.median(timings), 3),
+                'max_ms': round(max(timings), 3),
+                'version': APP_VERSION,
+                'python': platform.python_version(),
+                'pandas': pd.__version__,
+                'ts': datetime.now().isoformat(timespec='seconds'),
+            })
+    finally:
+        server.stop()
+        clear_snapshots('attendance')
+        clear_snapshots('overtime')
+    return results
+
+
+def compare(results, baseline_path, threshold):
+    """Print the change against a baseline; return True if nothing regressed"""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = {(r['benchmark'], r['size']): r for r in map(json.loads, f)}
+
+    ok = True
+    for result in results:
+        before = baseline.get((result['benchmark'], result['size']))
+        if not before or not before['median_ms']:
+            continue
+        ratio = result['median_ms'] / before['median_ms']
+        flag = 'REGRESSION' if ratio > threshold else ''
+        ok = ok and ratio <= threshold
+        print(f"{result['size']:>6} {result['benchmark']:<40} {before['median_ms']:>10.2f} -> "
+              f"{result['median_ms']:>10.2f} ms  x{ratio:.2f} {flag}", file=sys.stderr)
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Enterprise Attendance System benchmarks")
+    parser.add_argument('--sizes', default='1k,100k', help=f"comma separated, from {', '.join(SIZES)}")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help="write JSON lines here instead of stdout")
+    parser.add_argument('--compare', help="baseline JSON lines file to compare against")
+    parser.add_argument('--threshold', type=float, default=1.25, help="max allowed median ratio vs baseline")
+    args = parser.parse_args()
+
+    results = []
+    for index, label in enumerate(args.sizes.split(',')):
+        results.extend(run_size(label, SIZES[label], args.repeat, include_image=index == 0))
+
+    lines = "".join(json.dumps(result) + "\n" for result in results)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(lines)
+    else:
+        sys.stdout.write(lines)
+
+    if args.compare and not compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
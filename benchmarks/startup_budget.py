@@ -0,0 +1,135 @@
+"""
+Startup Budget
+Measures the cold start (first run of main.py in a fresh interpreter) and the
+per-rerun time of each page against a local n8n stand-in, and fails when a
+page goes over its budget:
+
+    python -m benchmarks.startup_budget
+    python -m benchmarks.startup_budget --pages dashboard,checkin --reruns 10 --json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Milliseconds, against the 1,000-row stand-in dataset; cold start covers
+# importing the app's modules for the page (register / leave / check-in / kiosk
+# load no pandas)
+BUDGETS_MS = {
+    'cold_start': {
+        'dashboard': 4500,
+        'register': 600,
+        'checkin': 1000,
+        'leave_request': 600,
+        'overtime': 1000,
+        'kiosk': 600,
+    },
+    'rerun': {
+        'dashboard': 4000,
+        'register': 100,
+        'checkin': 100,
+        'leave_request': 100,
+        'overtime': 100,
+        'kiosk': 100,
+    },
+}
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure_page(page, reruns):
+    """Runs in a fresh interpreter: first run and reruns of main.py for one page"""
+    from streamlit.testing.v1 import AppTest  # Harness import is not part of the app's cold start
+
+    modules_before = set(sys.modules)
+    at = AppTest.from_file(os.path.join(PROJECT_ROOT, 'main.py'), default_timeout=120)
+    at.session_state['current_page'] = page
+
+    start = time.perf_counter()
+    at.run()
+    cold_ms = (time.perf_counter() - start) * 1000
+    loaded = set(sys.modules) - modules_before
+
+    timings = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        at.run()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    return {
+        'page': page,
+        'cold_start_ms': round(cold_ms, 1),
+        'rerun_ms': round(statistics.median(timings), 1) if timings else None,
+        'modules_loaded': len(loaded),
+        'pandas_loaded': 'pandas' in loaded,
+        'PIL_loaded': 'PIL' in loaded,
+        'exceptions': [str(e.value) for e in at.exception],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold start / rerun time budget per page")
+    parser.add_argument('--pages', default=','.join(BUDGETS_MS['cold_start']))
+    parser.add_argument('--reruns', type=int, default=5)
+    parser.add_argument('--json', action='store_true', help="print one JSON object per page")
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure_page(args.child, args.reruns)))
+        return
+
+    from benchmarks.n8n_standin import N8NStandIn, SheetStore
+    from benchmarks.synthetic_data import generate_dataset
+
+    server = N8NStandIn(SheetStore(generate_dataset(1_000))).start()
+    cache_dir = tempfile.mkdtemp(prefix='attendance-startup-')
+    env = dict(
+        os.environ,
+        N8N_BASE_URL=server.base_url,
+        GOOGLE_SHEET_ID=os.getenv('GOOGLE_SHEET_ID', 'benchmark'),
+        SNAPSHOT_CACHE_DIR=os.path.join(cache_dir, 'snapshots'),
+        ROLLUP_CACHE_PATH=os.path.join(cache_dir, 'rollups.pkl'),
+        SHARED_CACHE_PATH=os.path.join(cache_dir, 'shared_cache.sqlite'),
+        SCHEDULER_STATE_PATH=os.path.join(cache_dir, 'scheduler.json'),
+        ENABLE_SCHEDULER='false',
+    )
+
+    over_budget = []
+    try:
+        for page in args.pages.split(','):
+            child = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.startup_budget', '--child', page, '--reruns', str(args.reruns)],
+                cwd=PROJECT_ROOT, env=env, capture_output=True, text=True, check=True
+            )
+            result = json.loads(child.stdout.strip().splitlines()[-1])
+            result['cold_start_budget_ms'] = BUDGETS_MS['cold_start'].get(page)
+            result['rerun_budget_ms'] = BUDGETS_MS['rerun'].get(page)
+
+            for kind in ('cold_start', 'rerun'):
+                budget = result[f'{kind}_budget_ms']
+                if budget and result[f'{kind}_ms'] is not None and result[f'{kind}_ms'] > budget:
+                    over_budget.append(f"{page} {kind}: {result[f'{kind}_ms']:.0f} ms > {budget} ms")
+
+            if args.json:
+                print(json.dumps(result))
+            else:
+                print(f"{page:<14} cold {result['cold_start_ms']:>8.1f} ms (budget {result['cold_start_budget_ms']})  "
+                      f"rerun {result['rerun_ms']:>7.1f} ms (budget {result['rerun_budget_ms']})  "
+                      f"modules {result['modules_loaded']:>4}  pandas {result['pandas_loaded']}  PIL {result['PIL_loaded']}")
+    finally:
+        server.stop()
+
+    for line in over_budget:
+        print(f"OVER BUDGET: {line}", file=sys.stderr)
+    if over_budget:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
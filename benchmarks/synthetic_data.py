@@ -0,0 +1,140 @@
+"""
+Synthetic Data Generator
+Builds Employees, Attendance, Leave_Requests, Overtime and Alerts sheets with
+the same columns the n8n "Format ... Response" nodes return
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from config import DEPARTMENTS
+
+SIZES = {
+    '1k': 1_000,
+    '100k': 100_000,
+    '1m': 1_000_000,
+}
+
+FIRST_NAMES = ['John', 'Jane', 'Ali', 'Maria', 'Wei', 'Fatima', 'Carlos', 'Aisha', 'Omar', 'Sara',
+               'David', 'Priya', 'Lucas', 'Emma', 'Yusuf', 'Chloe', 'Ivan', 'Nadia', 'Kenji', 'Zara']
+LAST_NAMES = ['Doe', 'Smith', 'Khan', 'Garcia', 'Chen', 'Ahmed', 'Silva', 'Brown', 'Ali', 'Lopez',
+              'Kim', 'Patel', 'Rossi', 'Muller', 'Nowak', 'Sato', 'Haddad', 'Jones', 'Costa', 'Ivanova']
+LEAVE_TYPES = ['Annual Leave', 'Sick Leave', 'Emergency Leave', 'Unpaid Leave', 'Compensatory Leave']
+
+
+def _dates(rng, n, days_back=365, end=None):
+    """n ISO dates in ascending order over the last days_back days (append-only sheets)"""
+    end = end or datetime.now()
+    offsets = np.sort(rng.integers(0, days_back, n))[::-1]
+    base = np.datetime64(end.strftime('%Y-%m-%d'))
+    return (base - offsets.astype('timedelta64[D]')).astype(str)
+
+
+def _times(rng, n, start_hour=8, span_minutes=120):
+    minutes = start_hour * 60 + rng.integers(0, span_minutes, n)
+    hours, minutes = np.divmod(minutes, 60)
+    suffix = np.where(hours < 12, 'AM', 'PM')
+    hours12 = np.where(hours % 12 == 0, 12, hours % 12)
+    return [f"{h:02d}:{m:02d} {s}" for h, m, s in zip(hours12, minutes, suffix)]
+
+
+def generate_employees(n, rng):
+    ids = np.array([f"E{i:03d}" for i in range(1, n + 1)])
+    names = [f"{FIRST_NAMES[a]} {LAST_NAMES[b]}" for a, b in zip(rng.integers(0, 20, n), rng.integers(0, 20, n))]
+    return pd.DataFrame({
+        'Employee ID': ids,
+        'Employee Name': names,
+        'Department': rng.choice(DEPARTMENTS, n),
+        'Hire Date': _dates(rng, n, days_back=3650),
+        'Email': [f"{employee_id.lower()}@company.com" for employee_id in ids],
+        'Phone': 'N/A',
+        'Hourly Rate': rng.integers(15, 45, n).astype(float),
+    })
+
+
+def _pick_employees(employees, n, rng):
+    return employees.iloc[rng.integers(0, len(employees), n)].reset_index(drop=True)
+
+
+def generate_attendance(n, employees, rng):
+    picked = _pick_employees(employees, n, rng)
+    late = rng.random(n) < 0.15
+    return pd.DataFrame({
+        'Employee ID': picked['Employee ID'],
+        'Employee Name': picked['Employee Name'],
+        'Department': picked['Department'],
+        'Date': _dates(rng, n),
+        'Time': _times(rng, n),
+        'Status': np.where(late, 'Late', 'Present'),
+    })
+
+
+def generate_leave(n, employees, rng):
+    picked = _pick_employees(employees, n, rng)
+    start = pd.to_datetime(_dates(rng, n, days_back=365, end=datetime.now() + timedelta(days=60)))
+    length = rng.integers(0, 10, n)
+    end = start + pd.to_timedelta(length, unit='D')
+    return pd.DataFrame({
+        'Leave ID': [f"L{i:09d}" for i in range(n)],
+        'Employee ID': picked['Employee ID'],
+        'Employee Name': picked['Employee Name'],
+        'Leave Type': rng.choice(LEAVE_TYPES, n),
+        'Start Date': start.strftime('%Y-%m-%d'),
+        'End Date': end.strftime('%Y-%m-%d'),
+        'Days': length + 1,
+        'Reason': 'Synthetic leave request',
+        'Status': rng.choice(['Pending', 'Approved', 'Rejected'], n, p=[0.2, 0.7, 0.1]),
+        'Approved By': '',
+        'Approved Date': '',
+    })
+
+
+def generate_overtime(n, employees, rng):
+    picked = _pick_employees(employees, n, rng)
+    hours = rng.integers(1, 13, n) / 2
+    rate = picked['Hourly Rate'].to_numpy()
+    return pd.DataFrame({
+        'Employee ID': picked['Employee ID'],
+        'Employee Name': picked['Employee Name'],
+        'Date': _dates(rng, n),
+        'Regular Hours': 8,
+        'Overtime Hours': hours,
+        'Regular Rate': rate,
+        'Overtime Rate': rate * 1.5,
+        'Overtime Pay': (hours * rate * 1.5).round(2),
+        'Reason': 'Synthetic overtime',
+        'Approved By': 'Pending',
+    })
+
+
+def generate_alerts(n, employees, rng):
+    picked = _pick_employees(employees, n, rng)
+    absent = rng.random(n) < 0.4
+    dates = pd.to_datetime(_dates(rng, n, days_back=90))
+    return pd.DataFrame({
+        'Alert Type': np.where(absent, 'ABSENT', 'LATE'),
+        'Employee ID': picked['Employee ID'],
+        'Employee Name': picked['Employee Name'],
+        'Department': picked['Department'],
+        'Email': picked['Email'],
+        # The n8n alert node writes en-US dates (M/D/YYYY)
+        'Date': [f"{d.month}/{d.day}/{d.year}" for d in dates],
+        'Time': _times(rng, n, start_hour=10, span_minutes=5),
+        'Message': np.where(absent, 'has not checked in', 'arrived late'),
+        'Severity': np.where(absent, 'HIGH', 'MEDIUM'),
+    })
+
+
+def generate_dataset(rows, seed=42):
+    """All five sheets for a benchmark size (rows per transactional sheet)"""
+    rng = np.random.default_rng(seed)
+    employees = generate_employees(max(20, rows // 100), rng)
+    return {
+        'Employees': employees,
+        'Attendance': generate_attendance(rows, employees, rng),
+        'Leave_Requests': generate_leave(rows, employees, rng),
+        'Overtime': generate_overtime(rows, employees, rng),
+        'Alerts': generate_alerts(rows, employees, rng),
+    }
@@ -6,10 +6,23 @@ IMPORTANT FOR GITHUB USERS:
 - DO NOT commit your actual n8n URL to GitHub
 - Use Streamlit Secrets for sensitive data
 - See README.md for setup instructions
+
+Every value below is a field of the frozen Settings object. It is loaded once
+per process from these defaults, then settings.toml, then environment
+variables (the field name in upper case), then Streamlit secrets, and it is
+reloaded when settings.toml or .streamlit/secrets.toml changes. Call
+get_settings() to read current values; the upper-case constants at the
+bottom keep the values loaded at startup.
 """
 
+import json
+import logging
 import os
-from typing import Literal
+import threading
+import time
+from dataclasses import dataclass, field, fields, replace
+from types import MappingProxyType
+from typing import Literal, Optional
 
 # Import streamlit only when needed to avoid circular imports
 try:
@@ -19,98 +32,425 @@ try:
 except ImportError:
     _has_streamlit = False
 
-# ============================================================================
-# SECURITY: n8n Configuration
-# ============================================================================
-# For local development: Create .streamlit/secrets.toml with your n8n URL
-# For production: Use Streamlit Cloud Secrets
-#
-# GitHub Users: This file has placeholders. Add your actual values to secrets.toml
-# Format: https://your-n8n-domain.com/webhook
-# ============================================================================
+# tomllib is in the standard library from Python 3.11
+try:
+    import tomllib
 
-# Try to get n8n URL from Streamlit secrets first
-N8N_BASE_URL = "YOUR_N8N_URL_HERE"  # Default placeholder
+    _has_tomllib = True
+except ImportError:
+    _has_tomllib = False
 
-if _has_streamlit:
-    try:
-        N8N_BASE_URL = st.secrets["n8n"]["base_url"]
-    except (KeyError, FileNotFoundError, AttributeError):
-        # Try environment variable
-        N8N_BASE_URL = os.getenv('N8N_BASE_URL', 'YOUR_N8N_URL_HERE')
-else:
-    N8N_BASE_URL = os.getenv('N8N_BASE_URL', 'YOUR_N8N_URL_HERE')
+logger = logging.getLogger(__name__)
 
-# ============================================================================
-# Google Sheets Configuration
-# ============================================================================
-# GitHub Users: Add your Google Sheet ID to secrets.toml
-# Found in URL: docs.google.com/spreadsheets/d/[THIS_IS_THE_ID]/edit
-# ============================================================================
+# Flat TOML file of field names and values, e.g. api_read_timeout = 20
+SETTINGS_PATH = os.getenv('SETTINGS_PATH', 'settings.toml')
+SECRETS_PATH = os.path.join('.streamlit', 'secrets.toml')
+SETTINGS_CHECK_INTERVAL = 2  # seconds between checks for changed files
 
-GOOGLE_SHEET_ID = "YOUR_SHEET_ID_HERE"  # Default placeholder
 
-if _has_streamlit:
-    try:
-        GOOGLE_SHEET_ID = st.secrets["google_sheets"]["sheet_id"]
-    except (KeyError, FileNotFoundError, AttributeError):
-        GOOGLE_SHEET_ID = os.getenv('GOOGLE_SHEET_ID', 'YOUR_SHEET_ID_HERE')
-else:
-    GOOGLE_SHEET_ID = os.getenv('GOOGLE_SHEET_ID', 'YOUR_SHEET_ID_HERE')
+@dataclass(frozen=True)
+class Settings:
+    """
+    Typed, read-only application settings
 
-# ============================================================================
-# Application Settings
-# ============================================================================
-# These are safe to keep as-is or customize for your needs
-DEFAULT_NEXT_EMPLOYEE_ID = 21  # Starting employee ID number
-WORKING_HOURS_PER_DAY = 8
-TAX_RATE = 0.15  # 15% tax
-LATE_CUTOFF_TIME = "09:30"  # Late after 9:30 AM
+    Applied on the next call after a reload: n8n URL, timeouts, tax rate,
+    hourly rates, overtime policy, departments, shift schedules, leave
+    policy, cache paths and TTLs, job history and schedule timing. Read
+    once at startup (restart to apply): pool sizes, page setup and
+    dashboard refresh intervals.
+    """
 
-# ============================================================================
-# Department Options
-# ============================================================================
-# GitHub Users: Customize this list for your organization
-DEPARTMENTS = [
-    "IT",
-    "HR",
-    "Finance",
-    "Marketing",
-    "Sales",
-    "Operations",
-    "Customer Service"
-]
+    # ============================================================================
+    # SECURITY: n8n Configuration
+    # ============================================================================
+    # For local development: Create .streamlit/secrets.toml with your n8n URL
+    # For production: Use Streamlit Cloud Secrets
+    #
+    # GitHub Users: This file has placeholders. Add your actual values to secrets.toml
+    # Format: https://your-n8n-domain.com/webhook
+    # ============================================================================
+    n8n_base_url: str = "YOUR_N8N_URL_HERE"  # Default placeholder
 
-# ============================================================================
-# Default Hourly Rates (optional - customize or remove)
-# ============================================================================
-DEFAULT_HOURLY_RATES = {
-    'E001': 25.00,
-    'E002': 20.00,
-    'E003': 28.00,
-    'E004': 22.00,
-    'E005': 30.00,
-    # Add more as needed
-}
+    # ============================================================================
+    # Google Sheets Configuration
+    # ============================================================================
+    # GitHub Users: Add your Google Sheet ID to secrets.toml
+    # Found in URL: docs.google.com/spreadsheets/d/[THIS_IS_THE_ID]/edit
+    # ============================================================================
+    google_sheet_id: str = "YOUR_SHEET_ID_HERE"  # Default placeholder
 
-# ============================================================================
-# API Settings
-# ============================================================================
-API_TIMEOUT = 10  # seconds
-MAX_RETRIES = 3
+    # ============================================================================
+    # Application Settings
+    # ============================================================================
+    # These are safe to keep as-is or customize for your needs
+    default_next_employee_id: int = 21  # Starting employee ID number
+    working_hours_per_day: int = 8
+    tax_rate: float = 0.15  # 15% tax
+    late_cutoff_time: str = "09:30"  # Late after 9:30 AM (employees without a shift)
+
+    # ============================================================================
+    # Shift Schedules
+    # ============================================================================
+    # Named shifts: start (HH:MM), grace_minutes after the start before a
+    # check-in is late, and checkin_from, the clock time the shift's check-ins
+    # count from (needed when a shift crosses midnight, so that a 00:30 check-in
+    # is 2.5 hours late for the previous evening's 22:00 shift)
+    shifts: dict = field(default_factory=lambda: {
+        'morning': {'start': '09:00', 'grace_minutes': 30},
+        'night': {'start': '22:00', 'grace_minutes': 15, 'checkin_from': '12:00'},
+    })
+    department_shifts: dict = field(default_factory=dict)  # Department -> shift name
+    employee_shifts: dict = field(default_factory=dict)  # Employee ID -> shift name (over the department's)
+
+    # ============================================================================
+    # Leave Policy
+    # ============================================================================
+    # Share of a department that may be on leave (approved or pending) on any
+    # one day before a request or approval gets a coverage warning
+    max_department_on_leave: float = 0.25
+
+    # ============================================================================
+    # Department Options
+    # ============================================================================
+    # GitHub Users: Customize this list for your organization
+    departments: tuple = (
+        "IT",
+        "HR",
+        "Finance",
+        "Marketing",
+        "Sales",
+        "Operations",
+        "Customer Service"
+    )
+
+    # ============================================================================
+    # Default Hourly Rates (optional - customize or remove)
+    # ============================================================================
+    default_hourly_rates: dict = field(default_factory=lambda: {
+        'E001': 25.00,
+        'E002': 20.00,
+        'E003': 28.00,
+        'E004': 22.00,
+        'E005': 30.00,
+        # Add more as needed
+    })
+
+    # ============================================================================
+    # Overtime Policy
+    # ============================================================================
+    # Multipliers apply to the employee's regular hourly rate
+    overtime_policy: dict = field(default_factory=lambda: {
+        'multiplier': 1.5,  # Standard weekday overtime
+        'weekend_multiplier': 2.0,  # Saturday / Sunday
+        'holiday_multiplier': 2.5,  # Dates listed in holidays
+        'double_time_multiplier': 2.0,  # Overtime beyond double_time_after_hours in a day
+        'double_time_after_hours': 4.0,
+        'max_hours_per_day': 8.0,  # Hours beyond the caps are not paid
+        'max_hours_per_week': 20.0,
+    })
+
+    # Public holidays (YYYY-MM-DD) paid at the holiday multiplier
+    holidays: tuple = ()
+
+    # ============================================================================
+    # API Settings
+    # ============================================================================
+    api_connect_timeout: float = 3  # seconds to open the connection to n8n
+    api_read_timeout: float = 10  # seconds to wait for n8n's response
+    max_retries: int = 3  # Retries for idempotent calls (GETs)
+    retry_backoff_base: float = 0.5  # seconds; doubles on every retry, with full jitter
+    retry_backoff_max: float = 8
+
+    # Per-endpoint circuit breaker: after this many consecutive failures calls
+    # fail fast for circuit_reset_timeout seconds, then a single probe is let through
+    circuit_failure_threshold: int = 5
+    circuit_reset_timeout: float = 30  # seconds
+
+    # Ask the admin/get-* webhooks for column arrays instead of one object per
+    # row (a workflow that predates the option answers with rows, which still work)
+    enable_columnar_format: bool = True
+
+    # Conditional GETs: the admin/get-* webhooks answer 304 when a sheet is
+    # unchanged since the copy held here, or send only the rows appended to it
+    enable_delta_sync: bool = True
+
+    # ============================================================================
+    # Background Jobs
+    # ============================================================================
+    # Payroll and attendance checks run on a worker pool; the dashboard polls them
+    job_workers: int = 2
+    # Kiosk photo uploads get their own pool, so a payroll run never queues them
+    kiosk_upload_workers: int = 4
+    job_poll_interval: float = 2  # seconds, while a panel has a job queued or running
+    job_history_limit: int = 50  # Finished jobs kept for status / results
+
+    # ============================================================================
+    # Scheduler
+    # ============================================================================
+    # Runs the n8n "Monthly Payroll" and "Daily Check 10AM" cron jobs from the app
+    # instead (disable those triggers in n8n when turning this on). Cron format:
+    # minute hour day-of-month month day-of-week
+    # Streamlit only runs main.py for a browser session, so with this flag the
+    # scheduler thread starts when the first session opens; runs missed until
+    # then are caught up. To run schedules from process start regardless, run
+    # `python -m scheduler` as its own service (the flag is not needed for that)
+    enable_scheduler: bool = False
+    schedules: dict = field(default_factory=lambda: {
+        'payroll': '0 0 1 * *',  # Previous month's payroll on the 1st
+        'daily_check': '0 10 * * 1-5',  # Late / absent check, weekdays 10:00
+    })
+    scheduler_state_path: str = '.cache/scheduler.json'
+    scheduler_lock_path: str = '.cache/scheduler.lock'
+    scheduler_tick: float = 30  # seconds between schedule checks
+    scheduler_catchup_limit: int = 31  # Most recent missed runs replayed per schedule
+    scheduler_retry_delay: float = 300  # seconds before retrying a failed run
+
+    # ============================================================================
+    # Local Cache Settings
+    # ============================================================================
+    # Closed months of Attendance/Overtime are frozen into Parquet files here;
+    # only the open month is fetched live from n8n
+    enable_snapshot_cache: bool = True
+    snapshot_cache_dir: str = '.cache/snapshots'
+
+    # Precomputed attendance rollups (daily counts, employee-month summaries)
+    rollup_cache_path: str = '.cache/rollups.pkl'
+
+    # Employee directory (ID / name lookups for the forms) reload interval
+    employee_directory_ttl: float = 300  # seconds
+    employee_directory_retry_delay: float = 10  # seconds before retrying a failed load
+
+    # Leave calendar (overlap / coverage checks on the leave form) reload interval
+    leave_calendar_ttl: float = 300  # seconds
+
+    # Decoded sheets shared by every session and worker process on the host;
+    # writes made through the app invalidate the sheets they change at once
+    enable_shared_cache: bool = True
+    shared_cache_path: str = '.cache/shared_cache.sqlite'
+    shared_cache_ttl: float = 15  # seconds other sessions are served a fetched sheet
+
+    # ============================================================================
+    # UI Settings
+    # ============================================================================
+    page_title: str = "Enterprise Attendance System"
+    app_version: str = "1.0"
+    page_icon: str = "📊"
+    layout: Literal["centered", "wide"] = "wide"
+
+    # Dashboard fragments redraw on their own every N seconds (None = only when
+    # their widgets are used or the whole page is refreshed)
+    dashboard_refresh_intervals: dict = field(default_factory=lambda: {
+        'stats': None,
+        'attendance': None,
+        'leave': None,
+        'overtime': None,
+        'employees': None,
+        'alerts': None,
+        'analytics': None,
+    })
+
+    # ============================================================================
+    # Feature Flags
+    # ============================================================================
+    enable_sidebar_config: bool = False  # Set to False to hide n8n URL config in sidebar
+    enable_debug_mode: bool = False  # Set to True to show debug information
+
+    # ============================================================================
+    # Profiling
+    # ============================================================================
+    # Times every rerun by section (fetch, normalize, filter, render) and appends
+    # it to rerun_profile_log; summarize with: python rerun_profiler.py <log>
+    enable_rerun_profiler: bool = False
+    rerun_profiler_capture: str = ''  # '', 'cprofile' or 'pyinstrument'
+    rerun_profile_log: str = '.cache/rerun_profile.jsonl'
+    rerun_profile_log_max_bytes: int = 5 * 1024 * 1024  # Rotated to <log>.1 beyond this
+
+    def __post_init__(self):
+        # Lists / tables from files become tuples / read-only mappings
+        for f in fields(self):
+            value = getattr(self, f.name)
+            if isinstance(value, list):
+                object.__setattr__(self, f.name, tuple(value))
+            elif isinstance(value, dict):
+                object.__setattr__(self, f.name, MappingProxyType(dict(value)))
+
+        unknown = {*self.department_shifts.values(), *self.employee_shifts.values()} - set(self.shifts)
+        if unknown:
+            raise ValueError(f"Unknown shifts: {', '.join(sorted(unknown))}")
+
+    def missing(self):
+        """Required values still set to their placeholders"""
+        errors = []
+        if self.n8n_base_url == "YOUR_N8N_URL_HERE" or not self.n8n_base_url:
+            errors.append("⚠️ N8N_BASE_URL not configured.")
+        if self.google_sheet_id == "YOUR_SHEET_ID_HERE" or not self.google_sheet_id:
+            errors.append("⚠️ GOOGLE_SHEET_ID not configured.")
+        return errors
 
-# ============================================================================
-# UI Settings
-# ============================================================================
-PAGE_TITLE = "Enterprise Attendance System"
-PAGE_ICON = "📊"
-LAYOUT: Literal["centered", "wide"] = "wide"
 
 # ============================================================================
-# Feature Flags
+# Loading and Reloading
 # ============================================================================
-ENABLE_SIDEBAR_CONFIG = False  # Set to False to hide n8n URL config in sidebar
-ENABLE_DEBUG_MODE = False  # Set to True to show debug information
+
+def _coerce(value, kind, default):
+    """Convert a settings file / environment value to its field's type"""
+    if kind is bool:
+        return value if isinstance(value, bool) else str(value).lower() in ('1', 'true', 'yes', 'on')
+    if kind in (int, float):
+        return kind(value)
+    if kind is tuple:
+        if isinstance(value, str):
+            return tuple(item.strip() for item in value.split(',') if item.strip())
+        return tuple(value)
+    if kind is dict:
+        # Tables override individual keys, e.g. [overtime_policy] multiplier = 1.75
+        return {**default, **(json.loads(value) if isinstance(value, str) else value)}
+    return str(value)
+
+
+def _read_settings_file():
+    if not os.path.exists(SETTINGS_PATH):
+        return {}
+    if not _has_tomllib:
+        logger.warning("Settings: %s ignored (needs Python 3.11+ for tomllib)", SETTINGS_PATH)
+        return {}
+    with open(SETTINGS_PATH, 'rb') as f:
+        return tomllib.load(f)
+
+
+def _read_secrets():
+    secrets = {}
+    if not _has_streamlit:
+        return secrets
+    for name, section, key in (('n8n_base_url', 'n8n', 'base_url'),
+                               ('google_sheet_id', 'google_sheets', 'sheet_id')):
+        try:
+            secrets[name] = st.secrets[section][key]
+        except (KeyError, FileNotFoundError, AttributeError):
+            pass
+    return secrets
+
+
+def load_settings():
+    """Build Settings from defaults < settings.toml < environment < Streamlit secrets"""
+    defaults = Settings()
+    kinds = {f.name: f.type for f in fields(Settings)}
+
+    values = _read_settings_file()
+    unknown = set(values) - set(kinds)
+    if unknown:
+        raise ValueError(f"Unknown settings in {SETTINGS_PATH}: {', '.join(sorted(unknown))}")
+
+    for name in kinds:
+        if os.getenv(name.upper()) is not None:
+            values[name] = os.getenv(name.upper())
+    values.update(_read_secrets())
+
+    return Settings(**{
+        name: _coerce(value, kinds[name], getattr(defaults, name)) for name, value in values.items()
+    })
+
+
+def _file_stamps():
+    stamps = []
+    for path in (SETTINGS_PATH, SECRETS_PATH):
+        try:
+            stamps.append(os.stat(path).st_mtime_ns)
+        except OSError:
+            stamps.append(None)
+    return stamps
+
+
+_settings_lock = threading.Lock()
+_settings: Optional[Settings] = None
+_stamps = None
+_checked_at = 0.0
+
+
+def get_settings():
+    """Current settings; reloaded when settings.toml or secrets.toml has changed"""
+    global _settings, _stamps, _checked_at
+    if _settings is not None and time.monotonic() - _checked_at < SETTINGS_CHECK_INTERVAL:
+        return _settings
+
+    with _settings_lock:
+        if _settings is None or time.monotonic() - _checked_at >= SETTINGS_CHECK_INTERVAL:
+            stamps = _file_stamps()
+            if _settings is None:
+                _settings = load_settings()
+            elif stamps != _stamps:
+                try:
+                    _settings = load_settings()
+                except Exception as e:
+                    # Keep serving the last good settings until the file is fixed
+                    logger.warning("Settings reload failed: %s", e)
+            _stamps = stamps
+            _checked_at = time.monotonic()
+    return _settings
+
+
+def update_settings(**changes):
+    """Replace some settings in this process until the next reload (benchmarks, scripts)"""
+    global _settings
+    current = get_settings()
+    with _settings_lock:
+        _settings = replace(current, **changes)
+    return _settings
+
+
+settings = get_settings()
+
+# Values at startup, for modules that read them once at import
+N8N_BASE_URL = settings.n8n_base_url
+GOOGLE_SHEET_ID = settings.google_sheet_id
+DEFAULT_NEXT_EMPLOYEE_ID = settings.default_next_employee_id
+WORKING_HOURS_PER_DAY = settings.working_hours_per_day
+TAX_RATE = settings.tax_rate
+LATE_CUTOFF_TIME = settings.late_cutoff_time
+SHIFTS = settings.shifts
+DEPARTMENT_SHIFTS = settings.department_shifts
+EMPLOYEE_SHIFTS = settings.employee_shifts
+MAX_DEPARTMENT_ON_LEAVE = settings.max_department_on_leave
+DEPARTMENTS = list(settings.departments)
+DEFAULT_HOURLY_RATES = settings.default_hourly_rates
+OVERTIME_POLICY = settings.overtime_policy
+HOLIDAYS = list(settings.holidays)
+API_CONNECT_TIMEOUT = settings.api_connect_timeout
+API_READ_TIMEOUT = settings.api_read_timeout
+MAX_RETRIES = settings.max_retries
+ENABLE_COLUMNAR_FORMAT = settings.enable_columnar_format
+ENABLE_DELTA_SYNC = settings.enable_delta_sync
+JOB_WORKERS = settings.job_workers
+KIOSK_UPLOAD_WORKERS = settings.kiosk_upload_workers
+JOB_POLL_INTERVAL = settings.job_poll_interval
+JOB_HISTORY_LIMIT = settings.job_history_limit
+ENABLE_SCHEDULER = settings.enable_scheduler
+SCHEDULES = settings.schedules
+SCHEDULER_STATE_PATH = settings.scheduler_state_path
+SCHEDULER_LOCK_PATH = settings.scheduler_lock_path
+SCHEDULER_TICK = settings.scheduler_tick
+SCHEDULER_CATCHUP_LIMIT = settings.scheduler_catchup_limit
+SCHEDULER_RETRY_DELAY = settings.scheduler_retry_delay
+ENABLE_SNAPSHOT_CACHE = settings.enable_snapshot_cache
+SNAPSHOT_CACHE_DIR = settings.snapshot_cache_dir
+ROLLUP_CACHE_PATH = settings.rollup_cache_path
+EMPLOYEE_DIRECTORY_TTL = settings.employee_directory_ttl
+EMPLOYEE_DIRECTORY_RETRY_DELAY = settings.employee_directory_retry_delay
+LEAVE_CALENDAR_TTL = settings.leave_calendar_ttl
+ENABLE_SHARED_CACHE = settings.enable_shared_cache
+SHARED_CACHE_PATH = settings.shared_cache_path
+SHARED_CACHE_TTL = settings.shared_cache_ttl
+PAGE_TITLE = settings.page_title
+APP_VERSION = settings.app_version
+PAGE_ICON = settings.page_icon
+LAYOUT = settings.layout
+DASHBOARD_REFRESH_INTERVALS = settings.dashboard_refresh_intervals
+ENABLE_SIDEBAR_CONFIG = settings.enable_sidebar_config
+ENABLE_DEBUG_MODE = settings.enable_debug_mode
+ENABLE_RERUN_PROFILER = settings.enable_rerun_profiler
+RERUN_PROFILER_CAPTURE = settings.rerun_profiler_capture
+RERUN_PROFILE_LOG = settings.rerun_profile_log
+RERUN_PROFILE_LOG_MAX_BYTES = settings.rerun_profile_log_max_bytes
 
 
 # ============================================================================
@@ -118,15 +458,7 @@ ENABLE_DEBUG_MODE = False  # Set to True to show debug information
 # ============================================================================
 def validate_config():
     """Validate that required configuration is set"""
-    import streamlit as st
-
-    errors = []
-
-    if N8N_BASE_URL == "YOUR_N8N_URL_HERE" or not N8N_BASE_URL:
-        errors.append("⚠️ N8N_BASE_URL not configured.")
-
-    if GOOGLE_SHEET_ID == "YOUR_SHEET_ID_HERE" or not GOOGLE_SHEET_ID:
-        errors.append("⚠️ GOOGLE_SHEET_ID not configured.")
+    errors = get_settings().missing()
 
     if errors:
         st.error("**Configuration Missing**")
@@ -148,7 +480,7 @@ def validate_config():
         sheet_id = "SHEET_ID"
         ```
 
-        3. Save the file and restart: `streamlit run main.py`
+        3. Save the file (it is picked up on the next rerun): `streamlit run main.py`
         """)
         st.stop()
 
@@ -162,4 +494,5 @@ def validate_config():
 # 3. Customize DEPARTMENTS list if needed
 # 4. For Streamlit Cloud: Create secrets.toml file (see example below)
 # 5. For security: Never commit actual URLs to public repos
+# 6. Tune timeouts, cache TTLs, pool sizes etc. in settings.toml (no code edits)
 # ============================================================================
@@ -0,0 +1,505 @@
+"""
+Admin Dashboard Module
+Stats row, tabbed logs, system actions and analytics; every tab is a fragment,
+so using its widgets reruns only that tab
+"""
+
+from datetime import datetime, timedelta
+
+import streamlit as st
+
+from config import DASHBOARD_REFRESH_INTERVALS, get_settings
+from data_service import (
+    call_n8n_webhook,
+    clean_dataframe_for_display,
+    fetch_attendance_data,
+    fetch_leave_data,
+    fetch_overtime_data,
+    fetch_employee_data,
+    fetch_alerts_data,
+    get_system_stats,
+    count_pending_leave,
+    leave_calendar,
+    filter_attendance,
+    run_payroll_job,
+    run_daily_check_job
+)
+from jobs import submit_job, latest_job, show_job_status, job_panel
+from notifications import notify, show_toasts
+from shared_cache import invalidate
+from rerun_profiler import section
+from analytics import (
+    new_analytics_state,
+    update_analytics,
+    punctuality_rate,
+    late_trend_by_department,
+    absenteeism_by_weekday,
+    overtime_cost_by_department
+)
+from payroll import previous_month
+from rollups import refresh_rollups
+from overtime_engine import calculate_overtime_pay
+
+# Shared cache namespaces of the sheets shown on the dashboard
+DATASETS = ('attendance', 'leave', 'overtime', 'employees', 'alerts')
+
+
+# ==================== PAGE: ADMIN DASHBOARD ====================
+
+def show_admin_dashboard():
+    """Main Admin Dashboard"""
+
+    # Header
+    st.markdown("""
+        <div style='background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
+                    padding: 30px; border-radius: 10px; margin-bottom: 30px; color: white;'>
+            <div style='display: flex; justify-content: space-between; align-items: center;'>
+                <div>
+                    <h1 style='margin: 0; font-size: 32px;'>📊 Admin Dashboard</h1>
+                    <p style='margin: 5px 0 0 0; opacity: 0.9;'>Enterprise Attendance Management</p>
+                </div>
+                <div style='text-align: right;'>
+                    <div style='font-size: 18px; font-weight: 600;'>👨‍💼 Admin User</div>
+                    <div style='font-size: 14px; opacity: 0.8;'>System Administrator</div>
+                </div>
+            </div>
+        </div>
+    """, unsafe_allow_html=True)
+
+    # Navigation buttons
+    col1, col2, col3 = st.columns([1, 1, 4])
+    with col1:
+        if st.button("👤 Register Employee", use_container_width=True, type="primary"):
+            st.session_state.current_page = 'register'
+            st.rerun()
+    with col2:
+        if st.button("🔄 Refresh Data", use_container_width=True):
+            # Fetch every sheet afresh (for all sessions), then redraw every fragment at once
+            for dataset in DATASETS:
+                invalidate(dataset)
+            st.rerun()
+
+    st.markdown("---")
+
+    # System Overview Statistics
+    st.subheader("📈 System Overview")
+
+    # The metric slots live outside the fragments so both the stats row and
+    # the leave list can redraw them in place
+    metric_slots = [column.empty() for column in st.columns(4)]
+    show_stats_row(metric_slots)
+
+    st.markdown("---")
+
+    # Tabs for different sections
+    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
+        "📋 Attendance Log",
+        "🏖️ Leave Management",
+        "⏰ Overtime Log",
+        "👥 Employee Records",
+        "⚙️ System Actions",
+        "📈 Analytics"
+    ])
+
+    # Every tab is a fragment: using its widgets reruns only that tab
+    with tab1:
+        show_attendance_tab()
+
+    with tab2:
+        show_leave_tab(metric_slots[2])
+
+    with tab3:
+        show_overtime_tab()
+
+    with tab4:
+        show_employees_tab()
+
+    with tab5:
+        show_system_actions_tab()
+
+    with tab6:
+        show_analytics_tab()
+
+
+def show_pending_metric(slot, pending_leave):
+    """Draw the pending leave metric into its slot in the stats row"""
+    slot.metric(label="⌛ Pending Leave Requests", value=pending_leave)
+
+
+@st.fragment(run_every=DASHBOARD_REFRESH_INTERVALS['stats'])
+def show_stats_row(metric_slots):
+    """System overview metrics"""
+    with section('fetch'):
+        total_employees, present_today, pending_leave, late_arrivals = get_system_stats()
+
+    metric_slots[0].metric(label="👥 Total Employees", value=total_employees)
+    metric_slots[1].metric(label="✅ Present Today", value=present_today)
+    show_pending_metric(metric_slots[2], pending_leave)
+    metric_slots[3].metric(label="🚨 Late Arrivals (Today)", value=late_arrivals)
+
+
+@st.fragment(run_every=DASHBOARD_REFRESH_INTERVALS['attendance'])
+def show_attendance_tab():
+    """Attendance log with department / search filters"""
+    st.subheader("Attendance Log")
+
+    col1, col2, col3, col4 = st.columns([2, 2, 3, 1])
+
+    with col1:
+        filter_dept = st.selectbox("Department", ["All Departments"] + list(get_settings().departments), key="att_dept")
+
+    with col2:
+        filter_date = st.date_input("Date", value=datetime.now(), key="att_date")
+
+    with col3:
+        search_term = st.text_input("Search by ID or Name", "", key="att_search")
+
+    with col4:
+        if st.button("📥 Export", key="export_att"):
+            st.success("Exporting data...")
+
+    with st.spinner("Loading attendance data from n8n..."):
+        with section('fetch'):
+            df_attendance = fetch_attendance_data()
+            # Folds in check-ins made elsewhere, for the stats row's present / late counts
+            refresh_rollups(df_attendance)
+
+        if not df_attendance.empty:
+            with section('filter'):
+                df_attendance = filter_attendance(df_attendance, filter_dept, search_term)
+            if df_attendance.attrs.get('close_matches') and not df_attendance.empty:
+                st.caption(f"🔎 No exact match for \"{search_term}\", showing close spellings.")
+
+            # Clean dataframe for display
+            with section('normalize'):
+                df_display = clean_dataframe_for_display(df_attendance)
+            with section('render'):
+                st.dataframe(df_display, width='stretch', hide_index=True)
+        else:
+            st.info("📄 No attendance records found.")
+
+
+@st.fragment(run_every=DASHBOARD_REFRESH_INTERVALS['leave'])
+def show_leave_tab(pending_slot):
+    """Leave requests with approve / reject; a decision redraws only this list and the pending metric"""
+    show_toasts()
+    st.subheader("Leave Management")
+
+    col1, col2 = st.columns([3, 1])
+
+    with col1:
+        filter_leave_status = st.selectbox("Status", ["All Statuses", "Pending", "Approved", "Rejected"],
+                                           key="leave_status")
+
+    with col2:
+        if st.button("📥 Export", key="export_leave"):
+            st.success("Exporting data...")
+
+    with st.spinner("Loading leave requests from n8n..."):
+        with section('fetch'):
+            df_leave = fetch_leave_data()
+
+        # After an approval only this fragment reruns, so refresh the stats row metric from here
+        if st.session_state.pop('leave_updated', False):
+            show_pending_metric(pending_slot, count_pending_leave(df_leave))
+
+        if not df_leave.empty:
+            # Indexed before the status filter: overlap and coverage count every booked leave
+            calendar = leave_calendar(df_leave)
+            if 'Status' in df_leave.columns and filter_leave_status != "All Statuses":
+                df_leave = df_leave[df_leave['Status'] == filter_leave_status]
+
+            for idx, row in df_leave.iterrows():
+                with st.container():
+                    col1, col2, col3, col4 = st.columns([1, 2, 3, 1])
+
+                    with col1:
+                        st.write(f"**{row.get('Employee ID', 'N/A')}**")
+                        st.write(row.get('Employee Name', 'N/A'))
+
+                    with col2:
+                        st.write(f"**Type:** {row.get('Leave Type', 'N/A')}")
+                        st.write(f"**Days:** {row.get('Days', 0)}")
+
+                    with col3:
+                        st.write(f"**Dates:** {row.get('Start Date', 'N/A')} to {row.get('End Date', 'N/A')}")
+                        st.write(f"**Reason:** {row.get('Reason', 'N/A')}")
+                        st.write(f"**Status:** {row.get('Status', 'Pending')}")
+                        if calendar is not None and row.get('Status') == 'Pending':
+                            for message in calendar.review(row):
+                                st.warning(f"⚠️ {message}")
+
+                    with col4:
+                        if row.get('Status') == 'Pending':
+                            col_approve, col_reject = st.columns(2)
+                            with col_approve:
+                                if st.button("✅", key=f"approve_{idx}", help="Approve", use_container_width=True):
+                                    with st.spinner("Approving..."):
+                                        result = call_n8n_webhook('admin/approve-leave', {
+                                            'Leave ID': row.get('Leave ID'),
+                                            'Status': 'Approved',
+                                            'Approved By': 'Admin'
+                                        })
+                                        if result and result.get('success'):
+                                            notify(f"Leave approved for {row.get('Employee Name', 'N/A')}", "✅")
+                                            st.session_state.leave_updated = True
+                                            st.rerun(scope="fragment")
+                                        elif result:
+                                            st.error(f"Error: {result.get('message', 'Unknown error')}")
+                            with col_reject:
+                                if st.button("❌", key=f"reject_{idx}", help="Reject", use_container_width=True):
+                                    with st.spinner("Rejecting..."):
+                                        result = call_n8n_webhook('admin/approve-leave', {
+                                            'Leave ID': row.get('Leave ID'),
+                                            'Status': 'Rejected',
+                                            'Approved By': 'Admin'
+                                        })
+                                        if result and result.get('success'):
+                                            notify(f"Leave rejected for {row.get('Employee Name', 'N/A')}", "❌")
+                                            st.session_state.leave_updated = True
+                                            st.rerun(scope="fragment")
+                                        elif result:
+                                            st.error(f"Error: {result.get('message', 'Unknown error')}")
+
+                    st.markdown("---")
+        else:
+            st.info("🏖️ No leave requests found.")
+
+
+@st.fragment(run_every=DASHBOARD_REFRESH_INTERVALS['overtime'])
+def show_overtime_tab():
+    """Overtime log with pay recomputed under the current policy"""
+    st.subheader("Overtime Log")
+
+    col1, col2 = st.columns([3, 1])
+
+    with col1:
+        filter_overtime_date = st.date_input("Filter by Date", value=None, key="overtime_date")
+
+    with col2:
+        if st.button("📥 Export", key="export_overtime"):
+            st.success("Exporting data...")
+
+    with st.spinner("Loading overtime logs from n8n..."):
+        with section('fetch'):
+            df_overtime = fetch_overtime_data()
+
+        if not df_overtime.empty:
+            # Recompute pay for every row in one pass under the current policy
+            with section('normalize'):
+                if {'Employee ID', 'Date', 'Overtime Hours', 'Regular Rate'} <= set(df_overtime.columns):
+                    df_overtime = calculate_overtime_pay(df_overtime)
+
+                # Clean dataframe for display
+                df_display = clean_dataframe_for_display(df_overtime)
+            with section('render'):
+                st.dataframe(df_display, width='stretch', hide_index=True)
+        else:
+            st.info("⏰ No overtime logs found.")
+
+
+@st.fragment(run_every=DASHBOARD_REFRESH_INTERVALS['employees'])
+def show_employees_tab():
+    """Employee records"""
+    show_toasts()
+    st.subheader("Employee Records")
+
+    col1, col2 = st.columns([3, 1])
+
+    with col1:
+        if st.button("🔄 Sync from n8n", key="sync_employees"):
+            invalidate('employees')
+            notify("Employee data synced!", "🔄")
+            st.rerun(scope="fragment")
+
+    with col2:
+        if st.button("📥 Export", key="export_employees"):
+            st.success("Exporting data...")
+
+    with st.spinner("Loading employee records from n8n..."):
+        with section('fetch'):
+            df_employees = fetch_employee_data()
+
+        if not df_employees.empty:
+            # Clean dataframe for display
+            with section('normalize'):
+                df_display = clean_dataframe_for_display(df_employees)
+            with section('render'):
+                st.dataframe(df_display, width='stretch', hide_index=True)
+        else:
+            st.info("👥 No employee records found.")
+
+
+def show_system_actions_tab():
+    """Payroll and alert actions plus the activity feed"""
+    st.subheader("⚙️ System Automation Actions")
+
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        show_payroll_panel()
+
+    with col2:
+        show_alert_check_panel()
+
+    with col3:
+        show_logged_alerts()
+
+    st.markdown("---")
+    st.subheader("📊 Recent System Activity Feed")
+
+    activities = [
+        {"time": datetime.now().strftime("%Y-%m-%d %H:%M"), "text": "🔔 System monitoring active"},
+        {"time": (datetime.now() - timedelta(hours=1)).strftime("%Y-%m-%d %H:%M"),
+         "text": "✅ Latest check-ins recorded"},
+        {"time": (datetime.now() - timedelta(hours=3)).strftime("%Y-%m-%d %H:%M"),
+         "text": "🏖️ Processing leave requests"},
+    ]
+
+    for activity in activities:
+        st.markdown(f"""
+        <div class='activity-item'>
+            <div style='color: #999; font-size: 12px; margin-bottom: 5px;'>{activity['time']}</div>
+            <div style='color: #333; font-size: 14px;'>{activity['text']}</div>
+        </div>
+        """, unsafe_allow_html=True)
+
+
+@job_panel(lambda: [latest_job('payroll')])
+def show_payroll_panel():
+    """Monthly payroll, generated as a background job"""
+    if st.button("💰 Generate Monthly Payroll", key="gen_payroll", use_container_width=True, type="primary"):
+        # Payroll is computed from the employee-month rollups and handed to
+        # n8n, which only has to save it; repeated clicks join the running job
+        month = previous_month()
+        _, created = submit_job('payroll', run_payroll_job, month, key=f"payroll-{month}")
+        if not created:
+            st.toast("Payroll is already being generated", icon="⏳")
+
+    job = latest_job('payroll')
+    show_job_status(job)
+    if job and job['status'] == 'done':
+        result = job['result']
+        if result['response']:
+            st.success("✅ Payroll generated successfully!")
+            if not result['payroll'].empty:
+                st.dataframe(clean_dataframe_for_display(result['payroll']), width='stretch', hide_index=True)
+            st.json(result['response'])
+
+
+@job_panel(lambda: [latest_job('alert_check')])
+def show_alert_check_panel():
+    """Daily attendance check, run as a background job"""
+    if st.button("🔔 Run Daily Attendance Check", key="check_alerts", use_container_width=True, type="primary"):
+        # The same local evaluator as the scheduled check (and the same key, so a running one is joined)
+        today = datetime.now().strftime('%Y-%m-%d')
+        _, created = submit_job('alert_check', run_daily_check_job, [today], key=f"daily-check-{today}")
+        if not created:
+            st.toast("The attendance check is already running", icon="⏳")
+
+    job = latest_job('alert_check')
+    show_job_status(job)
+    if job and job['status'] == 'done':
+        result = job['result']
+        if result['alerts_found'] > 0:
+            st.warning(f"⚠️ Found **{result['alerts_found']}** alert(s)")
+
+            for idx, alert in result['alerts'].iterrows():
+                alert_type = alert.get('Alert Type', 'UNKNOWN')
+                severity = alert.get('Severity', 'MEDIUM')
+
+                if severity == 'HIGH':
+                    border_color = '#f56565'
+                    bg_color = '#fed7d7'
+                elif severity == 'MEDIUM':
+                    border_color = '#ed8936'
+                    bg_color = '#feebc8'
+                else:
+                    border_color = '#667eea'
+                    bg_color = '#e6fffa'
+
+                st.markdown(f"""
+                <div style='background-color: {bg_color}; padding: 15px; border-left: 4px solid {border_color}; 
+                            margin-bottom: 10px; border-radius: 5px;'>
+                    <div style='font-weight: 600; color: #333; margin-bottom: 5px;'>
+                        🚨 {alert_type}: {alert.get('Employee Name', 'Unknown')} ({alert.get('Employee ID', 'N/A')})
+                    </div>
+                    <div style='color: #666; font-size: 14px;'>
+                        📧 {alert.get('Email', 'N/A')} | 🏢 {alert.get('Department', 'N/A')}
+                    </div>
+                    <div style='color: #666; font-size: 14px; margin-top: 5px;'>
+                        💬 {alert.get('Message', 'No message')}
+                    </div>
+                    <div style='color: #999; font-size: 12px; margin-top: 8px;'>
+                        🕐 {alert.get('Time', 'N/A')} | 📅 {alert.get('Date', 'N/A')} | ⚠️ {severity}
+                    </div>
+                </div>
+                """, unsafe_allow_html=True)
+        else:
+            st.success("✅ No issues found - all employees are on time!")
+
+
+@st.fragment(run_every=DASHBOARD_REFRESH_INTERVALS['alerts'])
+def show_logged_alerts():
+    """Logged alerts"""
+    # A toggle rather than a button so the log stays open across auto-refreshes
+    if st.toggle("🚨 View Logged Alerts", key="view_alerts"):
+        alerts_df = fetch_alerts_data()
+        if not alerts_df.empty:
+            # Clean dataframe for display
+            df_display = clean_dataframe_for_display(alerts_df)
+            st.dataframe(df_display, width='stretch', hide_index=True)
+        else:
+            st.info("No alerts logged yet.")
+
+
+@st.fragment(run_every=DASHBOARD_REFRESH_INTERVALS['analytics'])
+def show_analytics_tab():
+    """Analytics tab: aggregates are refreshed incrementally from cached frames"""
+    st.subheader("📈 Attendance Analytics")
+
+    if 'analytics_state' not in st.session_state:
+        st.session_state.analytics_state = new_analytics_state()
+
+    with st.spinner("Updating analytics..."):
+        with section('fetch'):
+            df_attendance = fetch_attendance_data()
+            df_overtime = fetch_overtime_data()
+            df_employees = fetch_employee_data()
+
+        with section('normalize'):
+            state = update_analytics(st.session_state.analytics_state, df_attendance, df_overtime)
+            st.session_state.analytics_state = state
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric(label="⏱️ Punctuality Rate", value=f"{punctuality_rate(state)}%")
+    with col2:
+        st.metric(label="📋 Check-ins Analysed", value=state['attendance_rows'])
+    with col3:
+        st.metric(label="⏰ Overtime Logs Analysed", value=state['overtime_rows'])
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.markdown("**🚨 Late Arrivals per Week by Department**")
+        late_trend = late_trend_by_department(state)
+        if not late_trend.empty:
+            st.line_chart(late_trend)
+        else:
+            st.info("No late arrivals recorded.")
+
+    with col2:
+        st.markdown("**📅 Absenteeism by Weekday (%)**")
+        absenteeism = absenteeism_by_weekday(state, len(df_employees))
+        if not absenteeism.empty:
+            st.bar_chart(absenteeism)
+        else:
+            st.info("Not enough data to compute absenteeism.")
+
+    st.markdown("**💰 Overtime Cost by Department ($)**")
+    overtime_cost = overtime_cost_by_department(state, df_employees)
+    if not overtime_cost.empty:
+        st.bar_chart(overtime_cost)
+    else:
+        st.info("No overtime logged yet.")
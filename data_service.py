@@ -0,0 +1,416 @@
+"""
+Data Service Module
+n8n data access for the admin dashboard: webhook calls, dataset fetchers,
+system statistics and the filters applied before display
+"""
+
+import threading
+import uuid
+from datetime import datetime, timedelta
+
+import pandas as pd
+import requests
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from config import get_settings
+from n8n_client import N8NError, get_json, send_request
+from search_index import index_for
+from leave_calendar import calendar_for
+from shift_rules import get_rules
+from shared_cache import get_or_fetch
+from wire_format import COLUMNAR, decode_frame
+from snapshot_cache import freeze_closed_months, live_since, read_snapshots
+from rollups import refresh_rollups, present_and_late
+from payroll import calculate_monthly_payroll
+
+_sync_lock = threading.Lock()
+_synced = {}  # (n8n URL, endpoint, params but since) -> {'since', 'etag', 'total_rows', 'df'} of the last copy
+
+
+# ==================== N8N API FUNCTIONS ====================
+
+def clean_dataframe_for_display(df):
+    """Clean dataframe to prevent Arrow serialization errors"""
+    if df.empty:
+        return df
+
+    # Convert all columns to string to avoid type conflicts
+    df_clean = df.copy()
+    for col in df_clean.columns:
+        df_clean[col] = df_clean[col].astype(str)
+
+    return df_clean
+
+
+def _report_error(message):
+    """Show an n8n error on the page; background jobs have no page, so raise instead"""
+    if get_script_run_ctx() is None:
+        raise N8NError(message)
+    st.error(message)
+
+
+def _base_url():
+    """The n8n URL of this session (the settings' one outside a session)"""
+    return st.session_state.get('n8n_base_url', get_settings().n8n_base_url)
+
+
+def call_n8n_webhook(endpoint, data=None, method='POST', params=None, headers=None):
+    """Universal function to call n8n webhooks"""
+    try:
+        n8n_base_url = _base_url()
+        if method == 'GET':
+            # Sessions asking for the same sheet at once share one call and its decoded JSON
+            status_code, body = get_json(n8n_base_url, endpoint, params, headers)
+        else:
+            response = send_request(n8n_base_url, endpoint, data, method, params, headers=headers)
+            status_code = response.status_code
+            body = response.json() if status_code == 200 else response.text
+    except requests.exceptions.ConnectionError:
+        _report_error("❌ Cannot connect to n8n. Make sure n8n is running!")
+        return None
+    except Exception as e:
+        _report_error(f"❌ Error: {str(e)}")
+        return None
+
+    if status_code == 304:
+        # Conditional GET: the caller's copy is current
+        return {'not_modified': True}
+    if status_code != 200:
+        _report_error(f"n8n Error {status_code}: {body}")
+        return None
+    return body
+
+
+def _sync_sheet(endpoint, params):
+    """
+    Fetch a sheet with a conditional GET against the copy held from the last
+    fetch: n8n answers 304 when it is unchanged, only the rows appended to it
+    when its rows are unchanged, or the whole sheet (e.g. after an approval
+    edited a row). Returns a DataFrame, or None when the call failed.
+    """
+    # One copy per server and sheet: a copy from an older ?since= is superseded, not kept
+    since = (params or {}).get('since')
+    key = (_base_url(), endpoint, tuple(sorted((k, v) for k, v in (params or {}).items() if k != 'since')))
+    with _sync_lock:
+        held = _synced.get(key)
+    if held and held['since'] != since:
+        held = None
+
+    headers = None
+    if held:
+        params = {**(params or {}), 'after_row': held['total_rows']}
+        headers = {'If-None-Match': held['etag']}
+
+    result = call_n8n_webhook(endpoint, method='GET', params=params, headers=headers)
+    if not result:
+        return None
+    if result.get('not_modified'):
+        df = held['df']
+    else:
+        df = decode_frame(result)
+        if result.get('delta'):
+            df = pd.concat([held['df'], df], ignore_index=True)
+        if result.get('etag'):
+            # Workflows that predate conditional GETs send no ETag: nothing to hold then
+            df.attrs['version'] = f"{endpoint}:{result['etag']}"
+            with _sync_lock:
+                _synced[key] = {'since': since, 'etag': result['etag'],
+                                'total_rows': result.get('total_rows', len(df)), 'df': df}
+
+    # Callers convert columns in place; the held copy must stay as n8n sent it
+    return df.copy()
+
+
+def fetch_sheet(dataset, endpoint, params=None):
+    """
+    Rows of a sheet as a DataFrame, shared by all sessions and worker
+    processes for the cache TTL; df.attrs['version'] names its content (the
+    search index is built once per version). Without an ETag or the shared
+    cache every fetch is a new frame, so it gets no version (searches scan).
+    """
+    if get_settings().enable_columnar_format:
+        params = {**(params or {}), 'format': COLUMNAR}
+
+    def fetch():
+        if get_settings().enable_delta_sync:
+            df = _sync_sheet(endpoint, params)
+        else:
+            result = call_n8n_webhook(endpoint, method='GET', params=params)
+            df = decode_frame(result) if result else None
+        if df is not None and 'version' not in df.attrs and get_settings().enable_shared_cache:
+            df.attrs['version'] = uuid.uuid4().hex
+        return df
+
+    df = get_or_fetch(dataset, f"{endpoint}?{sorted((params or {}).items())}", fetch)
+    return df if df is not None else pd.DataFrame()
+
+
+def fetch_live_rows(dataset, endpoint):
+    """
+    (since, rows) of an append-only sheet that are not frozen yet, from the
+    shared live copy; since is the first live day (None before the first freeze)
+    """
+    since = live_since(dataset)
+    df_live = fetch_sheet(dataset, endpoint, {'since': since} if since else None)
+
+    # Freeze any newly closed month; the endpoint may ignore `since`, so rows
+    # from months that are already frozen are dropped here as well
+    return since, freeze_closed_months(dataset, df_live)
+
+
+def fetch_snapshotted_data(dataset, endpoint, columns=None, start_month=None):
+    """
+    Fetch an append-only sheet: closed months are read from local Parquet
+    snapshots, only months not frozen yet are fetched live from n8n
+    """
+    since, df_live = fetch_live_rows(dataset, endpoint)
+    if columns and not df_live.empty:
+        df_live = df_live[[col for col in columns if col in df_live.columns]]
+
+    df_history = read_snapshots(dataset, columns=columns, start_month=start_month)
+    if df_history.empty:
+        df = df_live
+    elif df_live.empty:
+        df = df_history
+    else:
+        df = pd.concat([df_history, df_live], ignore_index=True)
+
+    # The history is fixed by `since` (and the requested slice), the rest by the live rows
+    live_version = df_live.attrs.get('version')
+    if live_version:
+        df.attrs['version'] = f"{dataset}:{since}:{start_month}:{columns}:{live_version}"
+    return df
+
+
+def fetch_attendance_data(columns=None, start_month=None):
+    """Fetch attendance data via n8n webhook"""
+    if get_settings().enable_snapshot_cache:
+        return fetch_snapshotted_data('attendance', 'admin/get-attendance', columns, start_month)
+    return fetch_sheet('attendance', 'admin/get-attendance')
+
+
+def fetch_attendance_since(day):
+    """
+    Attendance rows dated day ('YYYY-MM-DD') or later, in a single GET that
+    bypasses the shared copy (the webhook filters by ?since=)
+    """
+    params = {'since': day}
+    if get_settings().enable_columnar_format:
+        params['format'] = COLUMNAR
+    result = call_n8n_webhook('admin/get-attendance', method='GET', params=params)
+    return decode_frame(result) if result else pd.DataFrame()
+
+
+def fetch_leave_data():
+    """Fetch leave requests via n8n webhook"""
+    df = fetch_sheet('leave', 'admin/get-leave')
+    # Convert Days to numeric
+    if not df.empty and 'Days' in df.columns:
+        df['Days'] = pd.to_numeric(df['Days'], errors='coerce')
+    return df
+
+
+def fetch_overtime_data(columns=None, start_month=None):
+    """Fetch overtime logs via n8n webhook"""
+    if get_settings().enable_snapshot_cache:
+        df = fetch_snapshotted_data('overtime', 'admin/get-overtime', columns, start_month)
+    else:
+        df = fetch_sheet('overtime', 'admin/get-overtime')
+
+    # Convert numeric columns to proper types
+    if not df.empty:
+        numeric_columns = ['Regular Hours', 'Overtime Hours', 'Regular Rate', 'Overtime Rate', 'Overtime Pay']
+        for col in numeric_columns:
+            if col in df.columns:
+                df[col] = pd.to_numeric(df[col], errors='coerce')
+    return df
+
+
+def fetch_employee_data():
+    """Fetch employee records via n8n webhook"""
+    return fetch_sheet('employees', 'admin/get-employees')
+
+
+def fetch_alerts_data():
+    """Fetch alerts via n8n webhook"""
+    return fetch_sheet('alerts', 'admin/get-alerts')
+
+
+def get_system_stats():
+    """Headcount and pending leave from n8n; present / late today from the refreshed attendance rollups"""
+    try:
+        result = call_n8n_webhook('admin/get-stats', method='GET') or {}
+        # Folds in rows appended since the last refresh first (the attendance log below
+        # shares the fetched copy), so the row is current even on a cold rollup file
+        refresh_rollups(fetch_attendance_data())
+        present_today, late_arrivals = present_and_late(datetime.now().strftime('%Y-%m-%d'))
+        return result.get('total_employees', 0), present_today, result.get('pending_leave', 0), late_arrivals
+    except Exception as e:
+        st.error(f"Error fetching stats: {str(e)}")
+        return 0, 0, 0, 0
+
+
+def count_pending_leave(df_leave):
+    """Number of leave requests still waiting for approval"""
+    if 'Status' not in df_leave.columns:
+        return 0
+    return int((df_leave['Status'] == 'Pending').sum())
+
+
+def leave_calendar(df_leave):
+    """Overlap / coverage index of the leave sheet (built once per sheet version), or None"""
+    n8n_base_url = st.session_state.get('n8n_base_url', get_settings().n8n_base_url)
+    return calendar_for(df_leave, n8n_base_url)
+
+
+# ==================== FILTERS ====================
+
+def filter_attendance(df_attendance, department="All Departments", search_term=""):
+    """
+    Filter the attendance log by department and an ID / name search term
+    (through the search index when the frame has a version, so close
+    spellings are found too; attrs['close_matches'] is then set on the result)
+    """
+    if search_term:
+        if 'Employee ID' in df_attendance.columns and 'Employee Name' in df_attendance.columns:
+            index = index_for(df_attendance)
+            if index is not None:
+                positions, close = index.search(search_term)
+                df_attendance = df_attendance.iloc[positions]
+                df_attendance.attrs['close_matches'] = close
+            else:
+                mask = (df_attendance['Employee ID'].astype(str).str.contains(search_term, case=False, na=False) |
+                        df_attendance['Employee Name'].astype(str).str.contains(search_term, case=False, na=False))
+                df_attendance = df_attendance[mask]
+
+    # After the search, so it runs on the few matching rows
+    if 'Department' in df_attendance.columns and department != "All Departments":
+        df_attendance = df_attendance[df_attendance['Department'] == department]
+
+    return df_attendance
+
+
+def filter_today_alerts(alerts_df, today=None):
+    """Alerts logged today (the Date column comes in several formats)"""
+    if 'Date' not in alerts_df.columns:
+        return alerts_df.iloc[0:0]
+
+    today = today or datetime.now()
+    today_str1 = today.strftime('%Y-%m-%d')
+    today_str2 = today.strftime('%m/%d/%Y')
+    today_str3 = f"{today.month}/{today.day}/{today.year}"
+
+    dates = alerts_df['Date'].astype(str)
+    return alerts_df[
+        dates.str.contains(today_str1, na=False) |
+        dates.str.contains(today_str2, na=False) |
+        dates.str.contains(today_str3, na=False)
+    ]
+
+
+# ==================== BACKGROUND JOBS ====================
+# Run on the jobs worker pool: n8n errors raise N8NError instead of being drawn
+
+def run_payroll_job(progress, month):
+    """Compute a month's payroll from the rollups and hand it to n8n to save"""
+    progress(0.1, "Reading attendance...")
+    refresh_rollups(fetch_attendance_data())
+
+    progress(0.5, "Reading overtime and calculating payroll...")
+    df_payroll = calculate_monthly_payroll(month, df_overtime=fetch_overtime_data())
+
+    if df_payroll.empty:
+        # Nothing to save; n8n is only asked to store rows computed here
+        return {'payroll': df_payroll, 'response': {'success': True, 'records': 0}}
+
+    progress(0.8, "Saving payroll via n8n...")
+    response = call_n8n_webhook('admin/generate-payroll', {
+        'payroll': df_payroll.to_dict('records')
+    })
+    return {'payroll': df_payroll, 'response': response}
+
+
+ALERT_COLUMNS = ['Alert Type', 'Employee ID', 'Employee Name', 'Department', 'Email',
+                 'Date', 'Time', 'Message', 'Severity']
+
+
+def build_daily_alerts(df_attendance, df_employees, day, as_of, since=None):
+    """
+    Late / absent alerts for one day (YYYY-MM-DD) as of a datetime, shaped
+    like the n8n check writes them. Employees whose shift is not late yet at
+    as_of (a night shift at a morning check) are left out; with since, only
+    those whose shift turned late after since are checked
+    """
+    if df_employees.empty or 'Employee ID' not in df_employees.columns:
+        return pd.DataFrame(columns=ALERT_COLUMNS)
+
+    employees = df_employees.reindex(columns=['Employee ID', 'Employee Name', 'Department', 'Email'])
+    employees = employees.fillna('N/A').astype(str)
+
+    checkins = pd.DataFrame(columns=['Employee ID', 'Status', 'Time'])
+    if not df_attendance.empty and {'Employee ID', 'Date', 'Status'} <= set(df_attendance.columns):
+        # Night-shift check-ins after midnight carry the next day's date
+        next_day = (datetime.strptime(day, '%Y-%m-%d') + timedelta(days=1)).strftime('%Y-%m-%d')
+        candidates = df_attendance[df_attendance['Date'].astype(str).str[:10].isin([day, next_day])]
+        candidates = candidates.reindex(columns=['Employee ID', 'Date', 'Status', 'Time']).astype(str)
+        candidates = candidates.merge(employees[['Employee ID', 'Department']].drop_duplicates('Employee ID'),
+                                      on='Employee ID', how='left')
+
+        rules = get_rules()
+        on_day = candidates[rules.shift_dates(candidates) == day]
+        checkins = on_day.assign(Status=rules.statuses(on_day))[['Employee ID', 'Status', 'Time']]
+        checkins = checkins.drop_duplicates('Employee ID')  # First check-in of the shift
+
+    merged = employees.merge(checkins, on='Employee ID', how='left')
+    deadlines = get_rules().late_deadlines(merged, day)
+    due = deadlines <= as_of
+    if since is not None:
+        due &= deadlines > since
+    merged = merged[due]
+
+    absent = merged['Status'].isna()
+    late = merged['Status'].eq('Late')
+    merged = merged[absent | late]
+    absent = absent[absent | late]
+
+    date = datetime.strptime(day, '%Y-%m-%d')
+    alerts = pd.DataFrame({
+        'Alert Type': absent.map({True: 'ABSENT', False: 'LATE'}),
+        'Employee ID': merged['Employee ID'],
+        'Employee Name': merged['Employee Name'],
+        'Department': merged['Department'],
+        'Email': merged['Email'],
+        'Date': f"{date.month}/{date.day}/{date.year}",
+        'Time': merged['Time'].where(~absent, as_of.strftime('%I:%M %p')),
+        'Message': merged['Employee Name'] + absent.map({True: ' has not checked in', False: ' arrived late'}),
+        'Severity': absent.map({True: 'HIGH', False: 'MEDIUM'}),
+    })
+    return alerts.reset_index(drop=True)
+
+
+def run_daily_check_job(progress, days, as_of=None, deferred_since=None):
+    """
+    Late / absent check for the given days (YYYY-MM-DD, ascending) as of a
+    datetime (default now), computed locally from just those days' attendance
+    rows and saved through n8n; both the scheduler and the dashboard button
+    run it. deferred_since is when the previous check ran: shifts of that day
+    which were not late yet then are checked now
+    """
+    as_of = as_of or datetime.now()
+    checks = [(day, None) for day in days]
+    if deferred_since is not None and deferred_since.strftime('%Y-%m-%d') not in days:
+        checks.insert(0, (deferred_since.strftime('%Y-%m-%d'), deferred_since))
+
+    progress(0.1, "Reading attendance...")
+    df_attendance = fetch_attendance_since(checks[0][0])
+    df_employees = fetch_employee_data()
+
+    progress(0.5, "Checking late and absent employees...")
+    alerts = pd.concat([build_daily_alerts(df_attendance, df_employees, day, as_of, since) for day, since in checks],
+                       ignore_index=True)
+
+    if not alerts.empty:
+        progress(0.8, "Saving alerts via n8n...")
+        call_n8n_webhook('admin/check-alerts', {'alerts': alerts.to_dict('records')})
+    return {'alerts_found': len(alerts), 'alerts': alerts, 'days': days}
@@ -0,0 +1,275 @@
+"""
+Employee Directory Module
+Process-wide cache of the Employees sheet with an ID index for O(1)
+validation and a name prefix index for autocomplete; the sheet itself comes
+through the shared cache, and a registration in any worker process resets it
+"""
+
+import logging
+import threading
+import time
+from bisect import bisect_left
+
+import requests
+import streamlit as st
+
+from config import get_settings
+from n8n_client import get_json
+from shared_cache import get_or_fetch, poll_events, subscribe
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_load_lock = threading.Lock()  # Held by the one thread fetching the sheet
+_directory = {
+    'by_id': {},  # Employee ID -> employee record
+    'name_index': [],  # Sorted (name token, Employee ID) pairs
+    'loaded_at': 0.0,
+    'retry_at': 0.0,  # After a failed load, no new attempt before this
+}
+_warm_urls = set()  # n8n URLs a keep_warm() thread reloads the directory for
+
+# keep_warm() reloads after this share of the TTL, before any lookup finds it expired
+WARM_RELOAD_FRACTION = 0.8
+
+
+def _rate(value):
+    """Hourly rate of a sheet cell ('20', 20, '$20.50'), or None when it is empty or unreadable ('N/A')"""
+    try:
+        return float(str(value).replace('$', '').replace(',', '').strip()) if value else None
+    except ValueError:
+        return None
+
+
+def _build_indexes(records):
+    """Build the ID dict and the sorted name-token list from employee records"""
+    default_rates = get_settings().default_hourly_rates
+    by_id = {}
+    for record in records:
+        employee_id = str(record.get('Employee ID', '')).strip()
+        if not employee_id:
+            continue
+
+        rate = _rate(record.get('Hourly Rate'))
+        by_id[employee_id.upper()] = {
+            'Employee ID': employee_id,
+            'Employee Name': str(record.get('Employee Name', '')).strip(),
+            'Department': record.get('Department', ''),
+            'Email': record.get('Email', ''),
+            'Hourly Rate': rate if rate is not None else _rate(default_rates.get(employee_id)),
+        }
+
+    # Index the full name and each word of it so "doe" finds "John Doe"
+    name_index = set()
+    for key, record in by_id.items():
+        name = record['Employee Name'].lower()
+        if name:
+            name_index.add((name, key))
+            name_index.update((token, key) for token in name.split())
+
+    return by_id, sorted(name_index)
+
+
+def _fetch_records(n8n_base_url):
+    """Employee records from n8n, or None when the call fails"""
+    try:
+        status_code, body = get_json(n8n_base_url, 'admin/get-employees')
+    except (requests.exceptions.RequestException, ValueError):
+        return None
+    return body.get('data', []) if status_code == 200 else None
+
+
+def _reload(n8n_base_url):
+    """Fetch the sheet and swap in new indexes (built outside the lock); False when the load failed"""
+    records = get_or_fetch('employees', f"directory:{n8n_base_url}", lambda: _fetch_records(n8n_base_url))
+    if records is None:
+        with _lock:
+            _directory['retry_at'] = time.time() + get_settings().employee_directory_retry_delay
+        return False
+
+    by_id, name_index = _build_indexes(records)
+    with _lock:
+        _directory.update(by_id=by_id, name_index=name_index, loaded_at=time.time(), retry_at=0.0)
+    return True
+
+
+def _expired():
+    now = time.time()
+    with _lock:
+        return (now - _directory['loaded_at'] >= get_settings().employee_directory_ttl
+                and now >= _directory['retry_at'])
+
+
+def get_directory(n8n_base_url, force=False):
+    """Return the cached directory, reloading it when the TTL has expired"""
+    poll_events()  # Registrations in other worker processes reset loaded_at
+
+    if not force and not _expired():
+        return _directory
+
+    # One thread fetches, outside _lock; the others keep using the current
+    # copy, or wait for that fetch while there is none yet
+    if not _load_lock.acquire(blocking=not _directory['by_id']):
+        return _directory
+    try:
+        if force or _expired():
+            _reload(n8n_base_url)
+        # After a failure the previous (possibly empty) directory is served
+        # until employee_directory_retry_delay has passed
+        return _directory
+    finally:
+        _load_lock.release()
+
+
+def invalidate_directory():
+    """Force a reload on next use (e.g. after registering an employee)"""
+    with _lock:
+        _directory['loaded_at'] = 0.0
+
+
+def _on_employees_changed(namespace):
+    # A single assignment, so no lock: this may run while get_directory holds it
+    _directory['loaded_at'] = 0.0
+
+
+subscribe('employees', _on_employees_changed)
+
+
+def _keep_warm(n8n_base_url):
+    while True:
+        settings = get_settings()
+        delay = settings.employee_directory_retry_delay
+        try:
+            with _load_lock:
+                if _reload(n8n_base_url):
+                    delay = settings.employee_directory_ttl * WARM_RELOAD_FRACTION
+        except Exception:
+            logger.exception("Employee directory reload failed")
+        # A failed load is retried after employee_directory_retry_delay
+        time.sleep(delay)
+
+
+def keep_warm(n8n_base_url):
+    """Reload the directory on a background thread ahead of its TTL (kiosks), once per process and URL"""
+    with _lock:
+        if n8n_base_url in _warm_urls:
+            return
+        _warm_urls.add(n8n_base_url)
+    threading.Thread(target=_keep_warm, args=(n8n_base_url,), daemon=True, name='directory-warm').start()
+
+
+def lookup_employee(n8n_base_url, employee_id):
+    """Employee record for an ID, or None"""
+    if not employee_id:
+        return None
+    return get_directory(n8n_base_url)['by_id'].get(employee_id.strip().upper())
+
+
+def search_employees(n8n_base_url, prefix, limit=10):
+    """Employees whose name (or any word of it) starts with prefix"""
+    prefix = prefix.strip().lower()
+    if not prefix:
+        return []
+
+    directory = get_directory(n8n_base_url)
+    name_index = directory['name_index']
+
+    matches = []
+    position = bisect_left(name_index, (prefix, ''))
+    while position < len(name_index) and len(matches) < limit:
+        token, key = name_index[position]
+        if not token.startswith(prefix):
+            break
+        if key not in matches:
+            matches.append(key)
+        position += 1
+
+    return [directory['by_id'][key] for key in matches]
+
+
+def validate_employee(n8n_base_url, employee_id, employee_name):
+    """
+    Check an ID / name pair against the directory
+    Returns an error message, or None when valid (or the directory is unavailable)
+    """
+    directory = get_directory(n8n_base_url)
+    if not directory['by_id']:
+        return None
+
+    record = directory['by_id'].get(employee_id.strip().upper())
+    if record is None:
+        return f"Employee ID {employee_id} was not found."
+    if employee_name and record['Employee Name'].lower() != employee_name.strip().lower():
+        return f"Name does not match the records for {record['Employee ID']}."
+    return None
+
+
+# ==================== STREAMLIT WIDGETS ====================
+
+def employee_fields(n8n_base_url, key_prefix, on_select=None):
+    """
+    Employee ID / Full Name inputs with autocomplete from the directory
+
+    Typing a known ID fills in the name; typing part of a name offers the
+    matching employees. on_select(record) runs whenever an employee is
+    picked so callers can prefill other widgets (department, rate).
+    Returns (employee_id, employee_name, record or None).
+    """
+    id_key = f"{key_prefix}_id"
+    name_key = f"{key_prefix}_name"
+    pick_key = f"{key_prefix}_pick"
+
+    def select(record):
+        st.session_state[id_key] = record['Employee ID']
+        st.session_state[name_key] = record['Employee Name']
+        if on_select:
+            on_select(record)
+
+    def on_id_change():
+        record = lookup_employee(n8n_base_url, st.session_state.get(id_key, ''))
+        if record:
+            select(record)
+
+    def on_pick():
+        record = lookup_employee(n8n_base_url, st.session_state.get(pick_key) or '')
+        if record:
+            select(record)
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        employee_id = st.text_input(
+            "👤 Employee ID *",
+            placeholder="E001",
+            help="Enter your employee ID (e.g., E001)",
+            key=id_key,
+            on_change=on_id_change
+        )
+
+    with col2:
+        employee_name = st.text_input(
+            "📛 Full Name *",
+            placeholder="John Doe",
+            help="Enter your full name",
+            key=name_key
+        )
+
+    record = lookup_employee(n8n_base_url, employee_id)
+    if record:
+        details = [record['Department'] or 'N/A']
+        if record['Hourly Rate']:
+            details.append(f"${record['Hourly Rate']:.2f}/hour")
+        st.caption(f"✅ {record['Employee Name']} · {' · '.join(details)}")
+    elif employee_name:
+        matches = search_employees(n8n_base_url, employee_name)
+        if matches:
+            st.selectbox(
+                "🔍 Matching employees",
+                [None] + [match['Employee ID'] for match in matches],
+                format_func=lambda key: "-- Select yourself --" if key is None else
+                f"{key} · {lookup_employee(n8n_base_url, key)['Employee Name']}",
+                key=pick_key,
+                on_change=on_pick
+            )
+
+    return employee_id, employee_name, record
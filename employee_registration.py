@@ -6,18 +6,16 @@ Allows admins to register new employees
 import streamlit as st
 import requests
 from datetime import datetime
-import time
+
+from n8n_client import send_request
+from employee_directory import invalidate_directory
+from notifications import navigate
 
 
 def call_n8n_webhook(n8n_base_url, endpoint, data=None, method='POST'):
     """Call n8n webhook"""
     try:
-        url = f"{n8n_base_url}/{endpoint}"
-
-        if method == 'POST':
-            response = requests.post(url, json=data, timeout=10)
-        else:
-            response = requests.get(url, timeout=10)
+        response = send_request(n8n_base_url, endpoint, data, method)
 
         if response.status_code == 200:
             return response.json()
@@ -107,14 +105,9 @@ def show_employee_registration(n8n_base_url, departments):
                 result = call_n8n_webhook(n8n_base_url, 'employee/register', employee_data)
 
                 if result:
-                    st.success(f"✅ SUCCESS! Employee {employee_name} ({emp_id}) registered!")
-                    st.balloons()
                     st.session_state.next_employee_id += 1
-                    st.info("Redirecting to dashboard in 2 seconds...")
-
-                    time.sleep(2)
-                    st.session_state.current_page = 'dashboard'
-                    st.rerun()
+                    invalidate_directory()
+                    navigate('dashboard', f"Employee {employee_name} ({emp_id}) registered!", "✅", celebrate=True)
 
 
 if __name__ == "__main__":
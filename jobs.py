@@ -0,0 +1,169 @@
+"""
+Background Jobs Module
+Process-wide job table and worker pools for long n8n actions (payroll,
+attendance checks, kiosk photo uploads): pages enqueue a job and return at
+once, then poll its status, progress and result. A job already queued or
+running under the same key is reused instead of starting a second
+full-sheet scan.
+"""
+
+import functools
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+
+from config import JOB_WORKERS, KIOSK_UPLOAD_WORKERS, get_settings
+
+ACTIVE_STATUSES = ('queued', 'running')
+
+# Worker pools jobs can be submitted to -> number of threads
+POOLS = {'jobs': JOB_WORKERS, 'kiosk': KIOSK_UPLOAD_WORKERS}
+
+_lock = threading.Lock()
+_jobs = {}  # job id -> job record, in submission order
+_ids = itertools.count(1)
+_executors = {}  # pool name -> ThreadPoolExecutor (caller holds the lock)
+
+
+def _get_executor(pool):
+    if pool not in _executors:
+        _executors[pool] = ThreadPoolExecutor(max_workers=POOLS[pool], thread_name_prefix=pool)
+    return _executors[pool]
+
+
+def _update(job_id, **fields):
+    with _lock:
+        _jobs[job_id].update(fields)
+
+
+def _prune(pool):
+    """Drop a pool's oldest finished jobs beyond the history limit (caller holds the lock)"""
+    in_pool = [job_id for job_id, job in _jobs.items() if job['pool'] == pool]
+    finished = [job_id for job_id in in_pool if _jobs[job_id]['status'] not in ACTIVE_STATUSES]
+    for job_id in finished[:max(0, len(in_pool) - get_settings().job_history_limit)]:
+        del _jobs[job_id]
+
+
+def _run(job_id, func, args):
+    def progress(fraction, message=''):
+        _update(job_id, progress=max(0.0, min(1.0, fraction)), message=message)
+
+    _update(job_id, status='running', started_at=time.time())
+    try:
+        result = func(progress, *args)
+    except Exception as e:
+        _update(job_id, status='failed', error=str(e) or type(e).__name__, finished_at=time.time())
+    else:
+        _update(job_id, status='done', result=result, progress=1.0, message='', finished_at=time.time())
+
+
+def submit_job(kind, func, *args, key=None, pool='jobs'):
+    """
+    Queue func(progress, *args) on a worker pool (see POOLS)
+
+    key identifies duplicate work (defaults to kind): while a job with the
+    same key is queued or running its id is returned instead.
+    Returns (job_id, created).
+    """
+    key = key or kind
+    with _lock:
+        for job_id, job in _jobs.items():
+            if job['key'] == key and job['status'] in ACTIVE_STATUSES:
+                return job_id, False
+
+        job_id = next(_ids)
+        _jobs[job_id] = {
+            'id': job_id,
+            'kind': kind,
+            'key': key,
+            'pool': pool,
+            'status': 'queued',
+            'progress': 0.0,
+            'message': '',
+            'result': None,
+            'error': None,
+            'submitted_at': time.time(),
+            'started_at': None,
+            'finished_at': None,
+        }
+        _prune(pool)
+        executor = _get_executor(pool)
+
+    executor.submit(_run, job_id, func, args)
+    return job_id, True
+
+
+def get_job(job_id):
+    """Snapshot of a job record, or None"""
+    with _lock:
+        job = _jobs.get(job_id)
+        return dict(job) if job else None
+
+
+def latest_job(kind):
+    """Most recently submitted job of a kind, or None"""
+    with _lock:
+        for job in reversed(_jobs.values()):
+            if job['kind'] == kind:
+                return dict(job)
+    return None
+
+
+def list_jobs(kind=None):
+    """All jobs (optionally of one kind), newest first"""
+    with _lock:
+        return [dict(job) for job in reversed(_jobs.values()) if kind is None or job['kind'] == kind]
+
+
+# ==================== STREAMLIT WIDGETS ====================
+
+def show_job_status(job):
+    """Status line for a job: queued, progress bar, error or completion time"""
+    if job is None:
+        return
+
+    if job['status'] == 'queued':
+        st.info("⏳ Queued...")
+    elif job['status'] == 'running':
+        st.progress(job['progress'], text=job['message'] or "Working...")
+    elif job['status'] == 'failed':
+        st.error(f"❌ Failed: {job['error']}")
+    else:
+        finished = time.strftime('%H:%M:%S', time.localtime(job['finished_at']))
+        st.caption(f"Finished at {finished} in {job['finished_at'] - job['started_at']:.1f}s")
+
+
+def _any_active(jobs):
+    return any(job and job['status'] in ACTIVE_STATUSES for job in jobs)
+
+
+def job_panel(watched):
+    """
+    Decorator for a panel showing background jobs: it runs as a fragment that
+    reruns every job_poll_interval while one of the jobs watched() returns is
+    queued or running. The timer is set by a full app run that sees an active
+    job; a job submitted from the panel itself asks for one full run to start
+    it. After the jobs finish the timer ticks idle until the next full run.
+    """
+    def decorator(panel):
+        polling_key = f"_job_panel_polling_{panel.__module__}.{panel.__qualname__}"
+
+        @functools.wraps(panel)  # The fragment is identified by the panel's name
+        def body():
+            panel()
+            if _any_active(watched()) and not st.session_state.get(polling_key):
+                st.session_state[polling_key] = True
+                st.rerun()  # Only a full app run can start the fragment's timer
+
+        @functools.wraps(panel)
+        def show():
+            polling = _any_active(watched())
+            st.session_state[polling_key] = polling
+            st.fragment(body, run_every=get_settings().job_poll_interval if polling else None)()
+
+        return show
+
+    return decorator
@@ -0,0 +1,115 @@
+"""
+Kiosk Check-in Module
+Lightweight check-in route for shared kiosks (?mode=kiosk): an Employee ID
+field and the camera, with the capture itself submitting the check-in. The
+directory is kept warm in memory for instant ID lookups, the status comes
+from the compiled shift rules, and the photo is encoded and posted to n8n
+by a background job, so the form is ready for the next person at once.
+Loads no pandas.
+"""
+
+from datetime import datetime
+from io import BytesIO
+
+import streamlit as st
+
+from attendance_checkin import image_to_base64
+from employee_directory import get_directory, keep_warm
+from jobs import get_job, job_panel, submit_job
+from n8n_client import N8NError, send_request
+from notifications import notify
+from shift_rules import checkin_status
+
+RECENT_CHECKINS = 5  # Check-ins of this kiosk listed under the form
+
+STATUS_ICONS = {'queued': '⏳', 'running': '⏳', 'done': '✅', 'failed': '❌'}
+
+
+def submit_checkin(progress, n8n_base_url, attendance_data, photo):
+    """Background job: encode the captured JPEG and post the check-in to n8n"""
+    from PIL import Image
+
+    progress(0.2, "Encoding photo...")
+    image = image_to_base64(Image.open(BytesIO(photo)))
+
+    progress(0.5, "Recording attendance...")
+    response = send_request(n8n_base_url, 'attendance', dict(attendance_data, Image=f"data:image/jpeg;base64,{image}"))
+    if response.status_code != 200:
+        raise N8NError(f"n8n Error {response.status_code}: {response.text}")
+
+    # Dashboard rollups stay current without a sheet rescan (pandas loads in the job, not the page)
+    from rollups import record_checkin
+
+    record_checkin(attendance_data)
+    return attendance_data['Status']
+
+
+def show_kiosk(n8n_base_url):
+    """
+    Kiosk Check-in Page: Employee ID, then one photo that submits
+    """
+    keep_warm(n8n_base_url)
+    st.session_state.setdefault('kiosk_round', 0)
+    st.session_state.setdefault('kiosk_jobs', [])
+
+    st.title("⏰ Attendance Check-in")
+
+    directory = get_directory(n8n_base_url)
+    if not directory['by_id']:
+        st.error("❌ The employee directory is unavailable. Please use the standard check-in page.")
+        return
+
+    # Widget keys change per person, so a submitted check-in leaves a blank form behind
+    person = st.session_state.kiosk_round
+    employee_id = st.text_input("👤 Employee ID", placeholder="E001", key=f"kiosk_id_{person}")
+    record = directory['by_id'].get(employee_id.strip().upper())
+
+    if employee_id and record is None:
+        st.error(f"❌ Employee ID {employee_id} was not found.")
+    elif record:
+        st.markdown(f"**{record['Employee Name']}** · {record['Department'] or 'N/A'}")
+        photo = st.camera_input("📸 Take your photo to check in", key=f"kiosk_photo_{person}")
+
+        if photo is not None:
+            current_time = datetime.now()
+            status, minutes_late = checkin_status(record['Employee ID'], record['Department'], current_time)
+            attendance_data = {
+                "Employee ID": record['Employee ID'],
+                "Employee Name": record['Employee Name'],
+                "Department": record['Department'] or "N/A",
+                "Date": current_time.strftime("%Y-%m-%d"),
+                "Time": current_time.strftime("%I:%M %p"),
+                "Status": status,
+            }
+            job_id, _ = submit_job('kiosk_checkin', submit_checkin, n8n_base_url, attendance_data, photo.getvalue(),
+                                   key=f"kiosk_checkin:{record['Employee ID']}", pool='kiosk')
+
+            label = f"{record['Employee Name']} ({record['Employee ID']}) · {attendance_data['Time']} · {status}"
+            if status == "Late":
+                label += f" ({minutes_late} min)"
+            st.session_state.kiosk_jobs = [(job_id, label), *st.session_state.kiosk_jobs][:RECENT_CHECKINS]
+            notify(f"Thank you, {record['Employee Name']}! {status} at {attendance_data['Time']}",
+                   "✅" if status == "Present" else "⚠️")
+
+            st.session_state.kiosk_round += 1
+            st.rerun()
+
+    show_recent_checkins()
+
+
+@job_panel(lambda: [get_job(job_id) for job_id, _ in st.session_state.get('kiosk_jobs', [])])
+def show_recent_checkins():
+    """This kiosk's latest check-ins with the state of their upload (polled until every upload has finished)"""
+    if not st.session_state.get('kiosk_jobs'):
+        return
+
+    st.markdown("---")
+    st.caption("Recent check-ins")
+    for job_id, label in st.session_state.kiosk_jobs:
+        job = get_job(job_id)
+        if job is None:
+            continue
+        if job['status'] == 'failed':
+            st.error(f"❌ {label}: not recorded ({job['error']}). Please check in again.")
+        else:
+            st.write(f"{STATUS_ICONS[job['status']]} {label}")
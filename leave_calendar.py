@@ -0,0 +1,215 @@
+"""
+Leave Calendar Module
+Interval index over approved and pending leave requests for the overlap and
+team-coverage checks of the leave form and the admin Leave tab. Per
+employee, leave ranges are kept sorted by start day with a running maximum
+of their end days, so whether a new range overlaps any of them is one
+bisect; per department, the start and end days of its people's (merged)
+ranges are kept as two sorted arrays, so how many are off on a day is two
+bisects. Built once per leave sheet version; a leave request or approval in
+any process resets the form's copy.
+"""
+
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import Counter, OrderedDict
+from datetime import date, datetime
+
+import requests
+
+from config import get_settings
+from n8n_client import get_json
+from shared_cache import get_or_fetch, poll_events, subscribe
+from employee_directory import get_directory
+
+# Leave statuses that take someone off the schedule
+BOOKED_STATUSES = ('Approved', 'Pending')
+
+DATE_FORMATS = ('%Y-%m-%d', '%m/%d/%Y')
+CALENDAR_CACHE_SIZE = 2  # Leave sheet versions kept indexed (dashboard)
+
+_lock = threading.Lock()
+_calendar = {'index': None, 'loaded_at': 0.0, 'reset_at': 0.0}  # Leave form's copy
+_calendars = OrderedDict()  # Leave sheet version -> LeaveCalendar (dashboard)
+
+
+def _day(value):
+    """Day number (date ordinal) of a date, a datetime or a sheet date string; None when unreadable"""
+    if isinstance(value, date):
+        return value.toordinal()
+    text = str(value).strip()[:10]
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).toordinal()
+        except ValueError:
+            continue
+    return None
+
+
+def _merge(ranges):
+    """Sorted (start, end) day ranges with overlapping and touching ones joined"""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+class LeaveCalendar:
+    """Approved and pending leave, indexed by employee and by department"""
+
+    def __init__(self, records, directory):
+        self.departments = {key: record['Department'] for key, record in directory.items() if record['Department']}
+        self.headcount = Counter(self.departments.values())
+
+        leaves = {}  # employee key -> [(start, end, leave record)]
+        for record in records:
+            if record.get('Status') not in BOOKED_STATUSES:
+                continue
+            start, end = _day(record.get('Start Date')), _day(record.get('End Date'))
+            key = str(record.get('Employee ID', '')).strip().upper()
+            if start is None or end is None or end < start or not key:
+                continue
+            leaves.setdefault(key, []).append((start, end, record))
+
+        self.by_employee = {}  # employee key -> (starts, running max of ends, leave ranges)
+        ranges_by_department = {}
+        for key, ranges in leaves.items():
+            ranges.sort(key=lambda leave: leave[:2])
+            running_end, reach = [], None
+            for _, end, _ in ranges:
+                reach = end if reach is None else max(reach, end)
+                running_end.append(reach)
+            self.by_employee[key] = ([start for start, _, _ in ranges], running_end, ranges)
+
+            department = self.departments.get(key)
+            if department:
+                ranges_by_department.setdefault(department, []).extend(
+                    _merge((start, end) for start, end, _ in ranges))
+
+        # A person counts once per day, hence the merged ranges
+        self.by_department = {department: (sorted(start for start, _ in merged), sorted(end for _, end in merged))
+                              for department, merged in ranges_by_department.items()}
+
+    def overlapping(self, employee_id, start, end, exclude=None):
+        """Booked leave records of an employee that share a day with start..end (except Leave ID exclude)"""
+        entry = self.by_employee.get(str(employee_id).strip().upper())
+        start, end = _day(start), _day(end)
+        if entry is None or start is None or end is None:
+            return []
+
+        starts, running_end, ranges = entry
+        found = []
+        # Ranges starting after end cannot overlap; walk back while any earlier one still reaches start
+        position = bisect_right(starts, end) - 1
+        while position >= 0 and running_end[position] >= start:
+            _, leave_end, record = ranges[position]
+            if leave_end >= start and record.get('Leave ID') != exclude:
+                found.append(record)
+            position -= 1
+        return found[::-1]
+
+    def on_leave(self, department, day):
+        """Number of people in a department on booked leave on a day (day number)"""
+        starts, ends = self.by_department.get(department, ((), ()))
+        return bisect_right(starts, day) - bisect_left(ends, day)
+
+    def peak_on_leave(self, department, start, end):
+        """(most people of a department off on one day within start..end, that day's number)"""
+        starts, _ = self.by_department.get(department, ((), ()))
+        # The count only rises on a start day, so those (and start itself) are the days to check
+        days = [start, *starts[bisect_right(starts, start):bisect_right(starts, end)]]
+        return max((self.on_leave(department, day), day) for day in days)
+
+    def coverage_warning(self, employee_id, start, end, counted=False):
+        """
+        Message when leave start..end would take more of the employee's
+        department off at once than max_department_on_leave allows, else
+        None; counted means the range is already booked (approving a
+        pending request)
+        """
+        department = self.departments.get(str(employee_id).strip().upper())
+        start, end = _day(start), _day(end)
+        if not department or start is None or end is None:
+            return None
+
+        peak, day = self.peak_on_leave(department, start, end)
+        off = peak if counted else peak + 1
+        headcount = self.headcount[department]
+        if off <= max(1, int(headcount * get_settings().max_department_on_leave)):
+            return None
+        return (f"{off} of {headcount} {department} employees would be on leave "
+                f"on {date.fromordinal(day).strftime('%b %d, %Y')}.")
+
+    def review(self, leave):
+        """Warnings for approving a pending leave record: overlaps with the employee's other leave, then coverage"""
+        employee_id, start, end = leave.get('Employee ID'), leave.get('Start Date'), leave.get('End Date')
+        warnings = [f"Overlaps {record.get('Status', '').lower()} leave {record.get('Leave ID', 'N/A')} "
+                    f"({record.get('Start Date')} to {record.get('End Date')})."
+                    for record in self.overlapping(employee_id, start, end, exclude=leave.get('Leave ID'))]
+        coverage = self.coverage_warning(employee_id, start, end, counted=True)
+        return warnings + [coverage] if coverage else warnings
+
+
+def _fetch_records(n8n_base_url):
+    """Leave request records from n8n, or None when the call fails"""
+    try:
+        status_code, body = get_json(n8n_base_url, 'admin/get-leave')
+    except (requests.exceptions.RequestException, ValueError):
+        return None
+    return body.get('data', []) if status_code == 200 else None
+
+
+def get_calendar(n8n_base_url, force=False):
+    """The leave form's calendar, reloaded when the TTL has expired (None until a load succeeds)"""
+    poll_events()  # Leave requests and approvals in other worker processes reset loaded_at
+
+    with _lock:
+        if not force and time.time() - _calendar['loaded_at'] < get_settings().leave_calendar_ttl:
+            return _calendar['index']
+
+    # Fetched and built outside the lock, so a slow n8n call does not hold up
+    # the other sessions' forms (concurrent fetches are coalesced by get_json)
+    started = time.time()
+    records = get_or_fetch('leave', 'calendar', lambda: _fetch_records(n8n_base_url))
+    index = LeaveCalendar(records, get_directory(n8n_base_url)['by_id']) if records is not None else None
+
+    with _lock:
+        if index is not None:
+            _calendar['index'] = index
+        # A change that landed mid-fetch leaves the calendar expired, so the next call fetches again
+        if _calendar['reset_at'] < started:
+            _calendar['loaded_at'] = time.time()
+        return _calendar['index']
+
+
+def _on_leave_changed(namespace):
+    with _lock:
+        _calendar['loaded_at'] = 0.0
+        _calendar['reset_at'] = time.time()
+
+
+subscribe('leave', _on_leave_changed)
+
+
+def calendar_for(df_leave, n8n_base_url):
+    """LeaveCalendar of a leave DataFrame, built once per df.attrs['version'] (None when it has no version)"""
+    version = df_leave.attrs.get('version')
+    if version is None:
+        return None
+
+    with _lock:
+        calendar = _calendars.get(version)
+        if calendar is not None:
+            _calendars.move_to_end(version)
+            return calendar
+
+    calendar = LeaveCalendar(df_leave.to_dict('records'), get_directory(n8n_base_url)['by_id'])
+    with _lock:
+        _calendars[version] = calendar
+        while len(_calendars) > CALENDAR_CACHE_SIZE:
+            _calendars.popitem(last=False)
+    return calendar
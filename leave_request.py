@@ -8,16 +8,15 @@ import requests
 from datetime import datetime, timedelta
 import time
 
+from n8n_client import send_request
+from employee_directory import validate_employee
+from leave_calendar import get_calendar
+
 
 def call_n8n_webhook(n8n_base_url, endpoint, data=None, method='POST'):
     """Call n8n webhook"""
     try:
-        url = f"{n8n_base_url}/{endpoint}"
-
-        if method == 'POST':
-            response = requests.post(url, json=data, timeout=10)
-        else:
-            response = requests.get(url, timeout=10)
+        response = send_request(n8n_base_url, endpoint, data, method)
 
         if response.status_code == 200:
             return response.json()
@@ -49,26 +48,6 @@ def show_leave_request(n8n_base_url):
     Leave Request Submission Page
     """
 
-    # Custom CSS
-    st.markdown("""
-    <style>
-        .info-box {
-            background: #edf2f7;
-            padding: 15px;
-            border-radius: 10px;
-            margin-bottom: 25px;
-            border-left: 4px solid #667eea;
-        }
-        .leave-summary {
-            background: #f7fafc;
-            padding: 20px;
-            border-radius: 10px;
-            margin: 20px 0;
-            border: 2px solid #e2e8f0;
-        }
-    </style>
-    """, unsafe_allow_html=True)
-
     # Header
     st.markdown("""
     <div style='text-align: center; margin-bottom: 30px;'>
@@ -197,6 +176,11 @@ def show_leave_request(n8n_base_url):
             st.error("❌ Please enter Employee ID and Name!")
             return
 
+        error = validate_employee(n8n_base_url, employee_id, employee_name)
+        if error:
+            st.error(f"❌ {error}")
+            return
+
         if leave_type == "-- Select Leave Type --":
             st.error("❌ Please select a leave type!")
             return
@@ -213,6 +197,18 @@ def show_leave_request(n8n_base_url):
             st.error("❌ Please provide a detailed reason (at least 10 characters)!")
             return
 
+        # Overlap with the employee's own leave blocks the request; team coverage only warns
+        calendar = get_calendar(n8n_base_url)
+        coverage = None
+        if calendar is not None:
+            clashes = calendar.overlapping(employee_id, start_date, end_date)
+            if clashes:
+                clash = clashes[0]
+                st.error(f"❌ These dates overlap your {clash.get('Status', '').lower()} leave "
+                         f"{clash.get('Leave ID', '')} ({clash.get('Start Date')} to {clash.get('End Date')})!")
+                return
+            coverage = calendar.coverage_warning(employee_id, start_date, end_date)
+
         # Generate Leave ID
         leave_id = f"L{datetime.now().strftime('%Y%m%d%H%M%S')}"
 
@@ -254,6 +250,9 @@ def show_leave_request(n8n_base_url):
 
                 st.balloons()
 
+                if coverage:
+                    st.warning(f"⚠️ {coverage} Approval may take longer than usual.")
+
                 # Show next steps
                 st.info("""
                 📌 **Next Steps:**
@@ -0,0 +1,214 @@
+"""
+n8n Client Module
+Shared HTTP layer for all n8n webhook calls; every call is timed and its
+payload sizes, status and errors are recorded in webhook_metrics. Idempotent
+calls are retried with jittered exponential backoff, and a per-endpoint
+circuit breaker fails calls fast while n8n is down instead of letting every
+session wait out its timeouts. Identical GETs made at the same time by
+different sessions share a single call, and successful writes invalidate
+the shared cache entries of the sheets they change.
+"""
+
+import random
+import threading
+import time
+
+import requests
+
+from config import get_settings
+from shared_cache import invalidate_for_write
+from wire_format import loads
+from webhook_metrics import record_call, record_coalesced, record_retry, record_short_circuit
+
+# Responses worth retrying for idempotent calls
+RETRY_STATUSES = (429, 502, 503, 504)
+
+_circuit_lock = threading.Lock()
+_circuits = {}  # endpoint -> {'state', 'failures', 'opened_at', 'probing'}
+
+_flight_lock = threading.Lock()
+_in_flight = {}  # (url, params) -> _Flight of the GET currently being made
+
+
+class N8NError(Exception):
+    """An n8n call failed where there is no page to report it on (background jobs)"""
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """The endpoint's circuit is open, so the call was not sent"""
+
+
+def _error_kind(exc):
+    if isinstance(exc, requests.exceptions.Timeout):
+        return 'timeout'
+    if isinstance(exc, requests.exceptions.ConnectionError):
+        return 'connection'
+    return type(exc).__name__
+
+
+# ==================== CIRCUIT BREAKER ====================
+
+def _check_circuit(endpoint):
+    """Raise CircuitOpenError while the circuit is open; let one probe through once it is half-open"""
+    with _circuit_lock:
+        circuit = _circuits.get(endpoint)
+        if circuit is None or circuit['state'] == 'closed':
+            return
+
+        if circuit['state'] == 'open' and time.monotonic() - circuit['opened_at'] >= get_settings().circuit_reset_timeout:
+            circuit['state'] = 'half_open'
+        if circuit['state'] == 'half_open' and not circuit['probing']:
+            circuit['probing'] = True
+            return
+
+    record_short_circuit(endpoint)
+    raise CircuitOpenError(f"n8n endpoint '{endpoint}' is failing; calls are paused (circuit open)")
+
+
+def _record_outcome(endpoint, failed):
+    """Close the circuit on success; open it after too many consecutive failures or a failed probe"""
+    with _circuit_lock:
+        circuit = _circuits.setdefault(endpoint, {'state': 'closed', 'failures': 0, 'opened_at': 0.0,
+                                                  'probing': False})
+        circuit['probing'] = False
+        if not failed:
+            circuit['state'] = 'closed'
+            circuit['failures'] = 0
+            return
+
+        circuit['failures'] += 1
+        if circuit['state'] == 'half_open' or circuit['failures'] >= get_settings().circuit_failure_threshold:
+            circuit['state'] = 'open'
+            circuit['opened_at'] = time.monotonic()
+
+
+def circuit_states():
+    """{endpoint: 'closed' | 'open' | 'half_open'}"""
+    with _circuit_lock:
+        return {endpoint: circuit['state'] for endpoint, circuit in _circuits.items()}
+
+
+def reset_circuits():
+    """Close every circuit"""
+    with _circuit_lock:
+        _circuits.clear()
+
+
+# ==================== REQUESTS ====================
+
+def _backoff(attempt, settings):
+    """Full jitter: a random wait up to base * 2^(attempt - 1), capped"""
+    return random.uniform(0, min(settings.retry_backoff_max, settings.retry_backoff_base * 2 ** (attempt - 1)))
+
+
+def _send_once(url, endpoint, data, method, params, timeout, headers):
+    start = time.perf_counter()
+
+    try:
+        if method == 'POST':
+            response = requests.post(url, json=data, headers=headers, timeout=timeout)
+        else:
+            response = requests.get(url, params=params, headers=headers, timeout=timeout)
+    except Exception as e:
+        record_call(endpoint, method, time.perf_counter() - start, error=_error_kind(e))
+        raise
+
+    body = response.request.body if response.request is not None else None
+    record_call(
+        endpoint,
+        method,
+        time.perf_counter() - start,
+        status=response.status_code,
+        request_bytes=len(body) if body else 0,
+        response_bytes=len(response.content),
+        error=None if response.status_code in (200, 304) else f"http_{response.status_code}"
+    )
+    return response
+
+
+def send_request(n8n_base_url, endpoint, data=None, method='POST', params=None, timeout=None, idempotent=None,
+                 headers=None):
+    """
+    Send a request to an n8n webhook and return the requests.Response
+
+    Idempotent calls (GETs unless told otherwise) are retried on timeouts,
+    connection errors and 429/502/503/504; other calls only when the
+    connection could not be opened, since n8n never saw them. While the
+    endpoint's circuit is open CircuitOpenError, a requests ConnectionError,
+    is raised without sending. Exceptions from requests are re-raised
+    unchanged after being recorded, so callers keep their existing error
+    handling.
+    """
+    settings = get_settings()
+    url = f"{n8n_base_url}/{endpoint}"
+    timeout = timeout or (settings.api_connect_timeout, settings.api_read_timeout)
+    idempotent = method == 'GET' if idempotent is None else idempotent
+
+    for attempt in range(settings.max_retries + 1):
+        last_attempt = attempt == settings.max_retries
+        if attempt:
+            record_retry(endpoint)
+            time.sleep(_backoff(attempt, settings))
+
+        _check_circuit(endpoint)
+        try:
+            response = _send_once(url, endpoint, data, method, params, timeout, headers)
+        except Exception as e:
+            failed = isinstance(e, (requests.exceptions.Timeout, requests.exceptions.ConnectionError))
+            _record_outcome(endpoint, failed)
+            retryable = idempotent or isinstance(e, requests.exceptions.ConnectTimeout)
+            if not (failed and retryable) or last_attempt:
+                raise
+            continue
+
+        _record_outcome(endpoint, response.status_code >= 500)
+        if not (idempotent and response.status_code in RETRY_STATUSES) or last_attempt:
+            if method != 'GET' and response.status_code == 200:
+                invalidate_for_write(endpoint)
+            return response
+
+
+# ==================== REQUEST COALESCING ====================
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+def get_json(n8n_base_url, endpoint, params=None, headers=None):
+    """
+    GET a webhook and decode its JSON, sharing one in-flight call among all
+    concurrent callers asking for the same URL, parameters and headers
+
+    Returns (status_code, body): the decoded JSON for a 200, the response
+    text otherwise (empty for a 304). Every waiter gets the same result
+    (treat it as read-only) or the same exception.
+    """
+    key = (f"{n8n_base_url}/{endpoint}", tuple(sorted((params or {}).items())),
+           tuple(sorted((headers or {}).items())))
+    with _flight_lock:
+        flight = _in_flight.get(key)
+        leader = flight is None
+        if leader:
+            flight = _in_flight[key] = _Flight()
+
+    if not leader:
+        record_coalesced(endpoint)
+        flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    try:
+        response = send_request(n8n_base_url, endpoint, method='GET', params=params, headers=headers)
+        flight.result = (response.status_code, loads(response.content) if response.status_code == 200 else response.text)
+        return flight.result
+    except Exception as e:
+        flight.error = e
+        raise
+    finally:
+        with _flight_lock:
+            del _in_flight[key]
+        flight.done.set()
@@ -0,0 +1,43 @@
+"""
+Notifications Module
+Queued toasts, balloons and flash messages that survive st.rerun(), so pages
+can announce a result and move on at once instead of sleeping the script
+thread to keep a message on screen
+"""
+
+import streamlit as st
+
+
+def notify(message, icon=None, celebrate=False):
+    """Queue a toast (and optionally balloons) for the next run"""
+    st.session_state.setdefault('pending_toasts', []).append((message, icon, celebrate))
+
+
+def flash(kind, message, celebrate=False):
+    """Queue a st.success / st.warning / st.info / st.error banner for the next run"""
+    st.session_state.setdefault('pending_flashes', []).append((kind, message, celebrate))
+
+
+def navigate(page, message=None, icon=None, celebrate=False):
+    """Switch to another page immediately, announcing why with a toast there"""
+    if message:
+        notify(message, icon, celebrate)
+    st.session_state.current_page = page
+    st.rerun()
+
+
+def show_toasts():
+    """Show and clear queued toasts (safe to call from fragments)"""
+    for message, icon, celebrate in st.session_state.pop('pending_toasts', []):
+        st.toast(message, icon=icon)
+        if celebrate:
+            st.balloons()
+
+
+def show_notifications():
+    """Show and clear everything queued by the previous run"""
+    show_toasts()
+    for kind, message, celebrate in st.session_state.pop('pending_flashes', []):
+        getattr(st, kind)(message)
+        if celebrate:
+            st.balloons()
@@ -0,0 +1,121 @@
+"""
+Overtime Engine Module
+Vectorized overtime pay calculation with configurable policy rules:
+weekend / holiday / double-time multipliers and daily / weekly hour caps
+"""
+
+import numpy as np
+import pandas as pd
+
+from config import get_settings
+
+
+def _capped(hours, groups, cap):
+    """
+    Hours of each row that still fit under a per-group cap, allocated in row
+    order: clip(cumulative after row) - clip(cumulative before row)
+    """
+    after = hours.groupby(groups).cumsum()
+    before = after - hours
+    return after.clip(upper=cap) - before.clip(upper=cap)
+
+
+def calculate_overtime_pay(df, policy=None, holidays=None):
+    """
+    Compute overtime pay for a whole frame of entries in one pass
+
+    Expects 'Employee ID', 'Date', 'Overtime Hours' and an hourly rate column
+    ('Hourly Rate' or 'Regular Rate'). Returns a copy with 'Paid Overtime Hours',
+    'Double Time Hours', 'Overtime Multiplier', 'Overtime Rate' and
+    'Overtime Pay' (re)computed.
+    """
+    settings = get_settings()
+    policy = {**settings.overtime_policy, **(policy or {})}
+    holidays = pd.to_datetime(pd.Series(settings.holidays if holidays is None else holidays), errors='coerce')
+
+    result = df.copy()
+    if result.empty:
+        return result
+
+    rate_column = 'Hourly Rate' if 'Hourly Rate' in result.columns else 'Regular Rate'
+    rate = pd.to_numeric(result[rate_column], errors='coerce').fillna(0.0).to_numpy()
+    hours = pd.to_numeric(result['Overtime Hours'], errors='coerce').fillna(0.0).clip(lower=0)
+    dates = pd.to_datetime(result['Date'], errors='coerce')
+    employee = result['Employee ID'].astype(str)
+
+    # Entries are allocated to the caps in date order (stable for same-day rows)
+    order = np.argsort(dates.to_numpy(), kind='stable')
+    hours = hours.iloc[order].reset_index(drop=True)
+    dates = dates.iloc[order].reset_index(drop=True)
+    employee = employee.iloc[order].reset_index(drop=True)
+
+    # Integer group keys (employee x day, employee x Monday-based week) keep
+    # the group-bys cheap; 1970-01-01 was a Thursday, hence the +3
+    employee_code = pd.factorize(employee)[0].astype(np.int64)
+    day_number = dates.to_numpy().astype('datetime64[D]').astype(np.int64)
+    day_key = employee_code * 1_000_000 + day_number
+    week_key = employee_code * 1_000_000 + (day_number + 3) // 7
+
+    paid = _capped(hours, day_key, policy['max_hours_per_day'])
+    paid = _capped(paid, week_key, policy['max_hours_per_week'])
+
+    # Hours beyond the double-time threshold on a given day are double time
+    standard = _capped(paid, day_key, policy['double_time_after_hours'])
+    double_time = paid - standard
+
+    weekday = dates.dt.weekday.to_numpy()
+    is_holiday = dates.isin(holidays).to_numpy()
+    is_weekend = (weekday >= 5) & ~is_holiday
+    base_multiplier = np.select(
+        [is_holiday, is_weekend],
+        [policy['holiday_multiplier'], policy['weekend_multiplier']],
+        default=policy['multiplier']
+    )
+    double_multiplier = np.maximum(base_multiplier, policy['double_time_multiplier'])
+
+    # Undo the date sort so results line up with the input rows
+    inverse = np.empty_like(order)
+    inverse[order] = np.arange(len(order))
+    paid = paid.to_numpy()[inverse]
+    double_time = double_time.to_numpy()[inverse]
+    standard = standard.to_numpy()[inverse]
+    base_multiplier = base_multiplier[inverse]
+    double_multiplier = double_multiplier[inverse]
+
+    pay = rate * (standard * base_multiplier + double_time * double_multiplier)
+    multiplier = np.divide(pay, rate * paid, out=base_multiplier.astype(float), where=(rate * paid) > 0)
+
+    result['Paid Overtime Hours'] = paid.round(2)
+    result['Double Time Hours'] = double_time.round(2)
+    result['Overtime Multiplier'] = multiplier.round(3)
+    result['Overtime Rate'] = (rate * multiplier).round(2)
+    result['Overtime Pay'] = pay.round(2)
+    return result
+
+
+def quote_overtime(employee_id, date, overtime_hours, hourly_rate, policy=None, existing=None):
+    """
+    Overtime pay for a single new entry (used by the Overtime Log form);
+    existing is the employee's already logged entries ('Date', 'Overtime
+    Hours') of that week, which count first against the daily and weekly caps
+    """
+    entry = pd.DataFrame([{
+        'Employee ID': employee_id,
+        'Date': date,
+        'Overtime Hours': overtime_hours,
+        'Hourly Rate': hourly_rate
+    }])
+    if existing is not None and not existing.empty:
+        logged = existing[['Date', 'Overtime Hours']].assign(**{'Employee ID': employee_id, 'Hourly Rate': hourly_rate})
+        entry = pd.concat([logged, entry], ignore_index=True)
+
+    quote = calculate_overtime_pay(entry, policy)
+    return quote.iloc[-1].to_dict()
+
+
+def overtime_pay_by_employee(df, policy=None):
+    """Total overtime pay per Employee ID"""
+    if df.empty:
+        return pd.Series(dtype='float64')
+    pay = calculate_overtime_pay(df, policy)
+    return pay.groupby(pay['Employee ID'].astype(str))['Overtime Pay'].sum()
@@ -8,16 +8,19 @@ import requests
 from datetime import datetime, timedelta
 import time
 
+import pandas as pd
+
+from config import get_settings
+from n8n_client import get_json, send_request
+from overtime_engine import quote_overtime
+from employee_directory import employee_fields, validate_employee
+from shared_cache import get_or_fetch
+
 
 def call_n8n_webhook(n8n_base_url, endpoint, data=None, method='POST'):
     """Call n8n webhook"""
     try:
-        url = f"{n8n_base_url}/{endpoint}"
-
-        if method == 'POST':
-            response = requests.post(url, json=data, timeout=10)
-        else:
-            response = requests.get(url, timeout=10)
+        response = send_request(n8n_base_url, endpoint, data, method)
 
         if response.status_code == 200:
             return response.json()
@@ -32,36 +35,37 @@ def call_n8n_webhook(n8n_base_url, endpoint, data=None, method='POST'):
         return None
 
 
+def _fetch_overtime_since(n8n_base_url, day):
+    """Overtime records dated day ('YYYY-MM-DD') or later, or None when the call fails"""
+    try:
+        status_code, body = get_json(n8n_base_url, 'admin/get-overtime', {'since': day})
+    except (requests.exceptions.RequestException, ValueError):
+        return None
+    return body.get('data', []) if status_code == 200 else None
+
+
+def logged_overtime(n8n_base_url, employee_id, day):
+    """
+    An employee's overtime already logged in the (Monday-based) week of day,
+    for the caps of a new entry; the week's rows come through the shared
+    cache, which a new overtime log resets
+    """
+    week_start = day - timedelta(days=day.weekday())
+    week_end = week_start + timedelta(days=6)
+    records = get_or_fetch('overtime', f"week:{week_start}",
+                           lambda: _fetch_overtime_since(n8n_base_url, week_start.strftime('%Y-%m-%d')))
+
+    df = pd.DataFrame(records or [], columns=['Employee ID', 'Date', 'Overtime Hours'])
+    dates = pd.to_datetime(df['Date'], errors='coerce').dt.date
+    mine = df['Employee ID'].astype(str).str.strip().str.upper() == str(employee_id).strip().upper()
+    return df[mine & (dates >= week_start) & (dates <= week_end)]
+
+
 def show_overtime_log(n8n_base_url):
     """
     Overtime Logging Page with Real-time Calculation
     """
-
-    # Custom CSS
-    st.markdown("""
-    <style>
-        .info-box {
-            background: #edf2f7;
-            padding: 15px;
-            border-radius: 10px;
-            margin-bottom: 25px;
-            border-left: 4px solid #667eea;
-        }
-        .calculation-box {
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            padding: 25px;
-            border-radius: 15px;
-            margin: 20px 0;
-            text-align: center;
-        }
-        .pay-amount {
-            font-size: 48px;
-            font-weight: 700;
-            margin: 15px 0;
-        }
-    </style>
-    """, unsafe_allow_html=True)
+    policy = get_settings().overtime_policy
 
     # Header
     st.markdown("""
@@ -77,13 +81,17 @@ def show_overtime_log(n8n_base_url):
         st.rerun()
 
     # Info Box
-    st.markdown("""
+    st.markdown(f"""
     <div class='info-box'>
         <h4>📋 Overtime Policy:</h4>
         <p>
-            • Overtime rate: 1.5x regular hourly rate<br>
+            • Overtime rate: {policy['multiplier']}x regular hourly rate
+            ({policy['weekend_multiplier']}x weekends, {policy['holiday_multiplier']}x holidays)<br>
+            • Double time ({policy['double_time_multiplier']}x) after
+            {policy['double_time_after_hours']:g} overtime hours in a day<br>
             • Must be pre-approved by manager<br>
-            • Maximum 8 hours per day<br>
+            • Maximum {policy['max_hours_per_day']:g} hours per day,
+            {policy['max_hours_per_week']:g} hours per week<br>
             • Log within 24 hours of completion<br>
             • Requires justification and approval
         </p>
@@ -92,24 +100,12 @@ def show_overtime_log(n8n_base_url):
 
     st.subheader("📝 Overtime Details")
 
-    # Employee Information
-    col1, col2 = st.columns(2)
+    # Employee Information (hourly rate is prefilled from the directory)
+    def prefill_rate(record):
+        if record['Hourly Rate']:
+            st.session_state.hr_rate = min(max(record['Hourly Rate'], 10.0), 100.0)
 
-    with col1:
-        employee_id = st.text_input(
-            "👤 Employee ID *",
-            placeholder="E001",
-            help="Your employee ID",
-            key="emp_id"
-        )
-
-    with col2:
-        employee_name = st.text_input(
-            "📛 Full Name *",
-            placeholder="John Doe",
-            help="Your full name",
-            key="emp_name"
-        )
+    employee_id, employee_name, _ = employee_fields(n8n_base_url, "overtime_emp", on_select=prefill_rate)
 
     # Date and Hours
     col1, col2 = st.columns(2)
@@ -127,10 +123,10 @@ def show_overtime_log(n8n_base_url):
         overtime_hours = st.number_input(
             "⏱️ Overtime Hours *",
             min_value=0.5,
-            max_value=8.0,
+            max_value=float(policy['max_hours_per_day']),
             value=2.0,
             step=0.5,
-            help="Number of overtime hours (0.5 - 8.0)",
+            help=f"Number of overtime hours (0.5 - {policy['max_hours_per_day']:g})",
             key="ot_hours"
         )
 
@@ -159,9 +155,13 @@ def show_overtime_log(n8n_base_url):
             key="hr_rate"
         )
 
-    # Calculate overtime pay in real-time
-    overtime_rate = hourly_rate * 1.5
-    overtime_pay = overtime_hours * overtime_rate
+    # Calculate overtime pay in real-time (after the hours already logged that week)
+    logged = logged_overtime(n8n_base_url, employee_id, overtime_date) if employee_id else None
+    quote = quote_overtime(employee_id, overtime_date, overtime_hours, hourly_rate, existing=logged)
+    overtime_rate = quote['Overtime Rate']
+    overtime_pay = quote['Overtime Pay']
+    multiplier = quote['Overtime Multiplier']
+    paid_hours = quote['Paid Overtime Hours']
 
     # Display calculation in real-time (updates automatically with inputs)
     st.markdown(f"""
@@ -169,7 +169,7 @@ def show_overtime_log(n8n_base_url):
         <div style='font-size: 16px; opacity: 0.9;'>Estimated Overtime Pay</div>
         <div class='pay-amount'>${overtime_pay:.2f}</div>
         <div style='font-size: 14px; opacity: 0.8;'>
-            {overtime_hours} hours × ${overtime_rate:.2f}/hour (1.5x rate)
+            {overtime_hours} hours × ${overtime_rate:.2f}/hour ({multiplier:g}x rate)
         </div>
         <div style='font-size: 12px; opacity: 0.7; margin-top: 10px;'>
             Regular Rate: ${hourly_rate:.2f}/hour | Overtime Rate: ${overtime_rate:.2f}/hour
@@ -177,6 +177,11 @@ def show_overtime_log(n8n_base_url):
     </div>
     """, unsafe_allow_html=True)
 
+    if paid_hours < overtime_hours:
+        logged_hours = pd.to_numeric(logged['Overtime Hours'], errors='coerce').sum() if logged is not None else 0
+        st.warning(f"⚠️ Only {paid_hours:g} of {overtime_hours:g} hours are paid: {logged_hours:g} hours are already "
+                   f"logged this week (max {policy['max_hours_per_day']:g}/day, {policy['max_hours_per_week']:g}/week).")
+
     # Reason for Overtime
     reason = st.text_area(
         "💬 Reason for Overtime *",
@@ -217,6 +222,11 @@ def show_overtime_log(n8n_base_url):
             st.error("❌ Please enter Employee ID and Name!")
             return
 
+        error = validate_employee(n8n_base_url, employee_id, employee_name)
+        if error:
+            st.error(f"❌ {error}")
+            return
+
         if overtime_hours <= 0:
             st.error("❌ Overtime hours must be greater than 0!")
             return
@@ -266,7 +276,7 @@ def show_overtime_log(n8n_base_url):
                 with st.expander("💰 Payment Breakdown"):
                     st.write(f"""
                     **Regular Rate:** ${hourly_rate:.2f}/hour  
-                    **Overtime Rate (1.5x):** ${overtime_rate:.2f}/hour  
+                    **Overtime Rate ({multiplier:g}x):** ${overtime_rate:.2f}/hour  
                     **Overtime Hours:** {overtime_hours} hours  
                     **Total Overtime Pay:** ${overtime_pay:.2f}  
 
@@ -315,9 +325,9 @@ def show_overtime_log(n8n_base_url):
         """)
 
     with col2:
-        st.markdown("""
+        st.markdown(f"""
         **Payment Information:**
-        - 💰 Overtime rate: 1.5x regular rate
+        - 💰 Overtime rate: {policy['multiplier']}x regular rate
         - 📅 Paid in next payroll cycle
         - 🧾 Subject to standard deductions
         - 📊 View in payroll reports
@@ -0,0 +1,67 @@
+"""
+Payroll Module
+Monthly payroll computed from the per-employee-month attendance rollups
+"""
+
+import calendar
+from datetime import datetime
+
+import pandas as pd
+
+from config import get_settings
+from overtime_engine import overtime_pay_by_employee
+from rollups import employee_month_summary
+
+DEFAULT_HOURLY_RATE = 15.0
+
+
+def previous_month(today=None):
+    """Return the month before today as 'YYYY-MM'"""
+    today = today or datetime.now()
+    if today.month == 1:
+        return f"{today.year - 1}-12"
+    return f"{today.year}-{today.month - 1:02d}"
+
+
+def calculate_monthly_payroll(month=None, hourly_rates=None, df_overtime=None):
+    """
+    Payroll for one month ('YYYY-MM', defaults to last month)
+    Same columns as the n8n "Calculate Monthly Payroll" node, plus overtime
+    pay for the month computed by the overtime engine in one pass
+    """
+    settings = get_settings()
+    month = month or previous_month()
+    rates = dict(settings.default_hourly_rates)
+    rates.update(hourly_rates or {})
+
+    summary = employee_month_summary(month)
+    if summary.empty:
+        return pd.DataFrame()
+
+    year, mon = (int(part) for part in month.split('-'))
+    period = f"{mon}/1/{year} - {mon}/{calendar.monthrange(year, mon)[1]}/{year}"
+
+    hourly_rate = summary['Employee ID'].map(rates).fillna(DEFAULT_HOURLY_RATE).astype(float)
+    hours_worked = summary['Days Present'] * settings.working_hours_per_day
+    overtime_pay = pd.Series(0.0, index=summary.index)
+    if df_overtime is not None and not df_overtime.empty and 'Date' in df_overtime.columns:
+        in_month = pd.to_datetime(df_overtime['Date'], errors='coerce').dt.strftime('%Y-%m') == month
+        by_employee = overtime_pay_by_employee(df_overtime[in_month])
+        overtime_pay = summary['Employee ID'].map(by_employee).fillna(0.0)
+
+    gross_pay = hours_worked * hourly_rate + overtime_pay
+    tax = gross_pay * settings.tax_rate
+
+    return pd.DataFrame({
+        'Employee ID': summary['Employee ID'],
+        'Employee Name': summary['Employee Name'],
+        'Days Present': summary['Days Present'],
+        'Hours Worked': hours_worked,
+        'Hourly Rate': hourly_rate,
+        'Overtime Pay': overtime_pay.round(2),
+        'Gross Pay': gross_pay.round(2),
+        f'Tax ({settings.tax_rate:.0%})': tax.round(2),
+        'Net Pay': (gross_pay - tax).round(2),
+        'Period': period,
+        'Generated On': datetime.now().strftime('%m/%d/%Y'),
+    })
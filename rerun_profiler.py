@@ -0,0 +1,174 @@
+"""
+Rerun Profiler Module
+Opt-in timing of each Streamlit rerun, broken down by named sections
+(fetch, normalize, filter, render), with optional cProfile / pyinstrument
+capture. Results go to a rolling JSON lines log that can be summarized and
+diffed between releases:
+
+    python rerun_profiler.py .cache/rerun_profile.jsonl [baseline.jsonl]
+"""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from config import (
+    APP_VERSION,
+    ENABLE_RERUN_PROFILER,
+    RERUN_PROFILER_CAPTURE,
+    RERUN_PROFILE_LOG,
+    RERUN_PROFILE_LOG_MAX_BYTES
+)
+
+# pyinstrument is optional; only needed for RERUN_PROFILER_CAPTURE = 'pyinstrument'
+try:
+    from pyinstrument import Profiler as _PyinstrumentProfiler
+
+    _has_pyinstrument = True
+except ImportError:
+    _has_pyinstrument = False
+
+_local = threading.local()
+_log_lock = threading.Lock()
+
+
+@contextmanager
+def section(name):
+    """Time a named part of the current rerun (no-op when profiling is off)"""
+    record = getattr(_local, 'record', None)
+    if record is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = (time.perf_counter() - start) * 1000
+        record['sections'][name] = round(record['sections'].get(name, 0.0) + elapsed, 2)
+
+
+@contextmanager
+def profile_rerun(page, started_at=None):
+    """
+    Profile one rerun of the app script for the given page
+
+    started_at: perf_counter() taken at the top of the script, so the total
+    also covers imports, config and the sidebar.
+    """
+    if not ENABLE_RERUN_PROFILER:
+        yield
+        return
+
+    started_at = started_at or time.perf_counter()
+    record = {'ts': round(time.time(), 3), 'version': APP_VERSION, 'page': page, 'sections': {}}
+    _local.record = record
+
+    profiler = _start_capture()
+    outcome = 'ok'
+    try:
+        yield
+    except BaseException as e:
+        # st.rerun() / st.stop() end the script with a control-flow exception
+        outcome = type(e).__name__
+        raise
+    finally:
+        record['total_ms'] = round((time.perf_counter() - started_at) * 1000, 2)
+        record['outcome'] = outcome
+        if profiler is not None:
+            record['capture'] = _finish_capture(profiler, record)
+        _local.record = None
+        _append(record)
+
+
+def _start_capture():
+    if RERUN_PROFILER_CAPTURE == 'cprofile':
+        profiler = cProfile.Profile()
+        profiler.enable()
+        return profiler
+    if RERUN_PROFILER_CAPTURE == 'pyinstrument' and _has_pyinstrument:
+        profiler = _PyinstrumentProfiler()
+        profiler.start()
+        return profiler
+    return None
+
+
+def _finish_capture(profiler, record):
+    """Stop the profiler, save its report next to the log and return the path"""
+    capture_dir = os.path.join(os.path.dirname(RERUN_PROFILE_LOG) or '.', 'profiles')
+    os.makedirs(capture_dir, exist_ok=True)
+    stem = os.path.join(capture_dir, f"{int(record['ts'] * 1000)}-{record['page']}")
+
+    if isinstance(profiler, cProfile.Profile):
+        profiler.disable()
+        profiler.dump_stats(f"{stem}.prof")
+
+        # Keep the top functions inline so the log alone is enough to compare
+        stream = io.StringIO()
+        pstats.Stats(profiler, stream=stream).sort_stats('cumulative').print_stats(10)
+        record['top_functions'] = [line.strip() for line in stream.getvalue().splitlines()[-12:] if line.strip()]
+        return f"{stem}.prof"
+
+    profiler.stop()
+    with open(f"{stem}.html", 'w', encoding='utf-8') as f:
+        f.write(profiler.output_html())
+    return f"{stem}.html"
+
+
+def _append(record):
+    """Append one rerun to the log, rotating it to <log>.1 when it gets too big"""
+    with _log_lock:
+        os.makedirs(os.path.dirname(RERUN_PROFILE_LOG) or '.', exist_ok=True)
+        if os.path.exists(RERUN_PROFILE_LOG) and os.path.getsize(RERUN_PROFILE_LOG) > RERUN_PROFILE_LOG_MAX_BYTES:
+            os.replace(RERUN_PROFILE_LOG, f"{RERUN_PROFILE_LOG}.1")
+        with open(RERUN_PROFILE_LOG, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + "\n")
+
+
+# ==================== REPORTING ====================
+
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] if values else 0.0
+
+
+def summarize(path):
+    """{(page, section): {'n', 'p50', 'p95'}} in ms; section 'total' is the whole rerun"""
+    samples = {}
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            record = json.loads(line)
+            samples.setdefault((record['page'], 'total'), []).append(record['total_ms'])
+            for name, elapsed in record['sections'].items():
+                samples.setdefault((record['page'], name), []).append(elapsed)
+
+    return {
+        key: {'n': len(values), 'p50': _percentile(values, 0.5), 'p95': _percentile(values, 0.95)}
+        for key, values in samples.items()
+    }
+
+
+def print_report(path, baseline_path=None):
+    """Print per page/section percentiles, with the change against a baseline log"""
+    current = summarize(path)
+    baseline = summarize(baseline_path) if baseline_path else {}
+
+    print(f"{'page':<16}{'section':<12}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'Δp50':>10}")
+    for (page, name), stats in sorted(current.items()):
+        delta = ''
+        if (page, name) in baseline:
+            delta = f"{stats['p50'] - baseline[(page, name)]['p50']:+.1f}"
+        print(f"{page:<16}{name:<12}{stats['n']:>6}{stats['p50']:>10.1f}{stats['p95']:>10.1f}{delta:>10}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    print_report(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None)
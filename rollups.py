@@ -0,0 +1,217 @@
+"""
+Rollup Tables Module
+Precomputed attendance aggregates (day x department x status counts and
+per-employee-month summaries), maintained incrementally as check-ins arrive
+so the dashboard and payroll never have to rescan raw Attendance rows
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+
+import pandas as pd
+
+from config import get_settings
+from shift_rules import CHECKED_IN_STATUSES, get_rules
+
+# fcntl is POSIX only; elsewhere only threads of one process are serialized
+try:
+    import fcntl
+
+    _has_fcntl = True
+except ImportError:
+    _has_fcntl = False
+
+# Bumped when the layout of the rollups changes; a cache file of another format is rebuilt
+ROLLUP_FORMAT = 2
+
+_lock = threading.Lock()
+_rollups = None
+_rollups_path = None  # Cache file _rollups was loaded from
+_rollups_mtime = None  # Its modification time then (None: no file)
+
+
+def _empty_rollups():
+    return {
+        'format': ROLLUP_FORMAT,
+        # Number of Attendance sheet rows already folded in
+        'watermark': 0,
+        # ShiftRules.identity the rows were classified under (rebuilt when it changes)
+        'rules': get_rules().identity,
+        # Distinct employees per (Date, Department, Status)
+        'daily': pd.Series(dtype='int64', index=pd.MultiIndex.from_tuples(
+            [], names=['Date', 'Department', 'Status'])),
+        # Days present / late per (Employee ID, Month)
+        'employee_month': pd.DataFrame(
+            columns=['Days Present', 'Days Late'], dtype='int64',
+            index=pd.MultiIndex.from_tuples([], names=['Employee ID', 'Month'])),
+        # Latest Employee Name seen per Employee ID
+        'names': pd.Series(dtype='object'),
+        # "Employee ID|shift date" keys already counted (a second check-in that day is ignored)
+        'seen': set(),
+    }
+
+
+def _stale(rollups):
+    """True when the rollups were built in another format or under other shift rules"""
+    return rollups.get('format') != ROLLUP_FORMAT or rollups.get('rules') != get_rules().identity
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def _current(path):
+    """The rollups in the cache file, read again only when another process (or a path change) replaced it"""
+    global _rollups, _rollups_path, _rollups_mtime
+    mtime = _mtime(path)
+    if _rollups is None or _rollups_path != path or _rollups_mtime != mtime:
+        _rollups = pd.read_pickle(path) if mtime is not None else _empty_rollups()
+        _rollups_path, _rollups_mtime = path, mtime
+    return _rollups
+
+
+@contextmanager
+def _locked(path):
+    """Hold the rollups of this process and, across processes, an flock on path.lock"""
+    with _lock:
+        if not _has_fcntl:
+            yield
+            return
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(f"{path}.lock", 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def load_rollups():
+    """Return the process-wide rollups, reloading them from disk whenever the cache file has changed"""
+    with _lock:
+        return _current(get_settings().rollup_cache_path)
+
+
+def _save(rollups, path):
+    global _rollups, _rollups_mtime
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp"  # Only written under the file lock
+    pd.to_pickle(rollups, tmp_path)
+    os.replace(tmp_path, path)
+    _rollups, _rollups_mtime = rollups, _mtime(path)
+
+
+def _fold(rollups, rows):
+    """Fold a batch of raw attendance rows into the rollups (vectorized)"""
+    if rows.empty or not {'Employee ID', 'Date', 'Status'} <= set(rows.columns):
+        return
+
+    rules = get_rules()
+    batch = pd.DataFrame({
+        # The day of the shift, so a night shift's check-in after midnight counts for the day it started
+        'Date': (rules.shift_dates(rows) if 'Time' in rows.columns
+                 else pd.to_datetime(rows['Date'], errors='coerce').dt.strftime('%Y-%m-%d')),
+        'Employee ID': rows['Employee ID'].astype(str),
+        'Employee Name': rows['Employee Name'].astype(str) if 'Employee Name' in rows.columns else '',
+        'Department': rows['Department'].astype(str) if 'Department' in rows.columns else 'N/A',
+        # Present / Late as the shift rules see it, not as each writer decided
+        'Status': rules.statuses(rows),
+    }).dropna(subset=['Date']).drop_duplicates(['Date', 'Employee ID'])
+
+    # An employee-day counts once, whichever of its rows (or a single check-in
+    # recorded before the sheet was folded) comes first
+    seen = rollups['seen']
+    keys = (batch['Employee ID'] + '|' + batch['Date']).tolist()
+    new = [key not in seen for key in keys]  # Set lookups: O(batch), not O(rows counted so far)
+    batch = batch[new]
+    if batch.empty:
+        return
+    seen.update(key for key, is_new in zip(keys, new) if is_new)
+
+    daily = batch.groupby(['Date', 'Department', 'Status']).size()
+    rollups['daily'] = rollups['daily'].add(daily, fill_value=0).astype('int64')
+
+    monthly = batch.assign(
+        Month=batch['Date'].str[:7],
+        **{'Days Present': batch['Status'].isin(CHECKED_IN_STATUSES).astype('int64'),
+           'Days Late': (batch['Status'] == 'Late').astype('int64')}
+    ).groupby(['Employee ID', 'Month'])[['Days Present', 'Days Late']].sum()
+    rollups['employee_month'] = rollups['employee_month'].add(monthly, fill_value=0).astype('int64')
+
+    latest = batch.groupby('Employee ID')['Employee Name'].last()
+    rollups['names'] = latest.combine_first(rollups['names'])
+
+
+def refresh_rollups(df_attendance):
+    """Fold Attendance rows appended since the last refresh (in any process) into the rollups"""
+    path = get_settings().rollup_cache_path
+    with _locked(path):
+        rollups = _current(path)
+        # Sheet shrank (rows deleted upstream), or the format or shift rules changed: rebuild from scratch
+        changed = _stale(rollups) or len(df_attendance) < rollups['watermark']
+        if changed:
+            rollups = _empty_rollups()
+        if len(df_attendance) > rollups['watermark']:
+            _fold(rollups, df_attendance.iloc[rollups['watermark']:])
+            rollups['watermark'] = len(df_attendance)
+            changed = True
+        if changed:
+            _save(rollups, path)
+        return rollups
+
+
+def reset_rollups():
+    """Drop all rollups (in memory and on disk); the next refresh rebuilds them"""
+    global _rollups, _rollups_path, _rollups_mtime
+    path = get_settings().rollup_cache_path
+    with _locked(path):
+        if os.path.exists(path):
+            os.remove(path)
+        _rollups, _rollups_path, _rollups_mtime = _empty_rollups(), path, None
+
+
+def record_checkin(attendance_data):
+    """Apply a single check-in as soon as it has been recorded"""
+    path = get_settings().rollup_cache_path
+    with _locked(path):
+        rollups = _current(path)
+        if _stale(rollups):
+            return  # Rebuilt by the next refresh, this row included
+        _fold(rollups, pd.DataFrame([attendance_data]))
+        _save(rollups, path)
+
+
+# ==================== QUERIES ====================
+
+def day_counts(date):
+    """Department x Status counts for one date ('YYYY-MM-DD')"""
+    daily = load_rollups()['daily']
+    if date not in daily.index.get_level_values('Date'):
+        return pd.DataFrame()
+    return daily.xs(date, level='Date').unstack('Status', fill_value=0)
+
+
+def present_and_late(date):
+    """(employees checked in, employees late) on one date"""
+    counts = day_counts(date)
+    if counts.empty:
+        return 0, 0
+    present = counts.reindex(columns=CHECKED_IN_STATUSES, fill_value=0)
+    return int(present.values.sum()), int(present['Late'].sum())
+
+
+def employee_month_summary(month):
+    """Days present / late per employee for one month ('YYYY-MM')"""
+    rollups = load_rollups()
+    summary = rollups['employee_month']
+    if month not in summary.index.get_level_values('Month'):
+        return pd.DataFrame(columns=['Employee ID', 'Employee Name', 'Days Present', 'Days Late'])
+
+    summary = summary.xs(month, level='Month').reset_index()
+    summary.insert(1, 'Employee Name', summary['Employee ID'].map(rollups['names']).fillna(''))
+    return summary
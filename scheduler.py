@@ -0,0 +1,262 @@
+"""
+Scheduler Module
+In-process cron scheduler for the payroll and daily late/absent checks, with
+catch-up of runs missed while the app was down, a per-schedule watermark and
+a lock file so only one app process runs schedules at a time
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+from config import (
+    ENABLE_SCHEDULER,
+    get_settings
+)
+from jobs import ACTIVE_STATUSES, get_job, submit_job
+
+# fcntl is POSIX only; elsewhere every process runs the schedules
+try:
+    import fcntl
+
+    _has_fcntl = True
+except ImportError:
+    _has_fcntl = False
+
+logger = logging.getLogger(__name__)
+
+_start_lock = threading.Lock()
+_thread = None
+_lock_file = None
+
+
+# ==================== CRON EXPRESSIONS ====================
+
+def _parse_field(field, low, high):
+    """Values matched by one cron field: *, 5, 1-5, */15, 1-31/2, lists of these"""
+    values = set()
+    for part in field.split(','):
+        part, _, step = part.partition('/')
+        step = int(step) if step else 1
+        if part == '*':
+            start, end = low, high
+        elif '-' in part:
+            start, end = (int(value) for value in part.split('-'))
+        else:
+            start = int(part)
+            end = high if step > 1 else start
+        values.update(range(start, end + 1, step))
+    return sorted(value for value in values if low <= value <= high)
+
+
+def parse_cron(expression):
+    """Parse 'minute hour day-of-month month day-of-week'"""
+    minute, hour, day, month, weekday = expression.split()
+    return {
+        'minutes': _parse_field(minute, 0, 59),
+        'hours': _parse_field(hour, 0, 23),
+        'days': set(_parse_field(day, 1, 31)),
+        'months': set(_parse_field(month, 1, 12)),
+        # Cron counts weekdays from Sunday = 0 (7 is Sunday too)
+        'weekdays': {value % 7 for value in _parse_field(weekday, 0, 7)},
+        'any_day': day == '*',
+        'any_weekday': weekday == '*',
+    }
+
+
+def _day_matches(cron, date):
+    if date.month not in cron['months']:
+        return False
+    day_ok = date.day in cron['days']
+    weekday_ok = (date.weekday() + 1) % 7 in cron['weekdays']
+    # Like cron: when both day fields are restricted, either one may match
+    if cron['any_day'] or cron['any_weekday']:
+        return day_ok and weekday_ok
+    return day_ok or weekday_ok
+
+
+def fire_times(expression, after, until):
+    """Times in (after, until] at which the cron expression fires, in order"""
+    cron = parse_cron(expression)
+    fires = []
+    date = after.date()
+    while date <= until.date():
+        if _day_matches(cron, date):
+            for hour in cron['hours']:
+                for minute in cron['minutes']:
+                    fire = datetime(date.year, date.month, date.day, hour, minute)
+                    if after < fire <= until:
+                        fires.append(fire)
+        date += timedelta(days=1)
+    return fires
+
+
+# ==================== STATE AND LOCK ====================
+
+def load_state():
+    """{schedule name: {'last_fire', 'watermark', 'checked_as_of', 'last_error', 'retry_after'}}"""
+    try:
+        with open(get_settings().scheduler_state_path, encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _save_state(state):
+    path = get_settings().scheduler_state_path
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _acquire_lock():
+    """Take the single-instance lock (non-blocking); True if this process holds it"""
+    global _lock_file
+    if _lock_file is not None or not _has_fcntl:
+        return True
+
+    lock_path = get_settings().scheduler_lock_path
+    os.makedirs(os.path.dirname(lock_path) or '.', exist_ok=True)
+    lock_file = open(lock_path, 'a+')
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return False
+
+    lock_file.seek(0)
+    lock_file.truncate()
+    lock_file.write(str(os.getpid()))
+    lock_file.flush()
+    _lock_file = lock_file  # Held (and locked) for the life of the process
+    return True
+
+
+# ==================== RUNNING SCHEDULES ====================
+
+def _wait_for(job_id):
+    """Block the scheduler thread until a job finishes; return the job"""
+    while True:
+        job = get_job(job_id)
+        if job is None or job['status'] not in ACTIVE_STATUSES:
+            return job
+        time.sleep(1)
+
+
+def _run_job(kind, func, *args, key):
+    job_id, _ = submit_job(kind, func, *args, key=key)
+    job = _wait_for(job_id)
+    if job is None or job['status'] != 'done':
+        raise RuntimeError(job['error'] if job else f"job {job_id} disappeared")
+    return job
+
+
+def _run_payroll(fires, schedule_state):
+    """One payroll per missed month, oldest first; each is recorded as soon as it is saved"""
+    # Imported on first use so starting the scheduler does not load pandas
+    from data_service import run_payroll_job
+    from payroll import previous_month
+
+    for fire in fires:
+        month = previous_month(fire)
+        if schedule_state.get('watermark', '') >= month:
+            continue
+        # Same key as the dashboard button, so a manual run in progress is joined
+        _run_job('payroll', run_payroll_job, month, key=f"payroll-{month}")
+        schedule_state['watermark'] = month
+        schedule_state['last_fire'] = fire.isoformat()
+
+
+def _run_daily_check(fires, schedule_state):
+    """
+    Check every missed day after the watermark in a single job touching only
+    those days, plus the previous check's shifts that were not late yet then
+    """
+    from data_service import run_daily_check_job
+
+    watermark = schedule_state.get('watermark', '')
+    days = sorted({fire.strftime('%Y-%m-%d') for fire in fires if fire.strftime('%Y-%m-%d') > watermark})
+    if days:
+        checked = schedule_state.get('checked_as_of')
+        deferred_since = datetime.fromisoformat(checked) if checked else None
+        _run_job('alert_check', run_daily_check_job, days, fires[-1], deferred_since,
+                 key=f"daily-check-{days[-1]}")
+        schedule_state['watermark'] = days[-1]
+        schedule_state['checked_as_of'] = fires[-1].isoformat()
+    schedule_state['last_fire'] = fires[-1].isoformat()
+
+
+RUNNERS = {
+    'payroll': _run_payroll,
+    'daily_check': _run_daily_check,
+}
+
+
+def run_pending(now=None):
+    """Run every schedule that fired since its last run (catching up missed runs)"""
+    now = now or datetime.now()
+    settings = get_settings()
+    state = load_state()
+
+    for name, expression in settings.schedules.items():
+        schedule_state = state.setdefault(name, {})
+        if 'last_fire' not in schedule_state:
+            # First start: begin from now rather than replaying history
+            schedule_state['last_fire'] = now.isoformat()
+            continue
+        if schedule_state.get('retry_after', 0) > time.time():
+            continue
+
+        fires = fire_times(expression, datetime.fromisoformat(schedule_state['last_fire']), now)
+        if not fires:
+            continue
+
+        try:
+            RUNNERS[name](fires[-settings.scheduler_catchup_limit:], schedule_state)
+            schedule_state.pop('last_error', None)
+            schedule_state.pop('retry_after', None)
+        except Exception as e:
+            schedule_state['last_error'] = str(e) or type(e).__name__
+            schedule_state['retry_after'] = time.time() + settings.scheduler_retry_delay
+        finally:
+            _save_state(state)
+
+    _save_state(state)
+    return state
+
+
+def _loop():
+    while True:
+        # A standby process keeps trying so it takes over if the holder exits
+        if _acquire_lock():
+            try:
+                run_pending()
+            except Exception:
+                logger.exception("Scheduler error")
+        time.sleep(get_settings().scheduler_tick)
+
+
+def start_scheduler():
+    """Start the scheduler thread once per process (no-op unless ENABLE_SCHEDULER)"""
+    global _thread
+    if not ENABLE_SCHEDULER:
+        return
+    with _start_lock:
+        if _thread is None:
+            _thread = threading.Thread(target=_loop, name='scheduler', daemon=True)
+            _thread.start()
+
+
+def main():
+    """Run the schedules in the foreground from process start: python -m scheduler"""
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    _loop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Search Index Module
+In-memory index over the Employee ID / Employee Name columns of a sheet for
+the dashboard search boxes, built once per dataset version: every distinct
+(lower-cased) ID and name maps to its row positions, an n-gram index over
+those values answers substring (and so prefix) queries, and close spellings
+of IDs and name words are offered when nothing contains the term. Lookups
+cost time in the number of distinct values and matching rows, not in the
+number of rows.
+"""
+
+import difflib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+NGRAM = 3  # Longest n-gram indexed; longer terms intersect their n-grams
+FUZZY_CUTOFF = 0.75  # difflib similarity a close spelling needs
+FUZZY_LIMIT = 10  # Close spellings used at most
+INDEX_CACHE_SIZE = 4  # Dataset versions kept indexed
+
+_lock = threading.Lock()
+_indexes = OrderedDict()  # dataset version -> SearchIndex
+
+
+class SearchIndex:
+    """Row positions of a DataFrame by the values of its ID / name columns"""
+
+    def __init__(self, df, columns=('Employee ID', 'Employee Name')):
+        self.rows = {}  # value -> sorted row positions
+        for col in columns:
+            if col not in df.columns:
+                continue
+            values = df[col].astype(str).str.lower()
+            for value, positions in values.groupby(values, sort=False).indices.items():
+                if value in self.rows:
+                    positions = np.union1d(self.rows[value], positions)
+                self.rows[value] = positions
+
+        self.grams = {}  # n-gram (1..NGRAM characters) -> values containing it
+        self.words = {}  # whole value or word of it -> values, for close spellings
+        for value in self.rows:
+            for size in range(1, NGRAM + 1):
+                for start in range(len(value) - size + 1):
+                    self.grams.setdefault(value[start:start + size], set()).add(value)
+            for word in {value, *value.split()}:
+                self.words.setdefault(word, set()).add(value)
+
+    def _containing(self, term):
+        if len(term) <= NGRAM:
+            return self.grams.get(term, set())
+        postings = [self.grams.get(term[start:start + NGRAM], set()) for start in range(len(term) - NGRAM + 1)]
+        candidates = min(postings, key=len)
+        return {value for value in candidates if term in value}
+
+    def _close(self, term):
+        matches = difflib.get_close_matches(term, self.words, n=FUZZY_LIMIT, cutoff=FUZZY_CUTOFF)
+        return set().union(*(self.words[word] for word in matches))
+
+    def search(self, term, fuzzy=True):
+        """
+        (sorted row positions, close) of the rows whose ID or name contains
+        term (ignoring case); when none does and fuzzy is set, the rows with
+        a close spelling instead, and close is True
+        """
+        term = term.lower()
+        values, close = self._containing(term), False
+        if not values and fuzzy:
+            values, close = self._close(term), True
+        if not values:
+            return np.empty(0, dtype=np.intp), close
+        return np.unique(np.concatenate([self.rows[value] for value in values])), close
+
+
+def index_for(df):
+    """SearchIndex of a DataFrame, built once per df.attrs['version'] (None when it has no version)"""
+    version = df.attrs.get('version')
+    if version is None:
+        return None
+
+    with _lock:
+        index = _indexes.get(version)
+        if index is not None:
+            _indexes.move_to_end(version)
+            return index
+
+    index = SearchIndex(df)
+    with _lock:
+        _indexes[version] = index
+        while len(_indexes) > INDEX_CACHE_SIZE:
+            _indexes.popitem(last=False)
+    return index
@@ -0,0 +1,218 @@
+"""
+Shared Cache Module
+Cross-process cache tier for decoded n8n datasets: one SQLite file on local
+disk, shared by every session and every worker process on the host, so a
+sheet is fetched and decoded once per deployment (per TTL) instead of once
+per session. Keys are versioned per namespace (dataset): invalidate() bumps
+the version, which makes every older entry unreachable at once, and
+publishes an event that subscribers in all processes receive.
+"""
+
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+from config import APP_VERSION, get_settings
+
+logger = logging.getLogger(__name__)
+
+# Bumped when the layout of cached values changes; part of every key
+CACHE_FORMAT = 1
+
+# Sheets each n8n write webhook changes; a successful call invalidates them
+WRITE_INVALIDATES = {
+    'attendance': ('attendance', 'alerts'),
+    'employee/register': ('employees',),
+    'leave/request': ('leave',),
+    'overtime/log': ('overtime',),
+    'admin/approve-leave': ('leave',),
+    'admin/check-alerts': ('alerts',),
+}
+
+EVENT_RETENTION = 3600  # seconds invalidation events are kept
+EVENT_POLL_INTERVAL = 1  # seconds between checks for other processes' events
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS versions (
+    namespace TEXT PRIMARY KEY,
+    version INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    namespace TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    created_at REAL NOT NULL
+);
+"""
+
+_local = threading.local()  # One connection per thread (and per cache path)
+_lock = threading.Lock()
+_subscribers = {}  # namespace -> [callback(namespace)]
+_last_event_id = None
+_polled_at = 0.0
+_stats = {'hits': 0, 'misses': 0, 'errors': 0}
+
+
+def _connect():
+    path = get_settings().shared_cache_path
+    if getattr(_local, 'path', None) != path:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        conn = sqlite3.connect(path, timeout=5, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')  # Readers never wait for the writer
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.executescript(SCHEMA)
+        _local.conn, _local.path = conn, path
+    return _local.conn
+
+
+def _count(name):
+    with _lock:
+        _stats[name] += 1
+
+
+def _version(conn, namespace):
+    row = conn.execute('SELECT version FROM versions WHERE namespace = ?', (namespace,)).fetchone()
+    return row[0] if row else 0
+
+
+def _key(namespace, version, name):
+    return f"{APP_VERSION}/{CACHE_FORMAT}:{namespace}:v{version}:{name}"
+
+
+# ==================== READ / WRITE ====================
+
+def get_or_fetch(namespace, name, fetch, ttl=None):
+    """
+    Cached value of fetch() under namespace/name, shared across processes
+
+    fetch() runs on a miss; a None result (failed call) is not cached. The
+    entry is written under the namespace version read before fetching, so
+    an invalidation that lands mid-fetch is never hidden by stale data.
+    """
+    settings = get_settings()
+    if not settings.enable_shared_cache:
+        return fetch()
+
+    try:
+        conn = _connect()
+        poll_events(conn)
+        key = _key(namespace, _version(conn, namespace), name)
+        row = conn.execute('SELECT value FROM entries WHERE key = ? AND expires_at > ?', (key, time.time())).fetchone()
+        if row:
+            _count('hits')
+            return pickle.loads(row[0])
+    except (sqlite3.Error, pickle.UnpicklingError, EOFError) as e:
+        _count('errors')
+        logger.warning("Shared cache read failed: %s", e)
+        return fetch()
+
+    _count('misses')
+    value = fetch()
+    if value is not None:
+        try:
+            expires_at = time.time() + (settings.shared_cache_ttl if ttl is None else ttl)
+            conn.execute('INSERT OR REPLACE INTO entries (key, value, expires_at) VALUES (?, ?, ?)',
+                         (key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), expires_at))
+            conn.execute('DELETE FROM entries WHERE expires_at <= ?', (time.time(),))
+        except sqlite3.Error as e:
+            _count('errors')
+            logger.warning("Shared cache write failed: %s", e)
+    return value
+
+
+def invalidate(namespace):
+    """Drop every cached entry of a namespace, in all processes, and notify subscribers"""
+    if not get_settings().enable_shared_cache:
+        _notify([namespace])
+        return
+    try:
+        conn = _connect()
+        poll_events(conn, force=True)  # Baseline first, so this process is notified of its own event
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            version = _version(conn, namespace) + 1
+            conn.execute('INSERT OR REPLACE INTO versions (namespace, version) VALUES (?, ?)', (namespace, version))
+            conn.execute('INSERT INTO events (namespace, version, created_at) VALUES (?, ?, ?)',
+                         (namespace, version, time.time()))
+            conn.execute('DELETE FROM events WHERE created_at < ?', (time.time() - EVENT_RETENTION,))
+        poll_events(conn, force=True)
+    except sqlite3.Error as e:
+        _count('errors')
+        logger.warning("Shared cache invalidation failed: %s", e)
+        _notify([namespace])
+
+
+def invalidate_for_write(endpoint):
+    """Invalidate the sheets an n8n write webhook changes (no-op for other endpoints)"""
+    for namespace in WRITE_INVALIDATES.get(endpoint, ()):
+        invalidate(namespace)
+
+
+def clear_cache():
+    """Remove every entry (versions and events are kept)"""
+    try:
+        _connect().execute('DELETE FROM entries')
+    except sqlite3.Error as e:
+        logger.warning("Shared cache clear failed: %s", e)
+
+
+def cache_stats():
+    """Hits / misses / errors of this process"""
+    with _lock:
+        return dict(_stats)
+
+
+# ==================== PUB/SUB ====================
+
+def subscribe(namespace, callback):
+    """Call callback(namespace) whenever any process invalidates the namespace"""
+    with _lock:
+        _subscribers.setdefault(namespace, []).append(callback)
+
+
+def _notify(namespaces):
+    with _lock:
+        callbacks = [(namespace, callback) for namespace in namespaces
+                     for callback in _subscribers.get(namespace, [])]
+    for namespace, callback in callbacks:
+        callback(namespace)
+
+
+def poll_events(conn=None, force=False):
+    """Deliver invalidations published since the last poll (at most every EVENT_POLL_INTERVAL)"""
+    global _last_event_id, _polled_at
+    if not get_settings().enable_shared_cache:
+        return
+    with _lock:
+        if not force and time.monotonic() - _polled_at < EVENT_POLL_INTERVAL:
+            return
+        _polled_at = time.monotonic()
+        last_event_id = _last_event_id
+
+    try:
+        conn = conn or _connect()
+        if last_event_id is None:
+            # First poll in this process: nothing cached locally yet, start from now
+            rows = []
+            last_event_id = conn.execute('SELECT COALESCE(MAX(id), 0) FROM events').fetchone()[0]
+        else:
+            rows = conn.execute('SELECT id, namespace FROM events WHERE id > ? ORDER BY id',
+                                (last_event_id,)).fetchall()
+    except sqlite3.Error as e:
+        _count('errors')
+        logger.warning("Shared cache event poll failed: %s", e)
+        return
+
+    with _lock:
+        if rows:
+            last_event_id = rows[-1][0]
+        _last_event_id = max(last_event_id, _last_event_id or 0)
+    _notify(sorted({namespace for _, namespace in rows}))
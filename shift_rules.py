@@ -0,0 +1,177 @@
+"""
+Shift Rules Module
+Late / on-time evaluation against shift schedules. The shifts in the
+settings (start, grace period and the clock time their check-ins count
+from, for shifts that cross midnight) are compiled once per settings
+version into minute-of-day thresholds plus employee and department
+lookups. A single check-in is then classified in O(1), and a day's rows
+with the same thresholds as numpy arrays; the check-in page, the daily
+alerts and the rollups behind payroll all use it.
+"""
+
+import threading
+
+from config import get_settings
+
+MINUTES_PER_DAY = 24 * 60
+
+# Statuses that count as a day present (payroll, "Present Today")
+CHECKED_IN_STATUSES = ['Present', 'Late']
+
+# Formats the Time column is written in (check-in page, n8n nodes)
+TIME_FORMATS = ('%I:%M %p', '%I:%M:%S %p', '%H:%M', '%H:%M:%S')
+
+_lock = threading.Lock()
+_compiled = (None, None)  # (settings compiled from, ShiftRules)
+
+
+def _minute(text):
+    """'HH:MM' -> minute of the day"""
+    hours, minutes = str(text).split(':')[:2]
+    return int(hours) * 60 + int(minutes)
+
+
+def parse_minutes(times):
+    """Minute of the day of each Time value (NaN where it cannot be read)"""
+    # Imported here (as in the other vectorized paths): the kiosk classifies single check-ins without pandas
+    import pandas as pd
+
+    times = times.astype(str).str.strip()
+    parsed = pd.Series(pd.NaT, index=times.index, dtype='datetime64[ns]')
+    for fmt in TIME_FORMATS:
+        missing = parsed.isna()
+        if not missing.any():
+            break
+        parsed[missing] = pd.to_datetime(times[missing], format=fmt, errors='coerce')
+    return (parsed.dt.hour * 60 + parsed.dt.minute).to_numpy(dtype=float)
+
+
+class ShiftRules:
+    """
+    Compiled shift schedules
+
+    Shift 0 is the default (late after late_cutoff_time, counted from
+    midnight). Clock times are stored as minutes after the shift's
+    check-in window opens, so night shifts need no special casing.
+    """
+
+    def __init__(self, settings):
+        names = ['default', *settings.shifts]
+        self.index = {name: position for position, name in enumerate(names)}
+        self.checkin_from = []  # Minute of the day the shift's check-ins count from
+        self.start = []  # Shift start, minutes into the check-in window
+        self.late_after = []  # Start plus grace, minutes into the check-in window
+
+        for name in names:
+            if name == 'default':
+                start, grace, checkin_from = _minute(settings.late_cutoff_time), 0, 0
+            else:
+                shift = settings.shifts[name]
+                start = _minute(shift['start'])
+                grace = int(shift.get('grace_minutes', 0))
+                checkin_from = _minute(shift.get('checkin_from', '00:00'))
+            self.checkin_from.append(checkin_from)
+            self.start.append((start - checkin_from) % MINUTES_PER_DAY)
+            self.late_after.append(self.start[-1] + grace)
+
+        self.by_employee = {str(key).strip().upper(): self.index[name]
+                            for key, name in settings.employee_shifts.items()}
+        self.by_department = {key: self.index[name] for key, name in settings.department_shifts.items()}
+        # Equal for settings that classify every check-in the same way (stored with the rollups)
+        self.identity = (tuple(self.checkin_from), tuple(self.start), tuple(self.late_after),
+                         tuple(sorted(self.by_employee.items())), tuple(sorted(self.by_department.items())))
+
+    def shift_of(self, employee_id, department=None):
+        """Index of an employee's shift: their own, else their department's, else the default"""
+        shift = self.by_employee.get(str(employee_id).strip().upper())
+        return shift if shift is not None else self.by_department.get(department, 0)
+
+    def classify(self, employee_id, department, minute):
+        """('Present' | 'Late', minutes late) of one check-in at a minute of the day"""
+        shift = self.shift_of(employee_id, department)
+        position = (minute - self.checkin_from[shift]) % MINUTES_PER_DAY
+        if position > self.late_after[shift]:
+            return 'Late', position - self.start[shift]
+        return 'Present', 0
+
+    def _shifts(self, df):
+        import numpy as np
+        import pandas as pd
+
+        shift = pd.Series(np.nan, index=df.index)
+        if self.by_employee:
+            shift = df['Employee ID'].astype(str).str.strip().str.upper().map(self.by_employee)
+        if self.by_department and 'Department' in df.columns:
+            shift = shift.fillna(df['Department'].map(self.by_department))
+        return shift.fillna(0).to_numpy(dtype=np.intp)
+
+    def classify_frame(self, df):
+        """
+        'Late' and 'Minutes Late' for a frame of check-ins ('Employee ID',
+        'Time', optionally 'Department'), vectorized; rows whose Time cannot
+        be read are not late and have NaN minutes
+        """
+        import numpy as np
+        import pandas as pd
+
+        minutes = parse_minutes(df['Time'])
+        shift = self._shifts(df)
+        position = (minutes - np.asarray(self.checkin_from)[shift]) % MINUTES_PER_DAY
+        late = position > np.asarray(self.late_after)[shift]
+        minutes_late = np.where(late, position - np.asarray(self.start)[shift], 0.0)
+        minutes_late[np.isnan(minutes)] = np.nan
+        return pd.DataFrame({'Late': late, 'Minutes Late': minutes_late}, index=df.index)
+
+    def statuses(self, df):
+        """The Status column with Present / Late re-evaluated under the rules (other statuses kept)"""
+        import numpy as np
+
+        status = df['Status'].astype(str)
+        if 'Time' not in df.columns or df.empty:
+            return status
+        result = self.classify_frame(df)
+        evaluated = status.isin(CHECKED_IN_STATUSES) & result['Minutes Late'].notna()
+        return status.where(~evaluated, np.where(result['Late'], 'Late', 'Present'))
+
+    def shift_dates(self, df):
+        """
+        Day ('YYYY-MM-DD') whose shift each check-in belongs to: the calendar
+        date, or the day before for check-ins before the shift's window opens
+        (after midnight on a night shift)
+        """
+        import numpy as np
+        import pandas as pd
+
+        dates = pd.to_datetime(df['Date'], errors='coerce')
+        minutes = parse_minutes(df['Time'])
+        before_window = minutes < np.asarray(self.checkin_from)[self._shifts(df)]
+        dates = dates - pd.to_timedelta(before_window.astype(int), unit='D')
+        return dates.dt.strftime('%Y-%m-%d')
+
+    def late_deadlines(self, df, day):
+        """
+        When each row's shift on day ('YYYY-MM-DD') turns late: the shift's
+        start plus grace, on the next calendar day for a shift whose window
+        wraps past midnight
+        """
+        import numpy as np
+        import pandas as pd
+
+        shift = self._shifts(df)
+        minutes = np.asarray(self.checkin_from)[shift] + np.asarray(self.late_after)[shift]
+        return pd.Series(pd.Timestamp(day) + pd.to_timedelta(minutes, unit='min'), index=df.index)
+
+
+def get_rules():
+    """ShiftRules for the current settings (compiled again only after a settings change)"""
+    global _compiled
+    settings = get_settings()
+    with _lock:
+        if _compiled[0] is not settings:
+            _compiled = (settings, ShiftRules(settings))
+        return _compiled[1]
+
+
+def checkin_status(employee_id, department, when):
+    """('Present' | 'Late', minutes late) of a check-in at datetime `when`"""
+    return get_rules().classify(employee_id, department, when.hour * 60 + when.minute)
@@ -0,0 +1,158 @@
+"""
+Snapshot Cache Module
+Freezes closed months of append-only sheets (Attendance, Overtime) into
+partitioned Parquet files so only the open month has to be fetched live
+"""
+
+import os
+import tempfile
+from datetime import datetime
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from config import get_settings
+
+# Hive-style partition key: <dataset>/month=YYYY-MM/part-0.parquet
+PARTITION_KEY = 'month'
+
+
+def current_month():
+    """Return the open (current) month as 'YYYY-MM'"""
+    return datetime.now().strftime('%Y-%m')
+
+
+def month_start(month):
+    """Return the first day of a 'YYYY-MM' month as 'YYYY-MM-01'"""
+    return f"{month}-01"
+
+
+def next_month(month):
+    """Return the month after a 'YYYY-MM' month"""
+    year, mon = (int(part) for part in month.split('-'))
+    if mon == 12:
+        return f"{year + 1}-01"
+    return f"{year}-{mon + 1:02d}"
+
+
+def _dataset_dir(dataset):
+    return os.path.join(get_settings().snapshot_cache_dir, dataset)
+
+
+def _partition_path(dataset, month):
+    return os.path.join(_dataset_dir(dataset), f"{PARTITION_KEY}={month}", "part-0.parquet")
+
+
+def frozen_months(dataset):
+    """List the months already frozen for a dataset, oldest first"""
+    path = _dataset_dir(dataset)
+    if not os.path.isdir(path):
+        return []
+
+    prefix = f"{PARTITION_KEY}="
+    months = [
+        name[len(prefix):] for name in os.listdir(path)
+        if name.startswith(prefix) and os.path.exists(os.path.join(path, name, "part-0.parquet"))
+    ]
+    return sorted(months)
+
+
+def live_since(dataset):
+    """
+    First day that still has to be fetched live for a dataset,
+    or None if nothing is frozen yet (a full fetch is needed to bootstrap)
+    """
+    months = frozen_months(dataset)
+    if not months:
+        return None
+    return month_start(next_month(months[-1]))
+
+
+def month_column(df, date_column='Date'):
+    """Return a 'YYYY-MM' series for each row ('' where the date does not parse)"""
+    dates = pd.to_datetime(df[date_column], errors='coerce')
+    return dates.dt.strftime('%Y-%m').fillna('')
+
+
+def freeze_closed_months(dataset, df, date_column='Date'):
+    """
+    Write every closed month in df that is not frozen yet to its own Parquet
+    partition and return only the rows that must stay live (open month and
+    rows whose date could not be parsed)
+    """
+    if df.empty or date_column not in df.columns:
+        return df
+
+    months = month_column(df, date_column)
+    open_month = current_month()
+    already_frozen = set(frozen_months(dataset))
+
+    closed_mask = (months != '') & (months < open_month)
+    for month, rows in df[closed_mask].groupby(months[closed_mask]):
+        if month in already_frozen:
+            continue
+        _write_partition(dataset, month, rows)
+
+    return df[~closed_mask].reset_index(drop=True)
+
+
+def _write_partition(dataset, month, df):
+    """Atomically write one month partition (all columns stored as strings, missing values as nulls)"""
+    path = _partition_path(dataset, month)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    # The 'string' dtype keeps NaN / None as nulls instead of the text 'nan' / 'None';
+    # without the pandas metadata they read back as the default str dtype (NaN)
+    table = pa.Table.from_pandas(df.astype('string'), preserve_index=False).replace_schema_metadata()
+    # A name of its own per writer; the dot prefix hides it from dataset reads until it is renamed
+    fd, tmp_path = tempfile.mkstemp(prefix='.part-0.', suffix='.tmp', dir=os.path.dirname(path))
+    os.close(fd)
+    try:
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def read_snapshots(dataset, columns=None, start_month=None, end_month=None, filters=None):
+    """
+    Read frozen months back as a DataFrame
+
+    columns:     project only these columns (None reads all)
+    start_month: 'YYYY-MM' lower bound, inclusive (partition pruning)
+    end_month:   'YYYY-MM' upper bound, inclusive (partition pruning)
+    filters:     extra pyarrow predicates, e.g. [('Department', '=', 'IT')]
+    """
+    if not frozen_months(dataset):
+        return pd.DataFrame(columns=columns or [])
+
+    predicates = list(filters or [])
+    if start_month:
+        predicates.append((PARTITION_KEY, '>=', start_month))
+    if end_month:
+        predicates.append((PARTITION_KEY, '<=', end_month))
+
+    table = pq.read_table(
+        _dataset_dir(dataset),
+        columns=columns,
+        filters=predicates or None,
+        partitioning='hive',
+        memory_map=True
+    )
+
+    if PARTITION_KEY in table.column_names and (columns is None or PARTITION_KEY not in columns):
+        table = table.drop([PARTITION_KEY])
+
+    return table.to_pandas()
+
+
+def clear_snapshots(dataset, month=None):
+    """Drop one frozen month (or the whole dataset) so it is rebuilt on next fetch"""
+    months = [month] if month else frozen_months(dataset)
+    for frozen in months:
+        path = _partition_path(dataset, frozen)
+        if os.path.exists(path):
+            os.remove(path)
+            os.rmdir(os.path.dirname(path))
@@ -3,6 +3,10 @@ Custom Styling Module for Enterprise Attendance System
 Contains all CSS styles, colors, and theme configurations
 """
 
+import json
+import re
+from functools import lru_cache
+
 import streamlit as st
 
 # Color Palette
@@ -22,10 +26,10 @@ COLORS = {
 }
 
 
-def apply_custom_styles():
-    """Apply custom CSS styles to the Streamlit app"""
-    st.markdown(f"""
-    <style>
+@lru_cache(maxsize=1)
+def build_stylesheet():
+    """The app's whole stylesheet (every page's rules), minified once per process"""
+    css = f"""
         /* Global Styles */
         .main {{
             background-color: {COLORS['light_bg']};
@@ -315,6 +319,32 @@ def apply_custom_styles():
             transform: translateX(5px);
         }}
 
+        /* Check-in Camera */
+        .camera-compact {{
+            max-width: 400px;
+            margin: 0 auto;
+        }}
+
+        .camera-compact img {{
+            max-width: 100%;
+            border-radius: 10px;
+        }}
+
+        .stCameraInput {{
+            max-width: 400px !important;
+            margin: 0 auto;
+        }}
+
+        .stCameraInput > label {{
+            max-width: 400px !important;
+        }}
+
+        .stCameraInput video {{
+            max-width: 400px !important;
+            max-height: 300px !important;
+            border-radius: 10px;
+        }}
+
         /* Success Animation */
         .success-animation {{
             text-align: center;
@@ -380,8 +410,35 @@ def apply_custom_styles():
                 font-size: 32px;
             }}
         }}
-    </style>
-    """, unsafe_allow_html=True)
+    """
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{};,>])\s*', r'\1', css)
+    # Only after a colon: a space before one is a descendant combinator (a :hover)
+    return re.sub(r':\s+', ':', css).replace(';}', '}').strip()
+
+
+def apply_custom_styles():
+    """
+    Apply custom CSS styles to the Streamlit app, once per session
+
+    Streamlit drops elements a rerun does not send again, so the sheet is not
+    sent as an element: the first run of a session mounts it into the page's
+    <head>, where it stays for every later rerun.
+    """
+    if st.session_state.get('_styles_mounted'):
+        return
+
+    css = json.dumps(build_stylesheet()).replace('</', '<\\/')
+    st.html(f"""<script>
+        if (!document.getElementById('app-styles')) {{
+            const style = document.createElement('style');
+            style.id = 'app-styles';
+            style.textContent = {css};
+            document.head.appendChild(style);
+        }}
+    </script>""", unsafe_allow_javascript=True)
+    st.session_state['_styles_mounted'] = True
 
 
 def create_colored_metric(label, value, icon="", color="primary"):
@@ -0,0 +1,201 @@
+"""
+Webhook Metrics Module
+Per-endpoint latency histograms, payload sizes, retries and errors for every
+n8n webhook call, with Prometheus text and JSON lines exports
+"""
+
+import json
+import threading
+import time
+from collections import deque
+
+# Latency histogram bucket upper bounds (seconds); +Inf is implicit
+LATENCY_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+
+# Number of individual calls kept for the JSON lines export
+RECENT_CALLS = 1000
+
+_lock = threading.Lock()
+_endpoints = {}
+_recent = deque(maxlen=RECENT_CALLS)
+
+
+def _new_endpoint_stats():
+    return {
+        'calls': 0,
+        'errors': {},  # error kind -> count
+        'retries': 0,
+        'short_circuited': 0,  # Calls refused at once while the circuit was open
+        'coalesced': 0,  # GETs that shared another session's in-flight call
+        'latency_buckets': [0] * (len(LATENCY_BUCKETS) + 1),
+        'latency_sum': 0.0,
+        'request_bytes': 0,
+        'response_bytes': 0,
+    }
+
+
+def record_call(endpoint, method, latency, status=None, request_bytes=0, response_bytes=0, error=None):
+    """Record one completed (or failed) webhook call"""
+    bucket = next((i for i, bound in enumerate(LATENCY_BUCKETS) if latency <= bound), len(LATENCY_BUCKETS))
+
+    with _lock:
+        stats = _endpoints.setdefault(endpoint, _new_endpoint_stats())
+        stats['calls'] += 1
+        stats['latency_buckets'][bucket] += 1
+        stats['latency_sum'] += latency
+        stats['request_bytes'] += request_bytes
+        stats['response_bytes'] += response_bytes
+        if error:
+            stats['errors'][error] = stats['errors'].get(error, 0) + 1
+
+        _recent.append({
+            'ts': round(time.time(), 3),
+            'endpoint': endpoint,
+            'method': method,
+            'status': status,
+            'latency_ms': round(latency * 1000, 1),
+            'request_bytes': request_bytes,
+            'response_bytes': response_bytes,
+            'error': error,
+        })
+
+
+def record_retry(endpoint):
+    """Record that a call to endpoint is being retried"""
+    with _lock:
+        _endpoints.setdefault(endpoint, _new_endpoint_stats())['retries'] += 1
+
+
+def record_short_circuit(endpoint):
+    """Record a call refused without being sent because the endpoint's circuit is open"""
+    with _lock:
+        _endpoints.setdefault(endpoint, _new_endpoint_stats())['short_circuited'] += 1
+
+
+def record_coalesced(endpoint):
+    """Record a GET answered by an identical call already in flight"""
+    with _lock:
+        _endpoints.setdefault(endpoint, _new_endpoint_stats())['coalesced'] += 1
+
+
+def reset_metrics():
+    """Clear all recorded metrics"""
+    with _lock:
+        _endpoints.clear()
+        _recent.clear()
+
+
+def _quantile(stats, q):
+    """Approximate latency quantile (seconds) from the histogram buckets"""
+    target = q * stats['calls']
+    seen = 0
+    for bound, count in zip(LATENCY_BUCKETS + [float('inf')], stats['latency_buckets']):
+        seen += count
+        if seen >= target and count:
+            return bound
+    return 0.0
+
+
+def metrics_summary():
+    """One row per endpoint, for the debug panel"""
+    with _lock:
+        rows = []
+        for endpoint, stats in sorted(_endpoints.items()):
+            calls = stats['calls']
+            rows.append({
+                'Endpoint': endpoint,
+                'Calls': calls,
+                'Errors': sum(stats['errors'].values()),
+                'Retries': stats['retries'],
+                'Fast-failed': stats['short_circuited'],
+                'Coalesced': stats['coalesced'],
+                'Avg (ms)': round(stats['latency_sum'] / calls * 1000, 1) if calls else 0.0,
+                'p50 ≤ (s)': _quantile(stats, 0.5),
+                'p95 ≤ (s)': _quantile(stats, 0.95),
+                'Sent (KB)': round(stats['request_bytes'] / 1024, 1),
+                'Received (KB)': round(stats['response_bytes'] / 1024, 1),
+            })
+        return rows
+
+
+# ==================== EXPORTS ====================
+
+def _label(value):
+    """A Prometheus label value with backslashes, double quotes and newlines escaped"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def to_prometheus():
+    """Render all metrics in the Prometheus text exposition format"""
+    lines = [
+        "# HELP n8n_webhook_latency_seconds Webhook call latency",
+        "# TYPE n8n_webhook_latency_seconds histogram",
+    ]
+    with _lock:
+        endpoints = [(_label(endpoint), stats) for endpoint, stats in sorted(_endpoints.items())]
+
+        for endpoint, stats in endpoints:
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS + ['+Inf'], stats['latency_buckets']):
+                cumulative += count
+                lines.append(f'n8n_webhook_latency_seconds_bucket{{endpoint="{endpoint}",le="{bound}"}} {cumulative}')
+            lines.append(f'n8n_webhook_latency_seconds_sum{{endpoint="{endpoint}"}} {stats["latency_sum"]:.6f}')
+            lines.append(f'n8n_webhook_latency_seconds_count{{endpoint="{endpoint}"}} {stats["calls"]}')
+
+        for name, key, help_text in [
+            ('n8n_webhook_request_bytes_total', 'request_bytes', 'Bytes sent to the webhook'),
+            ('n8n_webhook_response_bytes_total', 'response_bytes', 'Bytes received from the webhook'),
+            ('n8n_webhook_retries_total', 'retries', 'Retried webhook calls'),
+            ('n8n_webhook_short_circuited_total', 'short_circuited', 'Calls refused while the circuit was open'),
+            ('n8n_webhook_coalesced_total', 'coalesced', 'GETs that shared an identical in-flight call'),
+        ]:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for endpoint, stats in endpoints:
+                lines.append(f'{name}{{endpoint="{endpoint}"}} {stats[key]}')
+
+        lines.append("# HELP n8n_webhook_errors_total Failed webhook calls by kind")
+        lines.append("# TYPE n8n_webhook_errors_total counter")
+        for endpoint, stats in endpoints:
+            for kind, count in sorted(stats['errors'].items()):
+                lines.append(f'n8n_webhook_errors_total{{endpoint="{endpoint}",kind="{_label(kind)}"}} {count}')
+
+    return "\n".join(lines) + "\n"
+
+
+def to_json_lines():
+    """Render the most recent calls as JSON lines (one call per line)"""
+    with _lock:
+        return "".join(json.dumps(call) + "\n" for call in _recent)
+
+
+def export_metrics(path):
+    """Write metrics to path: Prometheus text, or JSON lines if path ends in .jsonl"""
+    content = to_json_lines() if path.endswith('.jsonl') else to_prometheus()
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+# ==================== STREAMLIT WIDGETS ====================
+
+def show_metrics_panel():
+    """Debug panel with per-endpoint webhook metrics and export buttons"""
+    import streamlit as st
+
+    with st.expander("🐞 Webhook Metrics", expanded=False):
+        rows = metrics_summary()
+        if rows:
+            st.dataframe(rows, hide_index=True, width='stretch')
+        else:
+            st.info("No webhook calls recorded yet.")
+
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.download_button("📥 Prometheus", to_prometheus(), file_name="n8n_webhooks.prom",
+                               mime="text/plain", width='stretch')
+        with col2:
+            st.download_button("📥 JSON Lines", to_json_lines(), file_name="n8n_webhooks.jsonl",
+                               mime="application/json", width='stretch')
+        with col3:
+            if st.button("🗑️ Reset", key="reset_webhook_metrics", width='stretch'):
+                reset_metrics()
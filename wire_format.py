@@ -0,0 +1,96 @@
+"""
+Wire Format Module
+Encoding of the admin/get-* sheet responses. The "Encode Sheet Response" node
+(shared by every sheet webhook) returns rows as objects ({"data": [{col: val, ...}, ...]}) unless the app asks
+for ?format=columnar, in which case the column names are sent once with one
+array per column, and columns with few distinct values (departments,
+statuses, dates) as a dictionary plus integer codes. Transport compression
+(gzip, or zstd when the zstandard package is installed) is negotiated by
+requests via Accept-Encoding and undone before the body gets here.
+
+Responses carry an ETag chained over the rows in order; sent back as
+If-None-Match with ?after_row=<rows held>, it gets a 304 when nothing
+changed, or only the appended rows (delta) when the held rows are unchanged.
+"""
+
+import hashlib
+import json
+
+try:
+    import orjson
+    _has_orjson = True
+except ImportError:
+    _has_orjson = False
+
+COLUMNAR = 'columnar'
+
+# A column is dictionary encoded when it has at most this share of distinct values
+DICTIONARY_MAX_RATIO = 0.5
+
+
+def loads(content):
+    """Decode a JSON response body (bytes), with orjson when it is installed"""
+    if _has_orjson:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def encode_columnar(records):
+    """Columnar response body for a list of row dicts (what the workflow sends for ?format=columnar)"""
+    columns = list(dict.fromkeys(col for record in records for col in record))
+    values = []
+    for col in columns:
+        column = [record.get(col) for record in records]
+        codes = {}
+        for value in column:
+            codes.setdefault(value, len(codes))
+        if len(codes) > len(column) * DICTIONARY_MAX_RATIO:
+            values.append(column)
+        else:
+            values.append({'dict': list(codes), 'codes': [codes[value] for value in column]})
+    return {'success': True, 'count': len(records), 'format': COLUMNAR, 'columns': columns, 'values': values}
+
+
+def build_response(records, fmt=None, after_row=0, if_none_match=None):
+    """
+    (status, body, etag) the workflow answers a sheet GET with (used by the
+    stand-in servers; the ETags differ from n8n's but follow the same rules)
+    """
+    digest = hashlib.blake2b(digest_size=8)
+    base_etag = None
+    for index, record in enumerate(records):
+        if index == after_row:
+            base_etag = f'"{fmt or "rows"}-{index}-{digest.hexdigest()}"'
+        digest.update(json.dumps(record, sort_keys=True).encode())
+    etag = f'"{fmt or "rows"}-{len(records)}-{digest.hexdigest()}"'
+    if after_row == len(records):
+        base_etag = etag
+
+    if if_none_match == etag:
+        return 304, None, etag
+
+    delta = after_row > 0 and if_none_match == base_etag
+    rows = records[after_row:] if delta else records
+    body = encode_columnar(rows) if fmt == COLUMNAR else {'success': True, 'count': len(rows), 'data': rows}
+    body.update(etag=etag, total_rows=len(records), delta=delta)
+    return 200, body, etag
+
+
+def _decode_column(column):
+    import numpy as np
+    import pandas as pd
+
+    if isinstance(column, dict):
+        # Series inference keeps the dtype the row format would have given
+        return pd.Series(column['dict']).to_numpy()[np.asarray(column['codes'], dtype=np.intp)]
+    return column
+
+
+def decode_frame(body):
+    """DataFrame of a sheet response in either format, built straight from the column arrays when columnar"""
+    # Imported here: the n8n client needs loads() on pages that never build a DataFrame
+    import pandas as pd
+
+    if body.get('format') != COLUMNAR:
+        return pd.DataFrame(body.get('data', []))
+    return pd.DataFrame({col: _decode_column(column) for col, column in zip(body['columns'], body['values'])})